@@ -12,6 +12,7 @@ import numpy as np
 
 from mantidimaging.core.data.utility import mark_cropped
 from mantidimaging.core.operation_history import const
+from mantidimaging.core.parallel import shared as ps
 from mantidimaging.core.parallel import utility as pu
 from mantidimaging.core.utility.data_containers import ProjectionAngles, Counts, Indices
 from mantidimaging.core.utility.imat_log_file_parser import IMATLogFile
@@ -137,6 +138,34 @@ class ImageStack:
             display_name
         })
 
+    def record_partial_operation(self, func_name: str, display_name, cancelled: pu.OperationCancelled, *args,
+                                 **kwargs):
+        """
+        Record an operation that was cancelled part way through, so that it is known which images may have been
+        modified.
+
+        :param cancelled: The exception raised when the operation was cancelled, which holds the range of indices
+                          that may have been processed
+        """
+        self.record_operation(func_name, display_name, *args, **kwargs)
+        self.metadata[const.OPERATION_HISTORY][-1].update({
+            const.OPERATION_PARTIAL:
+            True,
+            const.OPERATION_PROCESSED_RANGE:
+            list(cancelled.processed_range) if cancelled.processed_range is not None else None,
+            const.OPERATION_PROCESSED_COUNT:
+            cancelled.processed_count
+        })
+
+    @property
+    def is_partially_processed(self) -> bool:
+        """
+        Whether an operation that was cancelled part way through has been applied to the stack
+        """
+        return any(
+            operation.get(const.OPERATION_PARTIAL, False)
+            for operation in self.metadata.get(const.OPERATION_HISTORY, []))
+
     def copy(self, flip_axes=False) -> 'ImageStack':
         shape = (self.data.shape[1], self.data.shape[0], self.data.shape[2]) if flip_axes else self.data.shape
         data_copy = pu.create_array(shape, self.data.dtype)
@@ -265,6 +294,26 @@ class ImageStack:
     def dtype(self):
         return self.data.dtype
 
+    @property
+    def is_integer(self) -> bool:
+        return np.issubdtype(self.dtype, np.integer)
+
+    def promote_to_float(self, dtype=np.float32) -> bool:
+        """
+        Convert a stack that is kept in its native integer dtype to floating point, so that operations can write
+        non-integer results. The images are converted in parallel into a new array, which then replaces the data.
+
+        :return: True if the stack was converted, False if it was already floating point
+        """
+        if not self.is_integer:
+            return False
+        promoted = pu.create_array(self.data.shape, dtype)
+        ps.run_compute_func(_promote_image, self.num_images, [self._shared_array, promoted], {})
+        self._shared_array = promoted
+        leak_tracker.add(self._shared_array.array, msg=f"ImageStack {self.name}")
+        leak_tracker.add(self._shared_array, msg=f"ImageStack {self.name}")
+        return True
+
     @staticmethod
     def create_empty_image_stack(shape, dtype, metadata) -> 'ImageStack':
         arr = pu.create_array(shape, dtype)
@@ -347,3 +396,7 @@ class ImageStack:
 
             if num > 1000:
                 raise ValueError(f"Could not make unique name for: {name}")
+
+
+def _promote_image(index: int, arrays: List[np.ndarray], params: Dict[str, Any]) -> None:
+    arrays[1][index] = arrays[0][index]
@@ -11,6 +11,7 @@ from mantidimaging.core.data import ImageStack
 from mantidimaging.core.data.test.fake_logfile import generate_csv_logfile, generate_txt_logfile
 from mantidimaging.core.operations.crop_coords import CropCoordinatesFilter
 from mantidimaging.core.operation_history import const
+from mantidimaging.core.parallel.utility import OperationCancelled
 from mantidimaging.core.utility.sensible_roi import SensibleROI
 from mantidimaging.test_helpers.unit_test_helper import generate_images
 
@@ -67,6 +68,38 @@ class ImageStackTest(unittest.TestCase):
         self.assertEqual(images.metadata, copy.metadata)
         self.assertNotEqual(images, copy)
 
+    def test_record_partial_operation(self):
+        images = generate_images()
+        images.record_operation("First", "First operation")
+        self.assertFalse(images.is_partially_processed)
+
+        images.record_partial_operation("Second", "Second operation", OperationCancelled((2, 5), 3), size=3)
+
+        self.assertTrue(images.is_partially_processed)
+        recorded = images.metadata[const.OPERATION_HISTORY][-1]
+        self.assertEqual("Second", recorded[const.OPERATION_NAME])
+        self.assertEqual({"size": 3}, recorded[const.OPERATION_KEYWORD_ARGS])
+        self.assertTrue(recorded[const.OPERATION_PARTIAL])
+        self.assertEqual([2, 5], recorded[const.OPERATION_PROCESSED_RANGE])
+        self.assertEqual(3, recorded[const.OPERATION_PROCESSED_COUNT])
+
+    def test_promote_integer_stack_to_float(self):
+        data = np.arange(20 * 3 * 4, dtype=np.uint16).reshape((20, 3, 4))
+        images = ImageStack(data.copy())
+        self.assertTrue(images.is_integer)
+
+        self.assertTrue(images.promote_to_float())
+
+        self.assertFalse(images.is_integer)
+        self.assertEqual(np.float32, images.dtype)
+        np.testing.assert_equal(images.data, data.astype(np.float32))
+
+    def test_promote_float_stack_does_nothing(self):
+        images = generate_images()
+        shared_array = images.shared_array
+        self.assertFalse(images.promote_to_float())
+        self.assertIs(shared_array, images.shared_array)
+
     def test_copy_flip_axes(self):
         images = generate_images()
         images.record_operation("Test", "Display", 123)
@@ -0,0 +1,79 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Cache of the names in a directory, so that finding the files of a dataset lists each directory once rather than
+once per search. The listing is kept until the modification time of the directory changes.
+"""
+import fnmatch
+import os
+import threading
+import time
+from collections import OrderedDict
+from logging import getLogger
+from pathlib import Path
+from typing import List, NamedTuple, Tuple, Union
+
+LOG = getLogger(__name__)
+
+# Number of directories to keep the listing of
+LISTING_CACHE_SIZE = 256
+# A directory modified this recently is not cached. Some filesystems store the modification time with a resolution of
+# a second or more, so a file added just after listing could otherwise leave the time unchanged
+RECENT_CHANGE_NS = 2 * 10**9
+
+
+class _Listing(NamedTuple):
+    mtime_ns: int
+    names: Tuple[str, ...]
+
+
+_cache: "OrderedDict[str, _Listing]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def list_directory(directory: Union[Path, str]) -> Tuple[str, ...]:
+    """
+    Get the sorted names of the entries in a directory. A directory that does not exist has no entries.
+    """
+    path = os.path.abspath(os.path.expanduser(directory))
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return ()
+
+    with _lock:
+        listing = _cache.get(path)
+        if listing is not None and listing.mtime_ns == mtime_ns:
+            _cache.move_to_end(path)
+            return listing.names
+
+    try:
+        names = tuple(sorted(entry.name for entry in os.scandir(path)))
+    except (FileNotFoundError, NotADirectoryError):
+        return ()
+    LOG.debug(f"Listed {len(names)} entries in {path}")
+
+    if time.time_ns() - mtime_ns > RECENT_CHANGE_NS:
+        with _lock:
+            _cache[path] = _Listing(mtime_ns, names)
+            _cache.move_to_end(path)
+            while len(_cache) > LISTING_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return names
+
+
+def glob_directory(directory: Union[Path, str], pattern: str) -> List[str]:
+    """
+    Get the paths of the entries in a directory that match a glob pattern, from the cached listing. As with
+    :func:`glob.glob`, names starting with a dot only match a pattern that starts with a dot.
+    """
+    names = list_directory(directory)
+    if not pattern.startswith('.'):
+        names = tuple(name for name in names if not name.startswith('.'))
+    path = os.path.abspath(os.path.expanduser(directory))
+    return [os.path.join(path, name) for name in fnmatch.filter(names, pattern)]
+
+
+def clear_listing_cache() -> None:
+    with _lock:
+        _cache.clear()
@@ -6,6 +6,8 @@ import re
 from typing import List, Iterator, Optional
 from logging import getLogger
 
+from mantidimaging.core.io.directory_listing import glob_directory, list_directory
+
 LOG = getLogger(__name__)
 
 
@@ -97,20 +99,20 @@ class FilenameGroup:
             yield self.directory / self.pattern.generate(index)
 
     def find_all_files(self) -> None:
-        for filename in self.directory.iterdir():
-            if self.pattern.match(filename.name):
-                self.all_indexes.append(self.pattern.get_index(filename.name))
+        for filename in list_directory(self.directory):
+            if self.pattern.match(filename):
+                self.all_indexes.append(self.pattern.get_index(filename))
 
-            if self.pattern.match_metadata(filename.name):
+            if self.pattern.match_metadata(filename):
                 if self.metadata_path is not None:
                     LOG.warning(f"Multiple metadata files found: {filename}")
-                self.metadata_path = filename
+                self.metadata_path = self.directory / filename
         self.all_indexes.sort()
 
     def find_log_file(self):
         parent_directory = self.directory.parent
         log_pattern = self.directory.name + "*" + ".txt"
-        log_paths = list(parent_directory.glob(log_pattern))
+        log_paths = [Path(log_path) for log_path in glob_directory(parent_directory, log_pattern)]
 
         if log_paths:
             # choose shortest match
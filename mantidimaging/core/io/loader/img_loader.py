@@ -3,7 +3,8 @@
 """
 This module handles the loading of FIT, FITS, TIF, TIFF
 """
-from typing import Tuple, Optional, List, Callable, Union, TYPE_CHECKING
+import threading
+from typing import Any, Dict, Tuple, Optional, List, Callable, Union, TYPE_CHECKING
 
 import numpy as np
 
@@ -11,17 +12,41 @@ if TYPE_CHECKING:
     import numpy.typing as npt
 
 from mantidimaging.core.data import ImageStack
+from mantidimaging.core.parallel import shared as ps
 from mantidimaging.core.parallel import utility as pu
 from mantidimaging.core.utility.progress_reporting import Progress
+from mantidimaging.core.utility.sensible_roi import SensibleROI
 from ...utility.data_containers import Indices
 
+# Decoding releases the GIL while reading and decompressing, so threads keep the disks busy without the cost of
+# sending the load function and file names to the process pool
+DEFAULT_LOAD_EXECUTOR = pu.Executor.THREAD
+
+BINNING_MEAN = "mean"
+BINNING_SUM = "sum"
+BINNING_MODES = (BINNING_MEAN, BINNING_SUM)
+
+AVERAGE_MEAN = "mean"
+AVERAGE_MEDIAN = "median"
+AVERAGE_MODES = (AVERAGE_MEAN, AVERAGE_MEDIAN)
+# Number of images held in memory at once when averaging a stack as it is loaded
+DEFAULT_AVERAGE_WINDOW = 32
+
 
 def execute(load_func: Callable[[str], np.ndarray],
             sample_path: List[str],
             img_format: str,
             dtype: 'npt.DTypeLike',
             indices: Union[List[int], Indices, None],
-            progress: Optional[Progress] = None) -> ImageStack:
+            progress: Optional[Progress] = None,
+            executor: pu.Executor = DEFAULT_LOAD_EXECUTOR,
+            read_into_func: Optional[Callable[..., None]] = None,
+            img_shape: Optional[Tuple[int, ...]] = None,
+            roi: Optional[SensibleROI] = None,
+            binning: int = 1,
+            binning_mode: str = BINNING_MEAN,
+            average: Optional[str] = None,
+            average_window: int = DEFAULT_AVERAGE_WINDOW) -> ImageStack:
     """
     Reads a stack of images into memory, assuming dark and flat images
     are in separate directories.
@@ -31,6 +56,21 @@ def execute(load_func: Callable[[str], np.ndarray],
         '>f2' - float16
         '>f4' - float32
 
+    :param executor: The backend used to load the files in parallel
+    :param read_into_func: Optional function that decodes a file straight into an image of the stack, used instead
+                           of load_func to avoid allocating a new array for every file
+    :param img_shape: The shape of each image, if it is already known from the file header. Otherwise the first
+                      file is loaded to find it
+    :param roi: Optional region of each image to load. Only the region is allocated, and read_into_func is given it
+                so that it can avoid reading the rest of the image
+    :param binning: Integer factor to bin each image by in x and y as it is loaded, after the roi is applied
+    :param binning_mode: Whether the binned pixels are the mean or the sum of the pixels they replace. Summing into
+                         an integer dtype can overflow
+    :param average: Optional AVERAGE_MEAN or AVERAGE_MEDIAN, to reduce the images to a single image as they are
+                    loaded instead of keeping them all. The stack only has the first file name
+    :param average_window: The most images held in memory at once when averaging. The median is found for each
+                           window of images, and the medians of the windows are averaged
+
     :returns: ImageStack object
     """
     if not sample_path:
@@ -38,16 +78,32 @@ def execute(load_func: Callable[[str], np.ndarray],
 
     # The following codes assume that all images have the same size and properties as the first.
     # This is always true in the case of raw data
-    first_sample_img = load_func(sample_path[0])
+    if img_shape is None:
+        img_shape = load_func(sample_path[0]).shape
+
+    if roi is not None and not (0 <= roi.left < roi.right <= img_shape[-1]
+                                and 0 <= roi.top < roi.bottom <= img_shape[-2]):
+        raise ValueError(f"Region {roi} is not within the images of shape {img_shape}")
+
+    if binning < 1:
+        raise ValueError(f"Binning must be a positive integer, got {binning}")
+    if binning_mode not in BINNING_MODES:
+        raise ValueError(f"Binning mode must be one of {BINNING_MODES}, got {binning_mode}")
+    if average is not None and average not in AVERAGE_MODES:
+        raise ValueError(f"Average must be one of {AVERAGE_MODES}, got {average}")
+    if average_window < 1:
+        raise ValueError(f"Average window must be a positive integer, got {average_window}")
 
     # select the files loaded based on the indices, if any are provided
     chosen_input_filenames = sample_path[indices[0]:indices[1]:indices[2]] if indices else sample_path
 
-    # get the shape of all images
-    img_shape = first_sample_img.shape
-
     # forward all arguments to internal class for easy re-usage
-    il = ImageLoader(load_func, img_format, img_shape, dtype, indices, progress)
+    il = ImageLoader(load_func, img_format, img_shape, dtype, indices, progress, executor, read_into_func, roi, binning,
+                     binning_mode)
+
+    if average is not None:
+        return ImageStack(il.load_average(chosen_input_filenames, average, average_window),
+                          chosen_input_filenames[:1], indices)
 
     sample_data = il.load_sample_data(chosen_input_filenames)
 
@@ -61,13 +117,23 @@ class ImageLoader(object):
                  img_shape: Tuple[int, ...],
                  data_dtype: 'npt.DTypeLike',
                  indices: Union[List[int], Indices, None],
-                 progress: Optional[Progress] = None):
+                 progress: Optional[Progress] = None,
+                 executor: pu.Executor = DEFAULT_LOAD_EXECUTOR,
+                 read_into_func: Optional[Callable[..., None]] = None,
+                 roi: Optional[SensibleROI] = None,
+                 binning: int = 1,
+                 binning_mode: str = BINNING_MEAN):
         self.load_func = load_func
+        self.read_into_func = read_into_func
         self.img_format = img_format
         self.img_shape = img_shape
         self.data_dtype = data_dtype
         self.indices = indices
         self.progress = progress
+        self.executor = executor
+        self.roi = roi
+        self.binning = binning
+        self.binning_mode = binning_mode
 
     def load_sample_data(self, input_file_names: List[str]) -> pu.SharedArray:
         # determine what the loaded data was
@@ -77,28 +143,144 @@ class ImageLoader(object):
         else:
             raise ValueError("Data loaded has invalid shape: {0}", self.img_shape)
 
-    def _do_files_load_seq(self, data: pu.SharedArray, files: List[str]) -> pu.SharedArray:
+    def _do_files_load(self, data: pu.SharedArray, files: List[str]) -> pu.SharedArray:
+        """
+        Load each file straight into its image of the stack, in parallel using the executor of the loader
+        """
         progress = Progress.ensure_instance(self.progress, num_steps=len(files), task_name='Loading')
+        params = {
+            'load_func': self.load_func,
+            'read_into_func': self.read_into_func,
+            # As an array the names are put in shared memory for the process pool, rather than sent with every task
+            'files': np.array(files),
+            'img_shape': self.img_shape,
+            'roi': self.roi,
+            'region_shape': self._region_shape(),
+            'binning': self.binning,
+            'binning_mode': self.binning_mode
+        }
+        ps.run_compute_func(_load_file, len(files), data, params, progress, executor=self.executor, msg='Image')
+        return data
 
-        with progress:
-            for idx, in_file in enumerate(files):
-                try:
-                    data.array[idx, :] = self.load_func(in_file)
-                    progress.update(msg='Image')
-                except ValueError as exc:
-                    raise ValueError("An image has different width and/or height "
-                                     "dimensions! All images must have the same "
-                                     "dimensions. Expected dimensions: {0} Error "
-                                     "message: {1}".format(self.img_shape, exc))
-                except IOError as exc:
-                    raise RuntimeError("Could not load file {0}. Error details: " "{1}".format(in_file, exc))
+    def _region_shape(self) -> Tuple[int, int]:
+        """
+        The shape of the region of each image that is loaded, before binning
+        """
+        if self.roi is not None:
+            return self.roi.height, self.roi.width
+        return self.img_shape[0], self.img_shape[1]
 
-        return data
+    def _image_shape(self) -> Tuple[int, int]:
+        image_shape = binned_shape(self._region_shape(), self.binning)
+        if 0 in image_shape:
+            raise ValueError(f"Binning by {self.binning} leaves no pixels in images of shape {self._region_shape()}")
+        return image_shape
 
     def load_files(self, files: List[str]) -> pu.SharedArray:
         # Zeroing here to make sure that we can allocate the memory.
         # If it's not possible better crash here than later.
         num_images = len(files)
-        shape = (num_images, self.img_shape[0], self.img_shape[1])
-        data = pu.create_array(shape, self.data_dtype)
-        return self._do_files_load_seq(data, files)
+        data = pu.create_array((num_images, ) + self._image_shape(), self.data_dtype)
+        return self._do_files_load(data, files)
+
+    def load_average(self, files: List[str], average: str, window: int) -> pu.SharedArray:
+        """
+        Reduce the files to their mean or median image while loading them, so that only a window of the images is
+        in memory at once. The images of each window are loaded in parallel into a buffer that is reused.
+        """
+        if len(self.img_shape) != 2:
+            raise ValueError("Data loaded has invalid shape: {0}", self.img_shape)
+        image_shape = self._image_shape()
+        progress = Progress.ensure_instance(self.progress, num_steps=len(files), task_name='Loading')
+        buffer = np.empty((min(window, len(files)), ) + image_shape, dtype=np.float32)
+        total = np.zeros(image_shape, dtype=np.float64)
+        params = {
+            'load_func': self.load_func,
+            'read_into_func': self.read_into_func,
+            'img_shape': self.img_shape,
+            'roi': self.roi,
+            'region_shape': self._region_shape(),
+            'binning': self.binning,
+            'binning_mode': self.binning_mode
+        }
+        for start in range(0, len(files), window):
+            params['files'] = files[start:start + window]
+            chunk = buffer[:len(params['files'])]
+            ps.run_compute_func(_load_file,
+                                len(chunk),
+                                pu.SharedArray(chunk, None),
+                                params,
+                                executor=self.executor,
+                                msg='Image')
+            if average == AVERAGE_MEDIAN:
+                total += np.median(chunk, axis=0) * len(chunk)
+            else:
+                total += chunk.sum(axis=0, dtype=np.float64)
+            progress.update(len(chunk), f"Averaging {average}")
+
+        # An average of integer data keeps its fractional part
+        dtype = self.data_dtype if np.issubdtype(self.data_dtype, np.floating) else np.float32
+        data = pu.create_array((1, ) + image_shape, dtype)
+        np.divide(total, len(files), out=data.array[0], casting="unsafe")
+        progress.mark_complete()
+        return data
+
+
+# Buffers that each image is read into before it is binned, kept per thread so that concurrent loads don't share them
+_binning_scratch = threading.local()
+
+
+def _binning_buffer(shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+    buffer = getattr(_binning_scratch, "buffer", None)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = np.empty(shape, dtype)
+        _binning_scratch.buffer = buffer
+    return buffer
+
+
+def binned_shape(shape: Tuple[int, int], binning: int) -> Tuple[int, int]:
+    """
+    The shape of an image after binning, pixels left over at the bottom and right edges are dropped
+    """
+    return shape[0] // binning, shape[1] // binning
+
+
+def _bin_into(image: np.ndarray, out: np.ndarray, binning: int, mode: str) -> None:
+    height, width = out.shape
+    blocks = image[:height * binning, :width * binning].reshape(height, binning, width, binning)
+    binned = blocks.sum(axis=(1, 3), dtype=np.float64)
+    if mode == BINNING_MEAN:
+        binned /= binning * binning
+    np.copyto(out, binned, casting="unsafe")
+
+
+def _read_region(in_file: str, out: np.ndarray, params: Dict[str, Any]) -> None:
+    roi = params['roi']
+    if params['read_into_func'] is not None:
+        params['read_into_func'](in_file, out, roi)
+    elif roi is None:
+        out[:] = params['load_func'](in_file)
+    else:
+        image = params['load_func'](in_file)
+        if image.shape != params['img_shape']:
+            raise ValueError(f"Image shape {image.shape} does not match the expected shape {params['img_shape']}")
+        out[:] = image[roi.top:roi.bottom, roi.left:roi.right]
+
+
+def _load_file(index: int, array: np.ndarray, params: Dict[str, Any]) -> None:
+    in_file = str(params['files'][index])
+    binning = params['binning']
+    try:
+        if binning == 1:
+            _read_region(in_file, array[index], params)
+        else:
+            region = _binning_buffer(params['region_shape'], array.dtype)
+            _read_region(in_file, region, params)
+            _bin_into(region, array[index], binning, params['binning_mode'])
+    except ValueError as exc:
+        raise ValueError("An image has different width and/or height "
+                         "dimensions! All images must have the same "
+                         "dimensions. Expected dimensions: {0} Error "
+                         "message: {1}".format(params['img_shape'], exc))
+    except IOError as exc:
+        raise RuntimeError("Could not load file {0}. Error details: " "{1}".format(in_file, exc))
@@ -1,32 +1,49 @@
 # Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
+import json
 import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from logging import getLogger, Logger
 from pathlib import Path
-from typing import Tuple, List, Optional, Union, TYPE_CHECKING, Callable
+from typing import Tuple, List, Optional, Union, TYPE_CHECKING, Callable, Dict
 
 import numpy as np
 from skimage import io as skio
 import astropy.io.fits as fits
+import tifffile
 
 if TYPE_CHECKING:
     import numpy.typing as npt
 
 from mantidimaging.core.data import ImageStack
+from mantidimaging.core.data.utility import mark_cropped
 from mantidimaging.core.io.loader import img_loader
+from mantidimaging.core.io.loader.probe import probe_image
+from mantidimaging.core.parallel import utility as pu
 from mantidimaging.core.io.utility import (DEFAULT_IO_FILE_FORMAT, get_file_names, get_prefix, get_file_extension,
                                            find_images, find_first_file_that_is_possibly_a_sample, find_log,
                                            find_180deg_proj)
+from mantidimaging.core.operation_history import const
 from mantidimaging.core.utility.data_containers import ImageParameters, LoadingParameters, Indices
 from mantidimaging.core.utility.imat_log_file_parser import IMATLogFile
-from mantidimaging.core.utility.progress_reporting import Progress
+from mantidimaging.core.utility.memory_usage import system_free_memory
+from mantidimaging.core.utility.progress_reporting import Progress, ChildProgress
+from mantidimaging.core.utility.sensible_roi import SensibleROI
 
 LOG = getLogger(__name__)
 
 DEFAULT_IS_SINOGRAM = False
 DEFAULT_PIXEL_SIZE = 0
 DEFAULT_PIXEL_DEPTH = "float32"
+# Keeps integer data in the dtype it is stored as in the files, halving the memory used for 16 bit detector data.
+# The stack is converted to floating point when an operation first needs it.
+NATIVE_PIXEL_DEPTH = "native"
+# Number of stacks of a dataset that are read at the same time by load_stacks
+DEFAULT_LOAD_CONCURRENCY = 4
+
+_load_concurrency = DEFAULT_LOAD_CONCURRENCY
 
 
 def _fitsread(filename: str) -> np.ndarray:
@@ -36,18 +53,99 @@ def _fitsread(filename: str) -> np.ndarray:
     :param filename :: name of the image file, can be relative or absolute path
     :param img_format: format of the image ('fits')
     """
-    image = fits.open(filename)
-    if len(image) < 1:
-        raise RuntimeError("Could not load at least one FITS image/table file from: {0}".format(filename))
+    with fits.open(filename, memmap=False) as image:
+        if len(image) < 1:
+            raise RuntimeError("Could not load at least one FITS image/table file from: {0}".format(filename))
+
+        # get the image data
+        return image[0].data
+
+
+def _region_shape(shape: Tuple[int, ...], roi: Optional[SensibleROI]) -> Tuple[int, ...]:
+    """
+    The shape of the region of an image with the given shape, clipped to the image as slicing would
+    """
+    if roi is None:
+        return tuple(shape)
+    return (len(range(shape[0])[roi.top:roi.bottom]), len(range(shape[1])[roi.left:roi.right])) + tuple(shape[2:])
+
+
+def _check_region_shape(shape: Tuple[int, ...], roi: Optional[SensibleROI], out: np.ndarray) -> None:
+    if _region_shape(shape, roi) != out.shape:
+        region = f" region {roi}" if roi is not None else ""
+        raise ValueError(f"Image shape {shape}{region} does not match the expected shape {out.shape}")
+
+
+def _fitsread_into(filename: str, out: np.ndarray, roi: Optional[SensibleROI] = None) -> None:
+    """
+    Copy a FITS image straight into out. Unscaled files are memory mapped, so the byte swap from the big endian file
+    and the conversion to the dtype of out are done in a single pass while copying, and the file is closed before
+    returning. Files with BZERO/BSCALE, such as uint16 images, can't be mapped and are scaled by astropy first.
 
-    # get the image data
-    return image[0].data
+    :param roi: Optional region of the image to copy, only the rows in it are read from the file
+    :raises ValueError: If the image, or its region, does not have the shape of out
+    """
+    # Left to astropy, which maps the file unless its data has to be scaled
+    with fits.open(filename, memmap=None) as image:
+        if len(image) < 1:
+            raise RuntimeError("Could not load at least one FITS image/table file from: {0}".format(filename))
+        hdu = image[0]
+        _check_region_shape(hdu.shape, roi, out)
+        data = hdu.data if roi is None else hdu.section[roi.top:roi.bottom, roi.left:roi.right]
+        np.copyto(out, data, casting="unsafe")
+        # The memory map can only be closed once nothing refers to it
+        del data
 
 
 def _imread(filename: str) -> np.ndarray:
     return skio.imread(filename)
 
 
+# Buffers to decode into when the file dtype differs from the stack dtype, kept per thread so that concurrent loads
+# don't share them
+_scratch = threading.local()
+
+
+def _scratch_buffer(shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+    buffer = getattr(_scratch, "buffer", None)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = np.empty(shape, dtype)
+        _scratch.buffer = buffer
+    return buffer
+
+
+def _imread_into(filename: str, out: np.ndarray, roi: Optional[SensibleROI] = None) -> None:
+    """
+    Decode a TIFF straight into out. If the file has a different dtype it is decoded into a scratch buffer that is
+    reused between files, and converted into out in a single pass.
+
+    :param roi: Optional region of the image to copy. Uncompressed images are memory mapped so that only the rows in
+                the region are read, others are decoded whole into the scratch buffer
+    :raises ValueError: If the image, or its region, does not have the shape of out
+    """
+    with tifffile.TiffFile(filename) as tif:
+        series = tif.series[0]
+        _check_region_shape(series.shape, roi, out)
+        if roi is None and series.dtype == out.dtype and out.flags.c_contiguous:
+            tif.asarray(out=out)
+            return
+        memmappable = roi is not None and len(tif.pages) == 1 and tif.pages[0].is_memmappable
+        if not memmappable:
+            scratch = _scratch_buffer(tuple(series.shape), series.dtype)
+            tif.asarray(out=scratch)
+    if memmappable:
+        mapped = tifffile.memmap(filename, mode='r')
+        np.copyto(out, _region(mapped, roi), casting="unsafe")
+        # Unmaps the file, as nothing else refers to it
+        del mapped
+        return
+    np.copyto(out, _region(scratch, roi), casting="unsafe")
+
+
+def _region(image: np.ndarray, roi: Optional[SensibleROI]) -> np.ndarray:
+    return image if roi is None else image[roi.top:roi.bottom, roi.left:roi.right]
+
+
 def supported_formats() -> List[str]:
     return ['fits', 'fit', 'tif', 'tiff']
 
@@ -62,6 +160,17 @@ def get_loader(in_format: str) -> Callable[[str], np.ndarray]:
     return load_func
 
 
+def get_read_into(in_format: str) -> Optional[Callable[[str, np.ndarray], None]]:
+    """
+    Get the function that decodes an image straight into an existing array, if the format has one
+    """
+    if in_format in ['tiff', 'tif']:
+        return _imread_into
+    if in_format in ['fits', 'fit']:
+        return _fitsread_into
+    return None
+
+
 @dataclass
 class FileInformation:
     filenames: List[str]
@@ -74,20 +183,47 @@ def read_in_file_information(input_path: str,
                              in_format: str = DEFAULT_IO_FILE_FORMAT,
                              data_dtype: 'npt.DTypeLike' = np.float32) -> FileInformation:
     input_file_names = get_file_names(input_path, in_format, in_prefix)
-    image_stack = load(input_path,
-                       in_prefix=in_prefix,
-                       in_format=in_format,
-                       dtype=data_dtype,
-                       indices=[0, 1, 1],
-                       file_names=input_file_names)
+    # Only the header of the first file is read, the images are assumed to all have the same shape
+    image_shape = _probe_image_shape(input_file_names[0])
 
     # construct and return the new shape
-    shape: Tuple[int, int, int] = (len(input_file_names), ) + image_stack.data[0].shape
+    if _is_tiff_stack_file(in_format, input_file_names):
+        # The images are the pages of the file, and are selected by the indices of the pages
+        shape: Tuple[int, int, int] = image_shape  # type: ignore
+    else:
+        shape = (len(input_file_names), ) + image_shape  # type: ignore
 
-    fi = FileInformation(filenames=input_file_names, shape=shape, sinograms=image_stack.is_sinograms)
+    sinograms = False
+    metadata_filename = _find_metadata_file(input_path, in_prefix)
+    if metadata_filename:
+        with open(metadata_filename) as f:
+            sinograms = json.load(f).get(const.SINOGRAMS, False)
+
+    fi = FileInformation(filenames=input_file_names, shape=shape, sinograms=sinograms)
     return fi
 
 
+def _probe_image_shape(filename: str) -> Tuple[int, ...]:
+    info = probe_image(filename)
+    # A file with several pages is not a single image, so the pages are included in the shape
+    return info.shape if info.pages == 1 else (info.pages, ) + info.shape
+
+
+def _native_dtype(filename: str) -> np.dtype:
+    """
+    The dtype to keep the images from a file in, which is the dtype of the file for integer data
+    """
+    dtype = probe_image(filename).dtype
+    if np.issubdtype(dtype, np.integer):
+        return dtype.newbyteorder('=')
+    return np.dtype(DEFAULT_PIXEL_DEPTH)
+
+
+def _find_metadata_file(input_path: Optional[str], in_prefix: str) -> Optional[str]:
+    metadata_found_filenames = get_file_names(input_path, 'json', in_prefix, essential=False)
+    return metadata_found_filenames[0] if metadata_found_filenames else None
+
+
 def load_log(log_file: str) -> IMATLogFile:
     with open(log_file, 'r') as f:
         return IMATLogFile(f.readlines(), log_file)
@@ -99,7 +235,106 @@ def load_p(parameters: ImageParameters, dtype: 'npt.DTypeLike', progress: Progre
                 in_format=parameters.format,
                 indices=parameters.indices,
                 dtype=dtype,
-                progress=progress)
+                progress=progress,
+                roi=parameters.roi,
+                binning=parameters.binning,
+                binning_mode=parameters.binning_mode,
+                average=parameters.average,
+                average_window=parameters.average_window)
+
+
+def configure_load_concurrency(concurrency: Optional[int]) -> None:
+    """
+    Set the number of stacks that load_stacks reads at the same time. None restores the default.
+    """
+    global _load_concurrency
+    if concurrency is not None and concurrency < 1:
+        raise ValueError(f"Load concurrency must be at least 1, got {concurrency}")
+    _load_concurrency = concurrency if concurrency is not None else DEFAULT_LOAD_CONCURRENCY
+
+
+def _estimate_stack_bytes(parameters: ImageParameters, dtype: 'npt.DTypeLike') -> int:
+    """
+    Estimate the memory used by the stack that the parameters load, from the headers of the files.
+    Gives 0 if the files can't be read, leaving the load itself to report the error.
+    """
+    try:
+        file_names = get_file_names(parameters.input_path, parameters.format, parameters.prefix)
+        info = probe_image(file_names[0])
+        item_size = _native_dtype(file_names[0]).itemsize if dtype == NATIVE_PIXEL_DEPTH else np.dtype(dtype).itemsize
+    except (OSError, RuntimeError, ValueError, NotImplementedError):
+        return 0
+    num_images = info.pages if len(file_names) == 1 else len(file_names)
+    if parameters.indices:
+        num_images = len(range(num_images)[parameters.indices[0]:parameters.indices[1]:parameters.indices[2]])
+    if parameters.average is not None:
+        # Integer data is averaged into float32
+        num_images = min(num_images, 1)
+        item_size = max(item_size, np.dtype(np.float32).itemsize)
+    image_shape = img_loader.binned_shape(_region_shape(info.shape[:2], parameters.roi), parameters.binning)
+    return num_images * int(np.prod(image_shape)) * item_size
+
+
+def load_stacks(stacks: Dict[str, ImageParameters],
+                dtype: 'npt.DTypeLike',
+                progress: Optional[Progress] = None,
+                concurrency: Optional[int] = None,
+                memory_budget: Optional[int] = None) -> Dict[str, ImageStack]:
+    """
+    Load several stacks at the same time, such as the sample, flats and darks of a dataset, reporting their combined
+    progress.
+
+    The largest stacks are started first, so the smaller ones are read while the largest is loading. Stacks are
+    started together while the total estimated size of the started stacks fits in the memory budget. Past that they
+    are started one at a time, so that an allocation that fails does so before any other reading starts.
+
+    :param stacks: The parameters of each stack, by name
+    :param dtype: The dtype to load the stacks as
+    :param progress: Progress that the steps of all the stacks are added to
+    :param concurrency: The most stacks to read at the same time. Defaults to the configured load concurrency
+    :param memory_budget: Bytes that the stacks can use. Defaults to the free memory of the system
+    :return: The loaded stacks, by name
+    """
+    progress = Progress.ensure_instance(progress, task_name='Loading')
+    concurrency = concurrency if concurrency is not None else _load_concurrency
+    if memory_budget is None:
+        memory_budget = int(system_free_memory().kb() * 1024)
+
+    sizes = {name: _estimate_stack_bytes(parameters, dtype) for name, parameters in stacks.items()}
+    children = {name: ChildProgress(progress, task_name=name) for name in stacks}
+    pending = sorted(stacks, key=lambda name: sizes[name], reverse=True)
+    running: Dict[Future, str] = {}
+    results: Dict[str, ImageStack] = {}
+    allocated = 0
+    error: Optional[BaseException] = None
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mi_load") as executor:
+        while pending or running:
+            while pending and error is None and len(running) < concurrency:
+                if running and allocated + sizes[pending[0]] > memory_budget:
+                    break
+                name = pending.pop(0)
+                allocated += sizes[name]
+                LOG.info(f"Loading {name}, estimated {sizes[name] / 1024**2:.1f} MiB")
+                running[executor.submit(load_p, stacks[name], dtype, children[name])] = name
+            if error is not None:
+                pending.clear()
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except BaseException as e:
+                    if error is None:
+                        # Stop the other stacks early, as the dataset can't be loaded without this one
+                        error = e
+                        for child in children.values():
+                            child.cancel(f"Loading {name} failed")
+
+    if error is not None:
+        raise error
+    return results
 
 
 def load_stack(file_path: str, progress: Optional[Progress] = None) -> ImageStack:
@@ -116,7 +351,14 @@ def load(input_path: Optional[str] = None,
          dtype: 'npt.DTypeLike' = np.float32,
          file_names: Optional[List[str]] = None,
          indices: Optional[Union[List[int], Indices]] = None,
-         progress: Optional[Progress] = None) -> ImageStack:
+         progress: Optional[Progress] = None,
+         executor: pu.Executor = img_loader.DEFAULT_LOAD_EXECUTOR,
+         roi: Optional[SensibleROI] = None,
+         row_range: Optional[Tuple[int, int]] = None,
+         binning: int = 1,
+         binning_mode: str = img_loader.BINNING_MEAN,
+         average: Optional[str] = None,
+         average_window: int = img_loader.DEFAULT_AVERAGE_WINDOW) -> ImageStack:
     """
 
     Loads a stack, including sample, white and dark images.
@@ -124,13 +366,23 @@ def load(input_path: Optional[str] = None,
     :param input_path: Path for the input data folder
     :param in_prefix: Optional: Prefix for loaded files
     :param in_format: Default:'tiff', format for the input images
-    :param dtype: Default:np.float32, data type for the input images
+    :param dtype: Default:np.float32, data type for the input images, or NATIVE_PIXEL_DEPTH to keep integer
+                  data in the dtype of the files
     :param file_names: Use provided file names for loading
     :param indices: Specify which indices are loaded from the found files.
                     This **DOES NOT** check for the number in the image
                     filename, but removes all indices from the filenames list
                     that are not selected
     :param progress: The progress reporting instance
+    :param executor: The backend used to load the files in parallel
+    :param roi: Optional region of each image to load, so that only those pixels are read and allocated
+    :param row_range: Optional first and one past the last row of each image to load, applied within the roi
+    :param binning: Integer factor to bin each image by in x and y as it is loaded, after the roi is applied.
+                    Projections can be skipped with the step of the indices
+    :param binning_mode: img_loader.BINNING_MEAN or img_loader.BINNING_SUM
+    :param average: Optional img_loader.AVERAGE_MEAN or img_loader.AVERAGE_MEDIAN, to load a flat or dark series
+                    as a single image, without holding all of the images in memory
+    :param average_window: The most images held in memory at once when averaging
     :return: an ImageStack
     """
     if indices and len(indices) < 3:
@@ -142,12 +394,34 @@ def load(input_path: Optional[str] = None,
         input_file_names = file_names
 
     load_func = get_loader(in_format)
+    if isinstance(dtype, str) and dtype == NATIVE_PIXEL_DEPTH:
+        dtype = _native_dtype(input_file_names[0]) if input_file_names else np.dtype(DEFAULT_PIXEL_DEPTH)
 
-    image_stack = img_loader.execute(load_func, input_file_names, in_format, dtype, indices, progress)
+    img_shape = _probe_image_shape(input_file_names[0]) if input_file_names else None
+    if row_range is not None and img_shape is not None:
+        roi = _restrict_rows(roi, row_range, img_shape)
+
+    if _is_tiff_stack_file(in_format, input_file_names):
+        image_stack = _load_tiff_stack_file(input_file_names[0], dtype, indices, progress, executor, roi, binning,
+                                            binning_mode, average, average_window)
+    else:
+        image_stack = img_loader.execute(load_func,
+                                         input_file_names,
+                                         in_format,
+                                         dtype,
+                                         indices,
+                                         progress,
+                                         executor,
+                                         read_into_func=get_read_into(in_format),
+                                         img_shape=img_shape,
+                                         roi=roi,
+                                         binning=binning,
+                                         binning_mode=binning_mode,
+                                         average=average,
+                                         average_window=average_window)
 
     # Search for and load metadata file
-    metadata_found_filenames = get_file_names(input_path, 'json', in_prefix, essential=False)
-    metadata_filename = metadata_found_filenames[0] if metadata_found_filenames else None
+    metadata_filename = _find_metadata_file(input_path, in_prefix)
     if metadata_filename:
         with open(metadata_filename) as f:
             image_stack.load_metadata(f)
@@ -155,9 +429,110 @@ def load(input_path: Optional[str] = None,
     else:
         LOG.debug('No metadata file found')
 
+    if roi is not None:
+        # Recorded as a crop, so that the history replicates the result from the full images
+        mark_cropped(image_stack, roi)
+    if binning > 1:
+        image_stack.metadata[const.LOAD_BINNING] = {
+            const.LOAD_BINNING_FACTOR: binning,
+            const.LOAD_BINNING_MODE: binning_mode
+        }
+    if average is not None:
+        image_stack.metadata[const.LOAD_AVERAGE] = {
+            const.LOAD_AVERAGE_MODE: average,
+            const.LOAD_AVERAGE_WINDOW: average_window,
+            const.LOAD_AVERAGE_FILES: _averaged_file_names(input_file_names, in_format, indices)
+        }
+
     return image_stack
 
 
+def _is_tiff_stack_file(in_format: str, file_names: List[str]) -> bool:
+    """
+    Whether the files are a single TIFF that holds the whole stack as pages
+    """
+    return in_format in ['tiff', 'tif'] and len(file_names) == 1 and probe_image(file_names[0]).pages > 1
+
+
+class _TiffPageReader:
+    """
+    Reads the pages of an open multi-page TIFF into the stack, by the names given to them by page_names.
+
+    The file handle is shared between the pages, so it can only be used from threads, and its lock has to be enabled
+    so that the seek and read of each page are not interleaved with another thread's.
+    """
+    def __init__(self, tif: tifffile.TiffFile, page_indices: List[int]):
+        # Reading the page headers here means that only the pixel data is read by the threads
+        self._pages = {name: tif.pages[i] for name, i in zip(self.page_names(tif, page_indices), page_indices)}
+
+    @staticmethod
+    def page_names(tif: tifffile.TiffFile, page_indices: List[int]) -> List[str]:
+        return [f"{tif.filehandle.path}:{i}" for i in page_indices]
+
+    def __call__(self, name: str, out: np.ndarray, roi: Optional[SensibleROI] = None) -> None:
+        page = self._pages[name]
+        _check_region_shape(page.shape, roi, out)
+        if roi is None and page.dtype == out.dtype and out.flags.c_contiguous:
+            page.asarray(out=out)
+            return
+        scratch = _scratch_buffer(tuple(page.shape), page.dtype)
+        page.asarray(out=scratch)
+        np.copyto(out, _region(scratch, roi), casting="unsafe")
+
+
+def _load_tiff_stack_file(file_name: str, dtype: 'npt.DTypeLike', indices: Optional[Union[List[int], Indices]],
+                          progress: Optional[Progress], executor: pu.Executor, roi: Optional[SensibleROI],
+                          binning: int, binning_mode: str, average: Optional[str],
+                          average_window: int) -> ImageStack:
+    """
+    Load a stack stored as the pages of a single TIFF or BigTIFF. The file is opened once, and the selected pages are
+    copied into the stack in parallel.
+    """
+    if executor != pu.Executor.SERIAL:
+        # The open file can't be sent to the process pool
+        executor = pu.Executor.THREAD
+    with tifffile.TiffFile(file_name) as tif:
+        # tifffile doesn't lock the file handle by default, and the pages are read from several threads
+        tif.filehandle.set_lock(True)
+        page_indices = list(range(len(tif.pages)))
+        if indices:
+            page_indices = page_indices[indices[0]:indices[1]:indices[2]]
+        LOG.info(f"Loading {len(page_indices)} pages from {file_name}")
+        image_stack = img_loader.execute(_imread,
+                                         _TiffPageReader.page_names(tif, page_indices),
+                                         "tif",
+                                         dtype,
+                                         None,
+                                         progress,
+                                         executor,
+                                         read_into_func=_TiffPageReader(tif, page_indices),
+                                         img_shape=tuple(tif.pages[0].shape),
+                                         roi=roi,
+                                         binning=binning,
+                                         binning_mode=binning_mode,
+                                         average=average,
+                                         average_window=average_window)
+    image_stack.indices = indices
+    return image_stack
+
+
+def _averaged_file_names(file_names: List[str], in_format: str,
+                         indices: Optional[Union[List[int], Indices]]) -> List[str]:
+    """
+    The files, or the pages of a single file, that an averaged stack was made from
+    """
+    if _is_tiff_stack_file(in_format, file_names):
+        pages = list(range(probe_image(file_names[0]).pages))
+        return [f"{file_names[0]}:{i}" for i in (pages[indices[0]:indices[1]:indices[2]] if indices else pages)]
+    return file_names[indices[0]:indices[1]:indices[2]] if indices else file_names
+
+
+def _restrict_rows(roi: Optional[SensibleROI], row_range: Tuple[int, int], img_shape: Tuple[int, ...]) -> SensibleROI:
+    if roi is None:
+        roi = SensibleROI(0, 0, img_shape[-1], img_shape[-2])
+    return SensibleROI(roi.left, max(roi.top, row_range[0]), roi.right, min(roi.bottom, row_range[1]))
+
+
 def find_and_verify_sample_log(sample_directory: str, image_filenames: List[str]) -> str:
     sample_log = find_log(dirname=Path(sample_directory), log_name=sample_directory)
 
@@ -0,0 +1,87 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Reads the shape and dtype of an image file from its TIFF tags or FITS header, without decoding the pixel data.
+"""
+import os
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+import astropy.io.fits as fits
+import numpy as np
+import tifffile
+
+from mantidimaging.core.io.utility import get_file_extension
+
+# Number of files to keep the header information of. The cache is keyed by the modification time and size of the
+# file, so a file that changes is probed again
+PROBE_CACHE_SIZE = 4096
+
+# Data types of the FITS BITPIX values, which are always stored big endian
+_FITS_BITPIX_DTYPES = {8: '>u1', 16: '>i2', 32: '>i4', 64: '>i8', -32: '>f4', -64: '>f8'}
+# Offsets that astropy uses to store unsigned integers in the signed types, which it reads back as unsigned
+_FITS_UNSIGNED_BZERO = {16: (1 << 15, '>u2'), 32: (1 << 31, '>u4'), 64: (1 << 63, '>u8')}
+
+
+class ImageInfo(NamedTuple):
+    """
+    :param shape: The shape of a single page of the file
+    :param dtype: The data type that the pixels are read as
+    :param pages: The number of pages, which are images of the same shape
+    """
+    shape: Tuple[int, ...]
+    dtype: np.dtype
+    pages: int
+
+
+def _probe_tiff(filename: str) -> ImageInfo:
+    with tifffile.TiffFile(filename) as tif:
+        page = tif.pages[0]
+        return ImageInfo(tuple(page.shape), np.dtype(page.dtype), len(tif.pages))
+
+
+def _fits_dtype(header: fits.Header) -> np.dtype:
+    bitpix = header['BITPIX']
+    bscale = header.get('BSCALE', 1)
+    bzero = header.get('BZERO', 0)
+    if bscale == 1 and bzero == 0:
+        return np.dtype(_FITS_BITPIX_DTYPES[bitpix])
+    if bscale == 1 and bitpix in _FITS_UNSIGNED_BZERO and bzero == _FITS_UNSIGNED_BZERO[bitpix][0]:
+        return np.dtype(_FITS_UNSIGNED_BZERO[bitpix][1])
+    # Any other scaling is applied by astropy, which gives float32 for the smaller integer types
+    return np.dtype(np.float64) if bitpix in (32, 64, -64) else np.dtype(np.float32)
+
+
+def _probe_fits(filename: str) -> ImageInfo:
+    with fits.open(filename, memmap=True) as hdul:
+        if len(hdul) < 1:
+            raise RuntimeError("Could not load at least one FITS image/table file from: {0}".format(filename))
+        header = hdul[0].header
+        shape = tuple(header[f'NAXIS{axis}'] for axis in range(header['NAXIS'], 0, -1))
+        dtype = _fits_dtype(header)
+    if len(shape) > 2:
+        return ImageInfo(shape[-2:], dtype, int(np.prod(shape[:-2])))
+    return ImageInfo(shape, dtype, 1)
+
+
+@lru_cache(maxsize=PROBE_CACHE_SIZE)
+def _probe_cached(filename: str, mtime_ns: int, size: int) -> ImageInfo:
+    extension = get_file_extension(filename).lower()
+    if extension in ['fits', 'fit']:
+        return _probe_fits(filename)
+    if extension in ['tiff', 'tif']:
+        return _probe_tiff(filename)
+    raise NotImplementedError("Probing not implemented for:", extension)
+
+
+def probe_image(filename: str) -> ImageInfo:
+    """
+    Read the shape, dtype and page count of an image file from its header. The result is cached until the file
+    changes.
+    """
+    stat = os.stat(filename)
+    return _probe_cached(os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+
+def clear_probe_cache() -> None:
+    _probe_cached.cache_clear()
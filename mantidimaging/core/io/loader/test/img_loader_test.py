@@ -0,0 +1,176 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from mantidimaging.core.io.loader import img_loader
+from mantidimaging.core.parallel.utility import Executor
+from mantidimaging.core.utility.sensible_roi import SensibleROI
+
+IMAGE_SHAPE = (4, 5)
+EXECUTORS = [Executor.SERIAL, Executor.THREAD]
+
+
+def _load_from_name(filename: str) -> np.ndarray:
+    return np.full(IMAGE_SHAPE, int(filename.split("_")[1]), dtype=np.uint16)
+
+
+def _file_names(num_files):
+    return [f"image_{i}" for i in range(num_files)]
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_files_are_loaded_into_their_index(executor):
+    files = _file_names(25)
+    stack = img_loader.execute(_load_from_name, files, "tif", np.float32, None, executor=executor)
+    assert stack.data.shape == (25, ) + IMAGE_SHAPE
+    assert stack.data.dtype == np.float32
+    npt.assert_equal(stack.data[:, 0, 0], np.arange(25))
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_progress_updated_for_every_file(executor):
+    progress = mock.Mock()
+    progress.should_cancel = False
+    files = _file_names(25)
+    img_loader.execute(_load_from_name, files, "tif", np.float32, None, progress=progress, executor=executor)
+    assert sum(call.args[0] for call in progress.update.call_args_list) == len(files)
+    progress.mark_complete.assert_called_once()
+
+
+def test_file_names_are_passed_as_an_array():
+    # An array of names can be shared with the process pool once, instead of being pickled with every task
+    files = _file_names(25)
+    with mock.patch.object(img_loader.ps, "run_compute_func") as run_compute_func:
+        img_loader.execute(_load_from_name, files, "tif", np.float32, None, executor=Executor.PROCESS)
+    params = run_compute_func.call_args.args[3]
+    assert isinstance(params['files'], np.ndarray)
+    assert params['files'].tolist() == files
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_shape_mismatch_is_reported(executor):
+    def load(filename):
+        if filename == "image_20":
+            return np.zeros((3, 3))
+        return np.zeros(IMAGE_SHAPE)
+
+    with pytest.raises(ValueError, match="different width and/or height"):
+        img_loader.execute(load, _file_names(25), "tif", np.float32, None, executor=executor)
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_io_error_is_reported(executor):
+    def load(filename):
+        if filename == "image_20":
+            raise IOError("disk error")
+        return np.zeros(IMAGE_SHAPE)
+
+    with pytest.raises(RuntimeError, match="Could not load file image_20"):
+        img_loader.execute(load, _file_names(25), "tif", np.float32, None, executor=executor)
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_roi_is_applied_when_loading(executor):
+    def load(filename):
+        return np.arange(4 * 5, dtype=np.float32).reshape(IMAGE_SHAPE) + int(filename.split("_")[1])
+
+    roi = SensibleROI(1, 2, 4, 4)
+    stack = img_loader.execute(load, _file_names(12), "tif", np.float32, None, executor=executor, roi=roi)
+    assert stack.data.shape == (12, 2, 3)
+    npt.assert_equal(stack.data[5], load("image_5")[2:4, 1:4])
+
+
+def test_roi_outside_images_raises():
+    with pytest.raises(ValueError, match="not within the images"):
+        img_loader.execute(_load_from_name, _file_names(3), "tif", np.float32, None, roi=SensibleROI(0, 0, 6, 2))
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+@pytest.mark.parametrize('mode', img_loader.BINNING_MODES)
+def test_binning_is_applied_when_loading(executor, mode):
+    def load(filename):
+        return np.arange(9 * 7, dtype=np.uint16).reshape((9, 7))
+
+    stack = img_loader.execute(load,
+                               _file_names(12),
+                               "tif",
+                               np.float32,
+                               None,
+                               executor=executor,
+                               binning=2,
+                               binning_mode=mode)
+
+    assert stack.data.shape == (12, 4, 3)
+    blocks = load("image_0")[:8, :6].reshape(4, 2, 3, 2).astype(np.float64)
+    expected = blocks.sum(axis=(1, 3)) if mode == img_loader.BINNING_SUM else blocks.mean(axis=(1, 3))
+    npt.assert_allclose(stack.data[7], expected)
+
+
+def test_binning_with_roi():
+    roi = SensibleROI(1, 0, 5, 4)
+    stack = img_loader.execute(_load_from_name, _file_names(3), "tif", np.float32, None, roi=roi, binning=2)
+    assert stack.data.shape == (3, 2, 2)
+    npt.assert_equal(stack.data[2], 2)
+
+
+def test_invalid_binning_raises():
+    with pytest.raises(ValueError, match="Binning must be a positive integer"):
+        img_loader.execute(_load_from_name, _file_names(3), "tif", np.float32, None, binning=0)
+    with pytest.raises(ValueError, match="Binning mode"):
+        img_loader.execute(_load_from_name, _file_names(3), "tif", np.float32, None, binning=2, binning_mode="max")
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+@pytest.mark.parametrize('window', [1, 4, 32])
+def test_mean_is_accumulated_while_loading(executor, window):
+    stack = img_loader.execute(_load_from_name,
+                               _file_names(10),
+                               "tif",
+                               np.uint16,
+                               None,
+                               executor=executor,
+                               average=img_loader.AVERAGE_MEAN,
+                               average_window=window)
+
+    assert stack.data.shape == (1, ) + IMAGE_SHAPE
+    assert stack.data.dtype == np.float32
+    npt.assert_allclose(stack.data[0], 4.5)
+    assert stack.filenames == ["image_0"]
+
+
+def test_median_of_each_window_is_averaged():
+    stack = img_loader.execute(_load_from_name,
+                               _file_names(6) + ["image_1000"],
+                               "tif",
+                               np.float32,
+                               None,
+                               average=img_loader.AVERAGE_MEDIAN,
+                               average_window=7)
+
+    # The outlier is removed by the median
+    npt.assert_equal(stack.data[0], 3)
+
+
+def test_average_with_indices_and_binning():
+    stack = img_loader.execute(_load_from_name,
+                               _file_names(10),
+                               "tif",
+                               np.float32, [0, 10, 2],
+                               binning=2,
+                               average=img_loader.AVERAGE_MEAN,
+                               average_window=2)
+
+    assert stack.data.shape == (1, 2, 2)
+    npt.assert_allclose(stack.data[0], 4)
+
+
+def test_invalid_average_raises():
+    with pytest.raises(ValueError, match="Average must be one of"):
+        img_loader.execute(_load_from_name, _file_names(3), "tif", np.float32, None, average="max")
+    with pytest.raises(ValueError, match="Average window"):
+        img_loader.execute(_load_from_name, _file_names(3), "tif", np.float32, None, average="mean", average_window=0)
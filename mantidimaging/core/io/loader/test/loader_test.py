@@ -1,12 +1,27 @@
 # Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 import os
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
+import astropy.io.fits as fits
+import numpy as np
+import numpy.testing as npt
+import psutil
+import tifffile
+
 from mantidimaging.core.io import loader
 from mantidimaging.core.io.loader import load_stack
+from mantidimaging.core.io.loader.probe import probe_image
 from mantidimaging.core.io.loader.loader import create_loading_parameters_for_file_path, DEFAULT_PIXEL_DEPTH, \
-    DEFAULT_PIXEL_SIZE, DEFAULT_IS_SINOGRAM
+    DEFAULT_PIXEL_SIZE, DEFAULT_IS_SINOGRAM, _fitsread, _fitsread_into, _imread_into, _scratch, _estimate_stack_bytes, \
+    NATIVE_PIXEL_DEPTH
+from mantidimaging.core.operation_history import const
+from mantidimaging.core.operations.crop_coords import CropCoordinatesFilter
+from mantidimaging.core.parallel import manager as pm
+from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.utility.data_containers import ImageParameters
+from mantidimaging.core.utility.sensible_roi import SensibleROI
 from mantidimaging.test_helpers import FileOutputtingTestCase
 
 
@@ -148,3 +163,274 @@ class LoaderTest(FileOutputtingTestCase):
         self.assertEqual(proj_180_file, proj180.input_path)
         self.assertEqual(None, proj180.log_file)
         self.assertEqual(proj_180_file_prefix, proj180.prefix)
+
+    def _write_tiff(self, data: np.ndarray) -> str:
+        file_name = os.path.join(self.output_directory, "image.tif")
+        tifffile.imwrite(file_name, data)
+        return file_name
+
+    def test_imread_into_same_dtype(self):
+        data = np.arange(12, dtype=np.float32).reshape((3, 4))
+        out = np.zeros((3, 4), dtype=np.float32)
+        _imread_into(self._write_tiff(data), out)
+        npt.assert_equal(out, data)
+
+    def test_imread_into_converts_dtype(self):
+        data = np.arange(12, dtype=np.uint16).reshape((3, 4)) * 1000
+        out = np.zeros((3, 4), dtype=np.float32)
+        _imread_into(self._write_tiff(data), out)
+        npt.assert_equal(out, data.astype(np.float32))
+
+    def test_imread_into_reuses_scratch_buffer(self):
+        file_name = self._write_tiff(np.ones((3, 4), dtype=np.uint16))
+        _imread_into(file_name, np.zeros((3, 4), dtype=np.float32))
+        scratch = _scratch.buffer
+        _imread_into(file_name, np.zeros((3, 4), dtype=np.float32))
+        self.assertIs(scratch, _scratch.buffer)
+
+    def test_imread_into_raises_on_shape_mismatch(self):
+        file_name = self._write_tiff(np.ones((3, 4), dtype=np.uint16))
+        self.assertRaises(ValueError, _imread_into, file_name, np.zeros((4, 4), dtype=np.float32))
+
+    def test_read_in_file_information_reads_headers(self):
+        for i in range(3):
+            tifffile.imwrite(os.path.join(self.output_directory, f"image_{i:03}.tif"), np.ones((5, 7), np.uint16))
+        with open(os.path.join(self.output_directory, "image_metadata.json"), "w") as f:
+            f.write('{"sinograms": true}')
+
+        with mock.patch("mantidimaging.core.io.loader.loader.load") as load_mock:
+            file_info = loader.read_in_file_information(self.output_directory, in_prefix="image", in_format="tif")
+
+        load_mock.assert_not_called()
+        self.assertEqual(file_info.shape, (3, 5, 7))
+        self.assertEqual(len(file_info.filenames), 3)
+        self.assertTrue(file_info.sinograms)
+
+    def test_read_in_file_information_of_multi_page_tiff(self):
+        data = np.arange(5 * 4 * 3, dtype=np.uint16).reshape((5, 4, 3))
+        tifffile.imwrite(os.path.join(self.output_directory, "stack.tif"), data, photometric='minisblack')
+
+        file_info = loader.read_in_file_information(self.output_directory, in_prefix="stack", in_format="tif")
+
+        # The pages are the images, so the indices offered for loading cover them
+        self.assertEqual(file_info.shape, (5, 4, 3))
+        images = loader.load(file_names=file_info.filenames, in_format="tif", indices=[1, file_info.shape[0], 2])
+        npt.assert_equal(images.data, data[1:5:2])
+
+    def test_load_native_pixel_depth_keeps_integer_dtype(self):
+        data = np.arange(3 * 5 * 7, dtype=np.uint16).reshape((3, 5, 7))
+        for i in range(3):
+            tifffile.imwrite(os.path.join(self.output_directory, f"image_{i:03}.tif"), data[i])
+
+        images = loader.load(self.output_directory, in_prefix="image", in_format="tif", dtype="native")
+
+        self.assertEqual(np.uint16, images.dtype)
+        npt.assert_equal(images.data, data)
+
+    def test_fitsread_into_converts_and_closes_file(self):
+        file_name = os.path.join(self.output_directory, "image.fits")
+        data = np.arange(12, dtype=np.uint16).reshape((3, 4))
+        fits.PrimaryHDU(data).writeto(file_name)
+        out = np.zeros((3, 4), dtype=np.float32)
+
+        _fitsread_into(file_name, out)
+
+        npt.assert_equal(out, data.astype(np.float32))
+        self.assertNotIn(file_name, [f.path for f in psutil.Process().open_files()])
+
+    def test_fitsread_into_raises_on_shape_mismatch(self):
+        file_name = os.path.join(self.output_directory, "image.fits")
+        fits.PrimaryHDU(np.zeros((3, 4), dtype=np.float32)).writeto(file_name)
+        self.assertRaises(ValueError, _fitsread_into, file_name, np.zeros((4, 4), dtype=np.float32))
+
+    def test_fitsread_closes_file(self):
+        file_name = os.path.join(self.output_directory, "image.fits")
+        fits.PrimaryHDU(np.ones((3, 4), dtype=np.float32)).writeto(file_name)
+
+        npt.assert_equal(_fitsread(file_name), np.ones((3, 4)))
+        self.assertNotIn(file_name, [f.path for f in psutil.Process().open_files()])
+
+    def _write_tiff_stack(self, data: np.ndarray):
+        for i, image in enumerate(data):
+            tifffile.imwrite(os.path.join(self.output_directory, f"image_{i:03}.tif"), image)
+
+    def test_load_with_roi_and_row_range(self):
+        data = np.arange(3 * 10 * 8, dtype=np.uint16).reshape((3, 10, 8))
+        self._write_tiff_stack(data)
+
+        images = loader.load(self.output_directory,
+                             in_prefix="image",
+                             in_format="tif",
+                             roi=SensibleROI(2, 1, 6, 9),
+                             row_range=(4, 7))
+
+        self.assertEqual((3, 3, 4), images.data.shape)
+        npt.assert_equal(images.data, data[:, 4:7, 2:6])
+        recorded = images.metadata[const.OPERATION_HISTORY][-1]
+        self.assertEqual(CropCoordinatesFilter.__name__, recorded[const.OPERATION_NAME])
+
+    def test_imread_into_roi_of_compressed_tiff_decodes_into_scratch(self):
+        data = np.arange(10 * 8, dtype=np.uint16).reshape((10, 8))
+        file_name = self._write_tiff(data)
+        out = np.zeros((3, 4), dtype=np.float32)
+        with mock.patch.object(tifffile.TiffPage, "is_memmappable", new_callable=mock.PropertyMock) as memmappable:
+            memmappable.return_value = False
+            _imread_into(file_name, out, SensibleROI(2, 4, 6, 7))
+        npt.assert_equal(out, data[4:7, 2:6])
+
+    def test_fitsread_into_roi(self):
+        file_name = os.path.join(self.output_directory, "image.fits")
+        data = np.arange(10 * 8, dtype=np.uint16).reshape((10, 8))
+        fits.PrimaryHDU(data).writeto(file_name)
+        out = np.zeros((3, 4), dtype=np.float32)
+
+        _fitsread_into(file_name, out, SensibleROI(2, 4, 6, 7))
+
+        npt.assert_equal(out, data[4:7, 2:6])
+
+    def test_fitsread_into_scaled_uint16(self):
+        # uint16 FITS files are stored as int16 with BZERO, so can't be memory mapped
+        file_name = os.path.join(self.output_directory, "image.fits")
+        data = np.arange(10 * 8, dtype=np.uint16).reshape((10, 8)) + 60000
+        fits.PrimaryHDU(data).writeto(file_name)
+        out = np.zeros((10, 8), dtype=np.uint16)
+        roi_out = np.zeros((3, 4), dtype=np.float32)
+
+        _fitsread_into(file_name, out)
+        _fitsread_into(file_name, roi_out, SensibleROI(2, 4, 6, 7))
+
+        npt.assert_equal(out, data)
+        npt.assert_equal(roi_out, data[4:7, 2:6])
+        self.assertNotIn(file_name, [f.path for f in psutil.Process().open_files()])
+
+    def test_load_multi_page_bigtiff(self):
+        file_name = os.path.join(self.output_directory, "stack.tif")
+        data = np.arange(8 * 5 * 6, dtype=np.uint16).reshape((8, 5, 6))
+        tifffile.imwrite(file_name, data, bigtiff=True, photometric='minisblack')
+
+        images = loader.load(file_names=[file_name], in_format="tif", indices=[1, 7, 2])
+
+        self.assertEqual((3, 5, 6), images.data.shape)
+        self.assertEqual(np.float32, images.data.dtype)
+        npt.assert_equal(images.data, data[1:7:2])
+
+    def test_load_multi_page_tiff_with_roi(self):
+        file_name = os.path.join(self.output_directory, "stack.tif")
+        data = np.arange(4 * 10 * 8, dtype=np.float32).reshape((4, 10, 8))
+        tifffile.imwrite(file_name, data, photometric='minisblack')
+
+        images = loader.load(file_names=[file_name], in_format="tif", roi=SensibleROI(2, 1, 6, 9))
+
+        npt.assert_equal(images.data, data[:, 1:9, 2:6])
+
+    def test_load_multi_page_tiff_opens_file_once(self):
+        file_name = os.path.join(self.output_directory, "stack.tif")
+        tifffile.imwrite(file_name, np.zeros((6, 5, 4), dtype=np.uint16), photometric='minisblack')
+        # The header is probed, and cached, before the pages are read
+        probe_image(file_name)
+
+        with mock.patch.object(loader.loader.tifffile, "TiffFile", wraps=tifffile.TiffFile) as tiff_file:
+            loader.load(file_names=[file_name], in_format="tif")
+
+        tiff_file.assert_called_once_with(file_name)
+
+    def test_load_multi_page_tiff_in_threads(self):
+        file_name = os.path.join(self.output_directory, "stack.tif")
+        # Enough pages that the load isn't run serially
+        data = np.random.default_rng(0).integers(0, 65535, (200, 16, 32), dtype=np.uint16)
+        tifffile.imwrite(file_name, data, photometric='minisblack')
+
+        with ThreadPoolExecutor(max_workers=8) as thread_pool:
+            with mock.patch.object(pm, "thread_pool", thread_pool):
+                images = loader.load(file_names=[file_name],
+                                     in_format="tif",
+                                     dtype=np.uint16,
+                                     executor=pu.Executor.THREAD)
+
+        npt.assert_equal(images.data, data)
+
+    def _write_stack_directory(self, name: str, data: np.ndarray) -> ImageParameters:
+        directory = os.path.join(self.output_directory, name)
+        os.mkdir(directory)
+        for i, image in enumerate(data):
+            tifffile.imwrite(os.path.join(directory, f"{name}_{i:03d}.tif"), image)
+        return ImageParameters(directory, "tif", name)
+
+    def test_load_stacks(self):
+        sample = np.arange(6 * 4 * 5, dtype=np.uint16).reshape((6, 4, 5))
+        flat = np.full((2, 4, 5), 7, dtype=np.uint16)
+        stacks = {
+            "sample": self._write_stack_directory("sample", sample),
+            "flat_before": self._write_stack_directory("flat", flat)
+        }
+        progress = loader.loader.Progress()
+
+        loaded = loader.load_stacks(stacks, np.float32, progress, concurrency=2)
+
+        npt.assert_equal(loaded["sample"].data, sample)
+        npt.assert_equal(loaded["flat_before"].data, flat)
+        self.assertEqual(8, progress.current_step)
+
+    def test_load_stacks_over_memory_budget_starts_one_at_a_time(self):
+        stacks = {
+            name: self._write_stack_directory(name, np.zeros((3, 4, 5), dtype=np.uint16))
+            for name in ["sample", "dark_before", "dark_after"]
+        }
+        running = []
+        most_running = []
+
+        def load_p(parameters, dtype, progress):
+            running.append(parameters)
+            most_running.append(len(running))
+            images = loader.loader.load(parameters.input_path, parameters.prefix, dtype=dtype, progress=progress)
+            running.remove(parameters)
+            return images
+
+        with mock.patch.object(loader.loader, "load_p", side_effect=load_p):
+            loader.load_stacks(stacks, np.float32, concurrency=3, memory_budget=3 * 4 * 5 * 4)
+
+        self.assertEqual(1, max(most_running))
+
+    def test_load_stacks_raises_error_of_failed_stack(self):
+        stacks = {
+            "sample": self._write_stack_directory("sample", np.zeros((3, 4, 5), dtype=np.uint16)),
+            "flat_before": ImageParameters(os.path.join(self.output_directory, "missing"), "tif", "flat")
+        }
+
+        with self.assertRaises(RuntimeError):
+            loader.load_stacks(stacks, np.float32)
+
+    def test_estimate_stack_bytes(self):
+        parameters = self._write_stack_directory("sample", np.zeros((6, 8, 10), dtype=np.uint16))
+        self.assertEqual(6 * 8 * 10 * 4, _estimate_stack_bytes(parameters, np.float32))
+        self.assertEqual(6 * 8 * 10 * 2, _estimate_stack_bytes(parameters, NATIVE_PIXEL_DEPTH))
+
+        parameters.roi = SensibleROI(0, 0, 6, 8)
+        parameters.binning = 2
+        self.assertEqual(6 * 4 * 3 * 4, _estimate_stack_bytes(parameters, np.float32))
+
+    def test_load_average_records_provenance(self):
+        parameters = self._write_stack_directory("flat", np.arange(4 * 3 * 5, dtype=np.uint16).reshape((4, 3, 5)))
+        parameters.average = "mean"
+        parameters.average_window = 3
+
+        images = loader.load_p(parameters, NATIVE_PIXEL_DEPTH, None)
+
+        self.assertEqual((1, 3, 5), images.data.shape)
+        npt.assert_allclose(images.data[0], np.arange(4 * 3 * 5).reshape((4, 3, 5)).mean(axis=0))
+        recorded = images.metadata[const.LOAD_AVERAGE]
+        self.assertEqual("mean", recorded[const.LOAD_AVERAGE_MODE])
+        self.assertEqual(3, recorded[const.LOAD_AVERAGE_WINDOW])
+        self.assertEqual(4, len(recorded[const.LOAD_AVERAGE_FILES]))
+        self.assertEqual(3 * 5 * 4, _estimate_stack_bytes(parameters, NATIVE_PIXEL_DEPTH))
+
+    def test_load_average_of_multi_page_tiff(self):
+        file_name = os.path.join(self.output_directory, "dark.tif")
+        data = np.arange(6 * 4 * 5, dtype=np.float32).reshape((6, 4, 5))
+        tifffile.imwrite(file_name, data, photometric='minisblack')
+
+        images = loader.load(file_names=[file_name], in_format="tif", indices=[0, 6, 2], average="median")
+
+        npt.assert_equal(images.data[0], np.median(data[0:6:2], axis=0))
+        self.assertEqual([f"{file_name}:0", f"{file_name}:2", f"{file_name}:4"],
+                         images.metadata[const.LOAD_AVERAGE][const.LOAD_AVERAGE_FILES])
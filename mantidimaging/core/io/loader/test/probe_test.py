@@ -0,0 +1,67 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+import os
+from unittest import mock
+
+import astropy.io.fits as fits
+import numpy as np
+import tifffile
+
+from mantidimaging.core.io.loader import probe
+from mantidimaging.test_helpers import FileOutputtingTestCase
+
+
+class ProbeTest(FileOutputtingTestCase):
+    def setUp(self):
+        super().setUp()
+        probe.clear_probe_cache()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.output_directory, name)
+
+    def test_probe_tiff(self):
+        file_name = self._path("image.tif")
+        tifffile.imwrite(file_name, np.zeros((5, 7), dtype=np.uint16))
+        self.assertEqual(probe.probe_image(file_name), probe.ImageInfo((5, 7), np.dtype(np.uint16), 1))
+
+    def test_probe_multi_page_tiff(self):
+        file_name = self._path("image.tiff")
+        tifffile.imwrite(file_name, np.zeros((3, 5, 7), dtype=np.float32), photometric='minisblack')
+        info = probe.probe_image(file_name)
+        self.assertEqual(info.shape, (5, 7))
+        self.assertEqual(info.dtype, np.float32)
+        self.assertEqual(info.pages, 3)
+
+    def test_probe_fits(self):
+        file_name = self._path("image.fits")
+        fits.PrimaryHDU(np.zeros((5, 7), dtype=np.float32)).writeto(file_name)
+        info = probe.probe_image(file_name)
+        self.assertEqual(info.shape, (5, 7))
+        self.assertEqual(info.dtype, np.dtype('>f4'))
+        self.assertEqual(info.pages, 1)
+
+    def test_probe_unsigned_fits(self):
+        file_name = self._path("image.fits")
+        fits.PrimaryHDU(np.zeros((5, 7), dtype=np.uint16)).writeto(file_name)
+        self.assertEqual(probe.probe_image(file_name).dtype, np.dtype('>u2'))
+
+    def test_probe_is_cached_until_file_changes(self):
+        file_name = self._path("image.tif")
+        tifffile.imwrite(file_name, np.zeros((5, 7), dtype=np.uint16))
+        with mock.patch.object(probe, "_probe_tiff", wraps=probe._probe_tiff) as probe_tiff:
+            probe.probe_image(file_name)
+            probe.probe_image(file_name)
+            self.assertEqual(probe_tiff.call_count, 1)
+
+            tifffile.imwrite(file_name, np.zeros((6, 8), dtype=np.uint16))
+            stat = os.stat(file_name)
+            os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertEqual(probe.probe_image(file_name).shape, (6, 8))
+            self.assertEqual(probe_tiff.call_count, 2)
+
+    def test_probe_does_not_decode_pixels(self):
+        file_name = self._path("image.tif")
+        tifffile.imwrite(file_name, np.zeros((5, 7), dtype=np.uint16))
+        with mock.patch.object(tifffile.TiffPage, "asarray") as asarray:
+            probe.probe_image(file_name)
+        asarray.assert_not_called()
@@ -2,18 +2,23 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 import datetime
 import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from logging import getLogger
-from typing import List, Union, Optional, Dict, Callable
+from typing import List, Union, Optional, Dict, Callable, Deque, Tuple
 
 import h5py
 import numpy as np
 from skimage import io as skio
 import astropy.io.fits as fits
+import tifffile
 
 from .utility import DEFAULT_IO_FILE_FORMAT
 from ..data.dataset import StrictDataset
 from ..data.imagestack import ImageStack
-from ..operations.rescale import RescaleFilter
+from ..parallel import reduction as pr
 from ..utility.data_containers import Indices
 from ..utility.progress_reporting import Progress
 from ..utility.version_check import CheckVersion
@@ -24,6 +29,24 @@ DEFAULT_ZFILL_LENGTH = 6
 DEFAULT_NAME_PREFIX = 'image'
 DEFAULT_NAME_POSTFIX = ''
 INT16_SIZE = 65536
+# Number of threads that image_save writes files with. Writing releases the GIL, so parallel storage is kept busy
+DEFAULT_SAVE_WORKERS = 8
+# The most bytes of images that are queued to be written at once
+SAVE_IN_FLIGHT_BYTES = 512 * 1024**2
+
+# HDF5 compression filters for NeXus output, which are available in any h5py install
+NEXUS_COMPRESSIONS = ("gzip", "lzf")
+# The most bytes of images that are converted at once while writing a NeXus file
+NEXUS_WRITE_CHUNK_BYTES = 64 * 1024**2
+
+COMPRESSION_NONE = "none"
+# Lossless compressions for TIFF output, by the name tifffile uses for them. Deflate only needs zlib, the others
+# need the optional imagecodecs package
+TIFF_COMPRESSIONS = {"deflate": "zlib", "zstd": "zstd", "lzw": "lzw"}
+_IMAGECODECS_COMPRESSIONS = ("zstd", "lzw")
+# TIFF predictors that make the compression of smoothly varying data more effective
+_PREDICTOR_HORIZONTAL = 2
+_PREDICTOR_FLOATING_POINT = 3
 
 
 def write_fits(data: np.ndarray, filename: str, overwrite: bool = False, description: Optional[str] = ""):
@@ -36,6 +59,45 @@ def write_img(data: np.ndarray, filename: str, overwrite: bool = False, descript
     skio.imsave(filename, data, description=description, metadata=None, software="Mantid Imaging")
 
 
+def _imagecodecs_available() -> bool:
+    try:
+        import imagecodecs  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_tiff_compressions() -> List[str]:
+    """
+    The TIFF compressions that can be used in this environment, including COMPRESSION_NONE
+    """
+    with_imagecodecs = _imagecodecs_available()
+    return [COMPRESSION_NONE] + [
+        name for name in TIFF_COMPRESSIONS if with_imagecodecs or name not in _IMAGECODECS_COMPRESSIONS
+    ]
+
+
+def write_compressed_tiff(data: np.ndarray,
+                          filename: str,
+                          overwrite: bool = False,
+                          description: Optional[str] = "",
+                          compression: str = "deflate"):
+    """
+    Write a losslessly compressed TIFF. A predictor is used when imagecodecs is available to encode it, the
+    floating point predictor for float data and the horizontal differencing predictor for integers.
+    """
+    predictor = None
+    if _imagecodecs_available():
+        predictor = _PREDICTOR_FLOATING_POINT if np.issubdtype(data.dtype, np.floating) else _PREDICTOR_HORIZONTAL
+    tifffile.imwrite(filename,
+                     data,
+                     description=description,
+                     metadata=None,
+                     software="Mantid Imaging",
+                     compression=TIFF_COMPRESSIONS[compression],
+                     predictor=predictor)
+
+
 def write_nxs(data: np.ndarray, filename: str, projection_angles: Optional[np.ndarray] = None, overwrite: bool = False):
     import h5py
     nxs = h5py.File(filename, 'w')
@@ -66,7 +128,9 @@ def image_save(images: ImageStack,
                name_postfix: str = DEFAULT_NAME_POSTFIX,
                indices: Union[List[int], Indices, None] = None,
                pixel_depth: Optional[str] = None,
-               progress: Optional[Progress] = None) -> Union[str, List[str]]:
+               progress: Optional[Progress] = None,
+               workers: Optional[int] = None,
+               compression: Optional[str] = None) -> Union[str, List[str]]:
     """
     Save image volume (3d) into a series of slices along the Z axis.
     The Z axis in the script is the ndarray.shape[0].
@@ -96,24 +160,37 @@ def image_save(images: ImageStack,
     :param pixel_depth: Defines the target pixel depth of the save operation so
            np.float32 or np.int16 will ensure the values are scaled
            correctly to these values.
+    :param workers: Number of files written at the same time. Defaults to DEFAULT_SAVE_WORKERS, or the number of
+           cores if that is more and the images are compressed
+    :param compression: Lossless compression for TIFF output, one of TIFF_COMPRESSIONS. None or COMPRESSION_NONE
+           writes uncompressed images. The images are compressed in parallel by the writer threads
     :returns: The filename/filenames of the saved data.
     """
     progress = Progress.ensure_instance(progress, task_name='Save')
 
+    if compression == COMPRESSION_NONE:
+        compression = None
+    if compression is not None:
+        if out_format not in ['tif', 'tiff']:
+            raise ValueError(f"Compression is only supported for TIFF output, not {out_format}")
+        if compression not in available_tiff_compressions():
+            raise ValueError(f"Compression must be one of {available_tiff_compressions()}, got {compression}")
+    if workers is None:
+        workers = DEFAULT_SAVE_WORKERS if compression is None else max(DEFAULT_SAVE_WORKERS, os.cpu_count() or 1)
+
     # expand the path for plugins that don't do it themselves
     output_dir = os.path.abspath(os.path.expanduser(output_dir))
     make_dirs_if_needed(output_dir, overwrite_all)
 
-    # Define current parameters
-    min_value: float = np.nanmin(images.data)
-    max_value: float = np.nanmax(images.data)
-    int_16_slope = max_value / INT16_SIZE
-
     # Do rescale if needed.
+    min_value, max_value = 0.0, 0.0
     if pixel_depth is None or pixel_depth == "float32":
         rescale_params: Optional[Dict[str, Union[str, float]]] = None
         rescale_info = ""
     elif pixel_depth == "int16":
+        # Found in a single parallel pass, which is only needed for the rescale
+        min_value, max_value = pr.min_max(images.shared_array)
+        int_16_slope = max_value / INT16_SIZE
         # turn the offset to string otherwise json throws a TypeError when trying to save float32
         rescale_params = {"offset": str(min_value), "slope": int_16_slope}
         rescale_info = "offset = {offset} \n slope = {slope}".format(**rescale_params)
@@ -138,6 +215,8 @@ def image_save(images: ImageStack,
     else:
         if out_format in ['fit', 'fits']:
             write_func: Callable[[np.ndarray, str, bool, Optional[str]], None] = write_fits
+        elif compression is not None:
+            write_func = partial(write_compressed_tiff, compression=compression)
         else:
             # pass all other formats to skimage
             write_func = write_img
@@ -150,37 +229,110 @@ def image_save(images: ImageStack,
         for i in range(len(names)):
             names[i] = os.path.join(output_dir, names[i])
 
+        def write_image(idx: int) -> None:
+            # Overwrite images with the copy that has been rescaled.
+            if pixel_depth == "int16":
+                output_data = _rescale_to_uint16(images.data[idx], min_value, max_value)
+                write_func(output_data, names[idx], overwrite_all, rescale_info)
+            else:
+                write_func(data[idx, :, :], names[idx], overwrite_all, rescale_info)
+
+        # Each image is queued as a view of the stack, and rescaled into a buffer of its writer thread
+        image_bytes = data[0].nbytes if num_images else 1
+        max_in_flight = max(1, SAVE_IN_FLIGHT_BYTES // max(image_bytes, 1))
         with progress:
-            for idx in range(num_images):
-                # Overwrite images with the copy that has been rescaled.
-                if pixel_depth == "int16":
-                    output_data = RescaleFilter.filter_array(np.copy(images.data[idx]),
-                                                             min_input=min_value,
-                                                             max_input=max_value,
-                                                             max_output=INT16_SIZE - 1).astype(np.uint16)
-                    write_func(output_data, names[idx], overwrite_all, rescale_info)
-                else:
-                    write_func(data[idx, :, :], names[idx], overwrite_all, rescale_info)
+            _write_images(write_image, names, progress, workers, max_in_flight)
+
+        return names
+
+
+# Buffers that the images are rescaled in before they are written, kept per thread and reused for every image
+_rescale_buffers = threading.local()
+
 
+def _rescale_to_uint16(image: np.ndarray, min_value: float, max_value: float) -> np.ndarray:
+    """
+    Map the range min_value to max_value of an image onto the full range of uint16, clipping values outside it.
+    NaNs become 0. Equivalent to RescaleFilter.filter_array followed by a cast, but done with an affine transform
+    in float32 buffers that are reused, so no new arrays are allocated for each image.
+
+    :return: A uint16 buffer holding the rescaled image, which is reused by the next call in this thread
+    """
+    scratch = getattr(_rescale_buffers, "scratch", None)
+    if scratch is None or scratch.shape != image.shape:
+        scratch = _rescale_buffers.scratch = np.empty(image.shape, dtype=np.float32)
+        _rescale_buffers.out = np.empty(image.shape, dtype=np.uint16)
+    out = _rescale_buffers.out
+
+    max_output = INT16_SIZE - 1
+    scale = max_output / (max_value - min_value) if max_value > min_value else 0.0
+    np.subtract(image, min_value, out=scratch, casting="unsafe")
+    np.multiply(scratch, scale, out=scratch)
+    # fmax and fmin replace NaN with the bound, so NaNs become 0
+    np.fmax(scratch, 0, out=scratch)
+    np.fmin(scratch, max_output, out=scratch)
+    np.copyto(out, scratch, casting="unsafe")
+    return out
+
+
+def _write_images(write_image: Callable[[int], None], names: List[str], progress: Progress, workers: int,
+                  max_in_flight: int) -> None:
+    """
+    Write each image with a pool of threads. At most max_in_flight images are queued at once, and progress is
+    reported in the order of the images. Once a write fails no more are started, and all the failures are raised
+    together.
+    """
+    failures: List[str] = []
+    in_flight: Deque[Tuple[int, Future]] = deque()
+    next_index = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="mi_save") as executor:
+        while next_index < len(names) or in_flight:
+            while next_index < len(names) and len(in_flight) < max_in_flight and not failures:
+                in_flight.append((next_index, executor.submit(write_image, next_index)))
+                next_index += 1
+            if failures:
+                next_index = len(names)
+            if not in_flight:
+                break
+
+            idx, future = in_flight.popleft()
+            try:
+                future.result()
+            except Exception as exc:
+                LOG.error(f"Could not save {names[idx]}: {exc}")
+                failures.append(f"{names[idx]}: {exc}")
+                continue
+            try:
                 progress.update(msg='Image')
+            except RuntimeError:
+                # Cancelled, so the queued images that haven't started are not written
+                for _, queued in in_flight:
+                    queued.cancel()
+                raise
 
-        return names
+    if failures:
+        raise RuntimeError(f"Could not save {len(failures)} images:\n" + "\n".join(failures))
 
 
-def nexus_save(dataset: StrictDataset, path: str, sample_name: str):
+def nexus_save(dataset: StrictDataset, path: str, sample_name: str, compression: Optional[str] = None):
     """
-    Uses information from a StrictDataset to create a NeXus file.
+    Uses information from a StrictDataset to create a NeXus file. The images are written to the file in chunks as
+    they are converted, so saving needs little memory beyond the dataset.
     :param dataset: The dataset to save as a NeXus file.
     :param path: The NeXus file path.
     :param sample_name: The sample name.
+    :param compression: HDF5 compression filter for the image data, one of NEXUS_COMPRESSIONS, or None.
     """
+    if compression is not None and compression not in NEXUS_COMPRESSIONS:
+        raise ValueError(f"Compression must be one of {NEXUS_COMPRESSIONS}, got {compression}")
+
     try:
-        nexus_file = h5py.File(path, "w", driver="core")
+        nexus_file = h5py.File(path, "w")
     except OSError as e:
         raise RuntimeError("Unable to save NeXus file. " + str(e))
 
     try:
-        _nexus_save(nexus_file, dataset, sample_name)
+        _nexus_save(nexus_file, dataset, sample_name, compression)
     except OSError as e:
         nexus_file.close()
         os.remove(path)
@@ -189,12 +341,13 @@ def nexus_save(dataset: StrictDataset, path: str, sample_name: str):
     nexus_file.close()
 
 
-def _nexus_save(nexus_file: h5py.File, dataset: StrictDataset, sample_name: str):
+def _nexus_save(nexus_file: h5py.File, dataset: StrictDataset, sample_name: str, compression: Optional[str] = None):
     """
     Takes a NeXus file and writes the StrictDataset information to it.
     :param nexus_file: The NeXus file.
     :param dataset: The StrictDataset.
     :param sample_name: The sample name.
+    :param compression: HDF5 compression filter for the image data, or None.
     """
     # Top-level group
     entry = nexus_file.create_group("entry1")
@@ -217,10 +370,10 @@ def _nexus_save(nexus_file: h5py.File, dataset: StrictDataset, sample_name: str)
 
     # instrument data
     combined_data_shape = (sum([len(arr) for arr in dataset.nexus_arrays]), ) + dataset.nexus_arrays[0].shape[1:]
-    detector.create_dataset("data", shape=combined_data_shape, dtype="uint16")
+    detector_data = _create_image_dataset(detector, "data", combined_data_shape, compression)
     index = 0
     for arr in dataset.nexus_arrays:
-        detector["data"][index:index + arr.shape[0]] = arr
+        _write_in_chunks(detector_data, index, arr)
         index += arr.shape[0]
     detector.create_dataset("image_key", data=dataset.image_keys)
 
@@ -241,14 +394,15 @@ def _nexus_save(nexus_file: h5py.File, dataset: StrictDataset, sample_name: str)
     data["image_key"] = detector["image_key"]
 
     for recon in dataset.recons:
-        _save_recon_to_nexus(nexus_file, recon)
+        _save_recon_to_nexus(nexus_file, recon, compression)
 
 
-def _save_recon_to_nexus(nexus_file: h5py.File, recon: ImageStack):
+def _save_recon_to_nexus(nexus_file: h5py.File, recon: ImageStack, compression: Optional[str] = None):
     """
     Saves a recon to a NeXus file.
     :param nexus_file: The NeXus file.
     :param recon: The recon data.
+    :param compression: HDF5 compression filter for the recon data, or None.
     """
 
     recon_entry = nexus_file.create_group(recon.name)
@@ -282,8 +436,9 @@ def _save_recon_to_nexus(nexus_file: h5py.File, recon: ImageStack):
     data = recon_entry.create_group("data")
     _set_nx_class(data, "NXdata")
 
-    data.create_dataset("data", shape=recon.data.shape, dtype="uint16")
-    data["data"][:] = _rescale_recon_data(recon.data)
+    recon_data = _create_image_dataset(data, "data", recon.data.shape, compression)
+    offset, scale = _recon_rescale_parameters(recon.data)
+    _write_in_chunks(recon_data, 0, recon.data, lambda chunk: (chunk - offset) * scale)
 
 
 def _set_nx_class(group: h5py.Group, class_name: str):
@@ -295,6 +450,59 @@ def _set_nx_class(group: h5py.Group, class_name: str):
     group.attrs["NX_class"] = np.string_(class_name)
 
 
+def _create_image_dataset(group: h5py.Group, name: str, shape: Tuple[int, ...],
+                          compression: Optional[str]) -> h5py.Dataset:
+    """
+    Creates a uint16 dataset for a stack of images. A compressed dataset is chunked by image, as HDF5 only applies
+    filters to chunked data.
+    :param group: The group to create the dataset in.
+    :param name: The dataset name.
+    :param shape: The shape of the image stack.
+    :param compression: HDF5 compression filter, or None.
+    :return: The created dataset.
+    """
+    if compression is None:
+        return group.create_dataset(name, shape=shape, dtype="uint16")
+    return group.create_dataset(name,
+                                shape=shape,
+                                dtype="uint16",
+                                chunks=(1, ) + tuple(shape[1:]),
+                                compression=compression,
+                                shuffle=True)
+
+
+def _write_in_chunks(dataset: h5py.Dataset,
+                     index: int,
+                     arr: np.ndarray,
+                     transform: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+    """
+    Writes a stack of images into a dataset a few images at a time, so that only one chunk is converted to the
+    dtype of the dataset at once.
+    :param dataset: The dataset to write to.
+    :param index: The index in the dataset of the first image.
+    :param arr: The images.
+    :param transform: Optional function applied to each chunk before it is written.
+    """
+    image_bytes = max(int(np.prod(arr.shape[1:])) * arr.itemsize, 1)
+    chunk_len = max(NEXUS_WRITE_CHUNK_BYTES // image_bytes, 1)
+    for start in range(0, arr.shape[0], chunk_len):
+        chunk = arr[start:start + chunk_len]
+        if transform is not None:
+            chunk = transform(chunk)
+        dataset[index + start:index + start + chunk.shape[0]] = chunk
+
+
+def _recon_rescale_parameters(data: np.ndarray) -> Tuple[float, float]:
+    """
+    Finds the offset and scale that _rescale_recon_data applies to recon data, without changing the data.
+    :param data: The recon data.
+    :return: The offset to subtract and the scale to then multiply by.
+    """
+    offset = min(float(np.min(data)), 0.0)
+    data_range = float(np.max(data)) - offset
+    return offset, np.iinfo("uint16").max / data_range if data_range > 0 else 0.0
+
+
 def _rescale_recon_data(data: np.ndarray) -> np.ndarray:
     """
     Rescales recon data so that it can be converted to uint.
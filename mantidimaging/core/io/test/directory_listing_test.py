@@ -0,0 +1,54 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+import os
+from pathlib import Path
+from unittest import mock
+
+from mantidimaging.core.io import directory_listing
+from mantidimaging.test_helpers import FileOutputtingTestCase
+
+
+class DirectoryListingTest(FileOutputtingTestCase):
+    def setUp(self):
+        super().setUp()
+        directory_listing.clear_listing_cache()
+
+    def _touch(self, *names: str) -> None:
+        for name in names:
+            Path(self.output_directory, name).touch()
+
+    def _age_directory(self, seconds: int = 60) -> None:
+        stat = os.stat(self.output_directory)
+        os.utime(self.output_directory, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 10**9))
+
+    def test_list_directory(self):
+        self._touch("b.tif", "a.tif")
+        self.assertEqual(("a.tif", "b.tif"), directory_listing.list_directory(self.output_directory))
+
+    def test_missing_directory_is_empty(self):
+        self.assertEqual((), directory_listing.list_directory(os.path.join(self.output_directory, "missing")))
+
+    def test_listing_is_cached_until_directory_changes(self):
+        self._touch("a.tif")
+        self._age_directory()
+        with mock.patch.object(directory_listing.os, "scandir", wraps=os.scandir) as scandir:
+            directory_listing.list_directory(self.output_directory)
+            directory_listing.list_directory(Path(self.output_directory))
+            self.assertEqual(1, scandir.call_count)
+
+            self._touch("b.tif")
+            self._age_directory(30)
+            self.assertEqual(("a.tif", "b.tif"), directory_listing.list_directory(self.output_directory))
+            self.assertEqual(2, scandir.call_count)
+
+    def test_recently_changed_directory_is_not_cached(self):
+        self._touch("a.tif")
+        with mock.patch.object(directory_listing.os, "scandir", wraps=os.scandir) as scandir:
+            directory_listing.list_directory(self.output_directory)
+            directory_listing.list_directory(self.output_directory)
+            self.assertEqual(2, scandir.call_count)
+
+    def test_glob_directory(self):
+        self._touch("flat_1.tif", "flat_2.tiff", "dark_1.tif", ".flat_3.tif")
+        found = directory_listing.glob_directory(self.output_directory, "*flat*.tif")
+        self.assertEqual([os.path.join(os.path.abspath(self.output_directory), "flat_1.tif")], found)
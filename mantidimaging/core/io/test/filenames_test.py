@@ -103,38 +103,35 @@ class FilenameGroupTest(FileOutputtingTestCase):
         self.assertEqual(all_files[2], Path("foo", "IMAT_Flower_Tomo_000002.tif"))
 
     def test_find_all_files(self):
-        file_list = [Path(f"IMAT_Flower_Tomo_{i:06d}.tif") for i in range(10)]
-        path_mock = mock.Mock()
-        path_mock.iterdir.return_value = file_list
+        file_list = [f"IMAT_Flower_Tomo_{i:06d}.tif" for i in range(10)]
 
         pattern = FilenamePattern.from_name("IMAT_Flower_Tomo_000007.tif")
-        fg = FilenameGroup(path_mock, pattern, [])
-        fg.find_all_files()
+        fg = FilenameGroup(Path("foo"), pattern, [])
+        with mock.patch("mantidimaging.core.io.filenames.list_directory", return_value=file_list):
+            fg.find_all_files()
 
         self.assertEqual(fg.all_indexes, list(range(10)))
 
     def test_find_all_files_different_digits(self):
-        file_list = [Path(f"IMAT_Flower_Tomo_{i:01d}.tif") for i in range(5, 15)]
-        path_mock = mock.Mock()
-        path_mock.iterdir.return_value = file_list
+        file_list = [f"IMAT_Flower_Tomo_{i:01d}.tif" for i in range(5, 15)]
 
         pattern = FilenamePattern.from_name("IMAT_Flower_Tomo_1.tif")
-        fg = FilenameGroup(path_mock, pattern, [])
-        fg.find_all_files()
+        fg = FilenameGroup(Path("foo"), pattern, [])
+        with mock.patch("mantidimaging.core.io.filenames.list_directory", return_value=file_list):
+            fg.find_all_files()
 
         self.assertEqual(fg.all_indexes, list(range(5, 15)))
 
     def test_find_all_files_metadata(self):
-        file_list = [Path(f"IMAT_Flower_Tomo_{i:06d}.tif") for i in range(10)]
-        file_list.append(Path("IMAT_Flower_Tomo.json"))
-        path_mock = mock.Mock()
-        path_mock.iterdir.return_value = file_list
+        file_list = [f"IMAT_Flower_Tomo_{i:06d}.tif" for i in range(10)]
+        file_list.append("IMAT_Flower_Tomo.json")
 
         pattern = FilenamePattern.from_name("IMAT_Flower_Tomo_000000.tif")
-        fg = FilenameGroup(path_mock, pattern, [])
-        fg.find_all_files()
+        fg = FilenameGroup(Path("foo"), pattern, [])
+        with mock.patch("mantidimaging.core.io.filenames.list_directory", return_value=file_list):
+            fg.find_all_files()
 
-        self.assertEqual(fg.metadata_path, Path("IMAT_Flower_Tomo.json"))
+        self.assertEqual(fg.metadata_path, Path("foo", "IMAT_Flower_Tomo.json"))
 
     def test_find_log(self):
         log = Path(self.output_directory, "tomo.txt")
@@ -2,19 +2,23 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 import datetime
 import os
+import threading
+import time
 import unittest
 from unittest import mock
 
 import h5py
 import numpy as np
 import numpy.testing as npt
+import tifffile
 
 import mantidimaging.test_helpers.unit_test_helper as th
 from mantidimaging.core.data import ImageStack
 from mantidimaging.core.data.dataset import StrictDataset
 from mantidimaging.core.io import loader
 from mantidimaging.core.io import saver
-from mantidimaging.core.io.saver import _rescale_recon_data
+from mantidimaging.core.io.saver import _rescale_recon_data, _rescale_to_uint16
+from mantidimaging.core.operations.rescale import RescaleFilter
 from mantidimaging.core.utility.version_check import CheckVersion
 from mantidimaging.helper import initialise_logging
 from mantidimaging.test_helpers import FileOutputtingTestCase
@@ -39,6 +43,26 @@ def test_rescale_negative_recon_data():
     assert int(np.max(_rescale_recon_data(recon.data))) == np.iinfo("uint16").max
 
 
+def test_rescale_to_uint16_matches_rescale_filter():
+    image = np.random.default_rng(0).uniform(-5, 20, (16, 12)).astype(np.float32)
+
+    expected = RescaleFilter.filter_array(np.copy(image), min_input=-2, max_input=15,
+                                          max_output=saver.INT16_SIZE - 1).astype(np.uint16)
+
+    npt.assert_allclose(_rescale_to_uint16(image, -2, 15), expected, atol=1)
+
+
+def test_rescale_to_uint16_nan_and_constant_range():
+    image = np.array([[np.nan, 1.0], [2.0, 3.0]], dtype=np.float32)
+    npt.assert_equal(_rescale_to_uint16(image, 1.0, 3.0), [[0, 0], [32767, 65535]])
+    npt.assert_equal(_rescale_to_uint16(image, 2.0, 2.0), 0)
+
+
+def test_rescale_to_uint16_reuses_buffer():
+    image = np.ones((4, 4), dtype=np.float32)
+    assert _rescale_to_uint16(image, 0, 1) is _rescale_to_uint16(image * 2, 0, 2)
+
+
 class IOTest(FileOutputtingTestCase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -164,6 +188,84 @@ class IOTest(FileOutputtingTestCase):
 
         npt.assert_equal(loaded_images.data, images.data)
 
+    def test_image_save_in_parallel_writes_every_image(self):
+        images = th.generate_images((12, 8, 10))
+        progress = mock.Mock()
+        progress.should_cancel = False
+
+        names = saver.image_save(images, self.output_directory, out_format="tif", progress=progress, workers=4)
+
+        self.assertEqual(12, len(names))
+        self.assertEqual(12, len([c for c in progress.update.call_args_list if c.kwargs.get("msg") == "Image"]))
+        loaded = loader.load(self.output_directory, in_format="tif")
+        npt.assert_equal(loaded.data, images.data)
+
+    def test_image_save_reports_failed_files(self):
+        images = th.generate_images((6, 8, 10))
+
+        def write_img(data, filename, overwrite, description):
+            if filename.endswith("000003.tif"):
+                raise OSError("disk full")
+
+        with mock.patch.object(saver, "write_img", side_effect=write_img):
+            with self.assertRaisesRegex(RuntimeError, "Could not save 1 images:\n.*image_000003.tif: disk full"):
+                saver.image_save(images, self.output_directory, out_format="tif")
+
+    def test_write_images_bounds_queued_images(self):
+        release = threading.Event()
+        lock = threading.Lock()
+        started = []
+        written = []
+        most_in_flight = 0
+
+        def write_image(idx):
+            nonlocal most_in_flight
+            with lock:
+                started.append(idx)
+                most_in_flight = max(most_in_flight, len(started) - len(written))
+            release.wait(timeout=10)
+            with lock:
+                written.append(idx)
+
+        progress = mock.Mock()
+        # More workers than images allowed in flight, so only the bound stops more writes starting
+        writer = threading.Thread(target=saver._write_images,
+                                  args=(write_image, [f"image_{i}" for i in range(20)], progress),
+                                  kwargs={"workers": 4, "max_in_flight": 2})
+        writer.start()
+        try:
+            deadline = time.monotonic() + 5
+            while len(started) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # Give the workers time to start any further writes while the first ones are blocked
+            time.sleep(0.2)
+            with lock:
+                self.assertEqual(2, len(started))
+        finally:
+            release.set()
+            writer.join(timeout=10)
+
+        self.assertLessEqual(most_in_flight, 2)
+        self.assertEqual(sorted(written), list(range(20)))
+        self.assertEqual(20, progress.update.call_count)
+
+    def test_image_save_compressed_tiff_round_trip(self):
+        images = th.generate_images((5, 8, 10))
+
+        names = saver.image_save(images, self.output_directory, out_format="tif", compression="deflate")
+
+        with tifffile.TiffFile(names[0]) as tif:
+            self.assertEqual(tifffile.COMPRESSION.ADOBE_DEFLATE, tif.pages[0].compression)
+        loaded = loader.load(self.output_directory, in_format="tif")
+        npt.assert_equal(loaded.data, images.data)
+
+    def test_image_save_compression_needs_tiff(self):
+        images = th.generate_images((2, 8, 10))
+        with self.assertRaisesRegex(ValueError, "only supported for TIFF"):
+            saver.image_save(images, self.output_directory, out_format="fits", compression="deflate")
+        with self.assertRaisesRegex(ValueError, "Compression must be one of"):
+            saver.image_save(images, self.output_directory, out_format="tif", compression="jpeg")
+
     def test_metadata_round_trip(self):
         # Create dummy image stack
         sample = th.gen_img_numpy_rand()
@@ -299,6 +401,45 @@ class IOTest(FileOutputtingTestCase):
         saver.nexus_save(StrictDataset(th.generate_images()), "path", "sample-name")
         file_mock.return_value.close.assert_called_once()
 
+    def test_nexus_save_streams_images_to_disk(self):
+        sample = th.generate_images((10, 8, 10))
+        sample.data *= 12
+        sample._projection_angles = sample.projection_angles()
+        sd = StrictDataset(sample)
+        recon = th.generate_images((6, 8, 10), seed=2)
+        recon.name = "Recon"
+        recon_data = recon.data.copy()
+        sd.recons.append(recon)
+        path = os.path.join(self.output_directory, "dataset.nxs")
+
+        # Chunks of 3 images, so the last chunk of each stack is partial
+        with mock.patch("mantidimaging.core.io.saver.NEXUS_WRITE_CHUNK_BYTES", 3 * 8 * 10 * 4):
+            saver.nexus_save(sd, path, "sample-name")
+
+        with h5py.File(path, "r") as nexus_file:
+            npt.assert_array_equal(np.array(nexus_file["entry1"]["tomo_entry"]["instrument"]["detector"]["data"]),
+                                   sample.data.astype("uint16"))
+            saved_recon = np.array(nexus_file["Recon"]["data"]["data"])
+        npt.assert_array_equal(recon.data, recon_data)
+        assert np.max(np.abs(saved_recon.astype(int) - _rescale_recon_data(recon_data).astype("uint16"))) <= 1
+
+    def test_nexus_save_compressed(self):
+        sample = th.generate_images((4, 8, 10))
+        sample._projection_angles = sample.projection_angles()
+        path = os.path.join(self.output_directory, "dataset.nxs")
+
+        saver.nexus_save(StrictDataset(sample), path, "sample-name", compression="gzip")
+
+        with h5py.File(path, "r") as nexus_file:
+            detector_data = nexus_file["entry1"]["tomo_entry"]["instrument"]["detector"]["data"]
+            self.assertEqual("gzip", detector_data.compression)
+            self.assertEqual((1, 8, 10), detector_data.chunks)
+            npt.assert_array_equal(np.array(detector_data), sample.data.astype("uint16"))
+
+    def test_nexus_save_invalid_compression_raises(self):
+        with self.assertRaisesRegex(ValueError, "Compression must be one of"):
+            saver.nexus_save(StrictDataset(th.generate_images()), "path", "sample-name", compression="zstd")
+
     @mock.patch("mantidimaging.core.io.saver._save_recon_to_nexus")
     def test_save_recons_if_present(self, recon_save_mock: mock.Mock):
         sample = th.generate_images()
@@ -10,6 +10,8 @@ from logging import getLogger, Logger
 from pathlib import Path
 from typing import List, Optional, Union, Tuple
 
+from mantidimaging.core.io.directory_listing import glob_directory
+
 DEFAULT_IO_FILE_FORMAT = 'tif'
 
 SIMILAR_FILE_EXTENSIONS = (('tif', 'tiff'), ('fit', 'fits'))
@@ -79,7 +81,7 @@ def get_file_names(path: Optional[Union[Path, str]],
     extensions = get_candidate_file_extensions(img_format)
     files_match = []
     for ext in extensions:
-        files_match = glob.glob(os.path.join(path, "{0}*{1}".format(prefix, ext)))
+        files_match = _glob(os.path.join(path, "{0}*{1}".format(prefix, ext)))
 
         if len(files_match) > 0:
             break
@@ -96,6 +98,16 @@ def get_file_names(path: Optional[Union[Path, str]],
     return files_match
 
 
+def _glob(pattern: str) -> List[str]:
+    """
+    Glob a pattern, using the cached listing of its directory unless the directory part is itself a pattern
+    """
+    directory, name_pattern = os.path.split(pattern)
+    if glob.has_magic(directory):
+        return glob.glob(pattern)
+    return glob_directory(directory, name_pattern)
+
+
 def find_images_in_same_directory(sample_dirname: Path, type: str, suffix: str,
                                   image_format: str) -> Optional[List[str]]:
     prefix_list = [f"*{type}", f"*{type.lower()}", f"*{type}_{suffix}", f"*{type.lower()}_{suffix}"]
@@ -6,7 +6,17 @@ OPERATION_NAME = 'name'
 TIMESTAMP = 'timestamp'
 OPERATION_KEYWORD_ARGS = 'kwargs'
 OPERATION_DISPLAY_NAME = 'display_name'
+OPERATION_PARTIAL = 'partial'
+OPERATION_PROCESSED_RANGE = 'processed_range'
+OPERATION_PROCESSED_COUNT = 'processed_count'
 PIXEL_SIZE = 'pixel_size'
+LOAD_BINNING = 'load_binning'
+LOAD_BINNING_FACTOR = 'factor'
+LOAD_BINNING_MODE = 'mode'
+LOAD_AVERAGE = 'load_average'
+LOAD_AVERAGE_MODE = 'mode'
+LOAD_AVERAGE_WINDOW = 'window'
+LOAD_AVERAGE_FILES = 'files'
 LOG_FILE = 'log_file'
 
 OPERATION_NAME_COR_TILT_FINDING = 'cor_tilt_finding'
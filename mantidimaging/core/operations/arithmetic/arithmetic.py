@@ -23,6 +23,7 @@ class ArithmeticFilter(BaseFilter):
 
     """
     filter_name = "Arithmetic"
+    releases_gil = True
 
     @classmethod
     def filter_func(cls,
@@ -46,7 +47,12 @@ class ArithmeticFilter(BaseFilter):
             raise ValueError("Unable to proceed with operation because division/multiplication value is zero.")
 
         params = {'div': div_val, 'mult': mult_val, 'add': add_val, 'sub': sub_val}
-        ps.run_compute_func(cls.compute_function, images.data.shape[0], images.shared_array, params, progress)
+        ps.run_compute_func(cls.compute_function,
+                            images.data.shape[0],
+                            images.shared_array,
+                            params,
+                            progress,
+                            executor=cls.executor())
 
         return images
 
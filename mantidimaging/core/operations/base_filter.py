@@ -8,6 +8,7 @@ from enum import Enum, auto
 import numpy as np
 
 from mantidimaging.core.data import ImageStack
+from mantidimaging.core.parallel import utility as pu
 
 if TYPE_CHECKING:
     from PyQt5.QtWidgets import QFormLayout, QWidget  # noqa: F401   # pragma: no cover
@@ -26,6 +27,12 @@ class BaseFilter:
     link_histograms = False
     show_negative_overlay = True
     operate_on_sinograms = False
+    # Set if the per image work releases the GIL (numpy ufuncs, scipy.ndimage filters), so that it can run in
+    # the thread pool on the data in place instead of copying it to the process pool
+    releases_gil = False
+    # Set if the filter only moves or selects pixel values, so a stack kept in its native integer dtype does not need
+    # to be converted to floating point first
+    keeps_integer_data = False
 
     SINOGRAM_FILTER_INFO = "This filter will work on a\nsinogram view of the data."
 
@@ -91,6 +98,13 @@ class BaseFilter:
     def group_name() -> FilterGroup:
         return FilterGroup.NoGroup
 
+    @classmethod
+    def executor(cls) -> pu.Executor:
+        """
+        The executor to pass to ps.execute and ps.run_compute_func when running this filter
+        """
+        return pu.Executor.THREAD if cls.releases_gil else pu.Executor.AUTO
+
     @staticmethod
     def get_images_from_stack(widget: "DatasetSelectorWidgetView", msg: str) -> Optional[ImageStack]:
         stack_uuid = widget.current()
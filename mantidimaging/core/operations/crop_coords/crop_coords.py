@@ -28,6 +28,7 @@ class CropCoordinatesFilter(BaseFilter):
     """
     filter_name = "Crop Coordinates"
     link_histograms = True
+    keeps_integer_data = True
 
     @staticmethod
     def filter_func(images: ImageStack,
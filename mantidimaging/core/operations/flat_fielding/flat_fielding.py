@@ -10,7 +10,7 @@ import numpy as np
 from mantidimaging import helper as h
 from mantidimaging.core.data import ImageStack
 from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup
-from mantidimaging.core.parallel import utility as pu, shared as ps
+from mantidimaging.core.parallel import utility as pu, shared as ps, reduction as pr
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.gui.utility.qt_helpers import Type
 from mantidimaging.gui.widgets.dataset_selector import DatasetSelectorWidgetView
@@ -61,6 +61,7 @@ class FlatFieldFilter(BaseFilter):
     or this will introduce additional noise in the sample. Remove outliers before flat-fielding.
     """
     filter_name = 'Flat-fielding'
+    releases_gil = True
 
     @staticmethod
     def filter_func(images: ImageStack,
@@ -87,17 +88,17 @@ class FlatFieldFilter(BaseFilter):
 
         if selected_flat_fielding == "Both, concatenated" and flat_after is not None and flat_before is not None \
                 and dark_after is not None and dark_before is not None:
-            flat_avg = (flat_before.data.mean(axis=0) + flat_after.data.mean(axis=0)) / 2.0
+            flat_avg = (_average_image(flat_before) + _average_image(flat_after)) / 2.0
             if use_dark:
-                dark_avg = (dark_before.data.mean(axis=0) + dark_after.data.mean(axis=0)) / 2.0
+                dark_avg = (_average_image(dark_before) + _average_image(dark_after)) / 2.0
         elif selected_flat_fielding == "Only Before" and flat_before is not None and dark_before is not None:
-            flat_avg = flat_before.data.mean(axis=0)
+            flat_avg = _average_image(flat_before)
             if use_dark:
-                dark_avg = dark_before.data.mean(axis=0)
+                dark_avg = _average_image(dark_before)
         elif selected_flat_fielding == "Only After" and flat_after is not None and dark_after is not None:
-            flat_avg = flat_after.data.mean(axis=0)
+            flat_avg = _average_image(flat_after)
             if use_dark:
-                dark_avg = dark_after.data.mean(axis=0)
+                dark_avg = _average_image(dark_after)
         else:
             raise ValueError("selected_flat_fielding not in:", valid_methods)
 
@@ -257,6 +258,13 @@ class FlatFieldFilter(BaseFilter):
         return FilterGroup.Basic
 
 
+def _average_image(images: ImageStack) -> np.ndarray:
+    if images.num_images == 1:
+        # Already averaged when it was loaded
+        return images.data[0]
+    return pr.mean(images.shared_array, axis=0)
+
+
 def _divide(data, norm_divide):
     np.true_divide(data, norm_divide, out=data)
 
@@ -304,11 +312,11 @@ def _execute(images: ImageStack, flat=None, dark=None, progress=None):
         # subtract the dark from all images
         do_subtract = ps.create_partial(_subtract, fwd_function=ps.inplace_second_2d)
         arrays = [images.shared_array, shared_dark]
-        ps.execute(do_subtract, arrays, images.data.shape[0], progress)
+        ps.execute(do_subtract, arrays, images.data.shape[0], progress, executor=FlatFieldFilter.executor())
 
         # divide the data by (flat - dark)
         do_divide = ps.create_partial(_divide, fwd_function=ps.inplace_second_2d)
         arrays = [images.shared_array, norm_divide]
-        ps.execute(do_divide, arrays, images.data.shape[0], progress)
+        ps.execute(do_divide, arrays, images.data.shape[0], progress, executor=FlatFieldFilter.executor())
 
     return images
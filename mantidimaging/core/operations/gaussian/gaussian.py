@@ -24,6 +24,7 @@ class GaussianFilter(BaseFilter):
     """
     filter_name = "Gaussian"
     link_histograms = True
+    releases_gil = True
 
     @staticmethod
     def filter_func(data: ImageStack, size=None, mode=None, order=None, progress=None):
@@ -100,7 +101,11 @@ def _execute(images: ImageStack, size, mode, order, progress=None):
              "filter size/width: {1}.".format(images.dtype, size))
 
     progress.update()
-    ps.execute(f, [images.shared_array], images.data.shape[0], progress, msg="Gaussian filter")
+    ps.execute(f, [images.shared_array],
+               images.data.shape[0],
+               progress,
+               msg="Gaussian filter",
+               executor=GaussianFilter.executor())
 
     progress.mark_complete()
     log.info("Finished  gaussian filter, with pixel data type: {0}, "
@@ -65,6 +65,7 @@ class MedianFilter(BaseFilter):
     """
     filter_name = "Median"
     link_histograms = True
+    releases_gil = True
 
     @staticmethod
     def filter_func(data: ImageStack, size=None, mode="reflect", progress=None, force_cpu=True):
@@ -153,7 +154,11 @@ def _execute(images: ImageStack, size, mode, progress=None):
         log.info("PARALLEL median filter, with pixel data type: {0}, filter "
                  "size/width: {1}.".format(images.dtype, size))
 
-        ps.execute(f, [images.shared_array], images.data.shape[0], progress, msg="Median filter")
+        ps.execute(f, [images.shared_array],
+                   images.data.shape[0],
+                   progress,
+                   msg="Median filter",
+                   executor=MedianFilter.executor())
 
 
 def _execute_gpu(data, size, mode, progress=None):
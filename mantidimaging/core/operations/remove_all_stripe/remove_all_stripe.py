@@ -31,6 +31,7 @@ class RemoveAllStripesFilter(BaseFilter):
     filter_name = "Remove all stripes"
     link_histograms = True
     operate_on_sinograms = True
+    releases_gil = True
 
     @staticmethod
     def filter_func(images: ImageStack, snr=3, la_size=61, sm_size=21, dim=1, progress=None):
@@ -53,7 +54,12 @@ class RemoveAllStripesFilter(BaseFilter):
         else:
             compute_func = RemoveAllStripesFilter.compute_function
 
-        ps.run_compute_func(compute_func, images.num_sinograms, images.shared_array, params, progress)
+        ps.run_compute_func(compute_func,
+                            images.num_sinograms,
+                            images.shared_array,
+                            params,
+                            progress,
+                            executor=RemoveAllStripesFilter.executor())
         return images
 
     @staticmethod
@@ -33,6 +33,7 @@ class RemoveLargeStripesFilter(BaseFilter):
     filter_name = "Remove large stripes"
     link_histograms = True
     operate_on_sinograms = True
+    releases_gil = True
 
     @classmethod
     def filter_func(cls, images: 'ImageStack', snr=3, la_size=61, progress=None):
@@ -47,7 +48,12 @@ class RemoveLargeStripesFilter(BaseFilter):
             compute_func = cls.compute_function_sino
         else:
             compute_func = cls.compute_function
-        ps.run_compute_func(compute_func, images.num_sinograms, images.shared_array, params, progress)
+        ps.run_compute_func(compute_func,
+                            images.num_sinograms,
+                            images.shared_array,
+                            params,
+                            progress,
+                            executor=RemoveLargeStripesFilter.executor())
         return images
 
     @staticmethod
@@ -31,6 +31,7 @@ class RemoveStripeFilteringFilter(BaseFilter):
     filter_name = "Remove stripes with filtering"
     link_histograms = True
     operate_on_sinograms = True
+    releases_gil = True
 
     @classmethod
     def filter_func(cls, images: ImageStack, sigma=3, size=21, window_dim=1, filtering_dim=1, progress=None):
@@ -62,7 +63,12 @@ class RemoveStripeFilteringFilter(BaseFilter):
             else:
                 compute_func = cls.compute_function_2d
 
-        ps.run_compute_func(compute_func, images.num_sinograms, images.shared_array, params, progress)
+        ps.run_compute_func(compute_func,
+                            images.num_sinograms,
+                            images.shared_array,
+                            params,
+                            progress,
+                            executor=RemoveStripeFilteringFilter.executor())
         return images
 
     @staticmethod
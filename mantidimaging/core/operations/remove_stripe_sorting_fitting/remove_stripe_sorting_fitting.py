@@ -31,6 +31,7 @@ class RemoveStripeSortingFittingFilter(BaseFilter):
     filter_name = "Remove stripes with sorting and fitting"
     link_histograms = True
     operate_on_sinograms = True
+    releases_gil = True
 
     @classmethod
     def filter_func(cls, images: ImageStack, order=1, sigma=3, progress=None):
@@ -49,7 +50,12 @@ class RemoveStripeSortingFittingFilter(BaseFilter):
             compute_func = cls.compute_function_sino
         else:
             compute_func = cls.compute_function
-        ps.run_compute_func(compute_func, images.num_sinograms, images.shared_array, params, progress)
+        ps.run_compute_func(compute_func,
+                            images.num_sinograms,
+                            images.shared_array,
+                            params,
+                            progress,
+                            executor=RemoveStripeSortingFittingFilter.executor())
 
         return images
 
@@ -12,6 +12,7 @@ from mantidimaging.core.data import ImageStack
 from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup
 from mantidimaging.core.parallel import shared as ps
 from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.parallel import reduction as pr
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.core.utility.sensible_roi import SensibleROI
 from mantidimaging.gui.utility import add_property_to_form
@@ -140,10 +141,6 @@ class RoiNormalisationFilter(BaseFilter):
         return FilterGroup.Basic
 
 
-def _calc_mean(data, air_left=None, air_top=None, air_right=None, air_bottom=None):
-    return data[air_top:air_bottom, air_left:air_right].mean()
-
-
 def _divide_by_air(data=None, air_sums=None):
     data[:] = np.true_divide(data, air_sums)
 
@@ -160,28 +157,15 @@ def _execute(images: ImageStack,
         if isinstance(air_region, list):
             air_region = SensibleROI.from_list(air_region)
 
-        # initialise same number of air sums
-        img_num = images.data.shape[0]
-        air_means = pu.create_array((img_num, ), images.dtype)
-
-        do_calculate_air_means = ps.create_partial(_calc_mean,
-                                                   ps.return_to_second_at_i,
-                                                   air_left=air_region.left,
-                                                   air_top=air_region.top,
-                                                   air_right=air_region.right,
-                                                   air_bottom=air_region.bottom)
-
-        arrays = [images.shared_array, air_means]
-        ps.execute(do_calculate_air_means, arrays, images.data.shape[0], progress)
+        air_means = pu.copy_into_shared_memory(
+            pr.mean(images.shared_array, axis=pr.PER_IMAGE, roi=air_region, progress=progress))
 
         if normalisation_mode == 'Stack Average':
             air_means.array /= air_means.array.mean()
 
         elif normalisation_mode == 'Flat Field' and flat_field is not None:
-            flat_mean = pu.create_array((flat_field.data.shape[0], ), flat_field.dtype)
-            arrays = [flat_field.shared_array, flat_mean]
-            ps.execute(do_calculate_air_means, arrays, flat_field.data.shape[0], progress)
-            air_means.array /= flat_mean.array.mean()
+            flat_mean = pr.mean(flat_field.shared_array, axis=pr.PER_IMAGE, roi=air_region, progress=progress)
+            air_means.array /= flat_mean.mean()
 
         if np.isnan(air_means.array).any():
             raise ValueError("Air region contains invalid (NaN) pixels")
@@ -1,10 +1,14 @@
 # Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from multiprocessing import get_context
 import os
+import threading
+import time
 import uuid
 from logging import getLogger
-from typing import List, Optional, TYPE_CHECKING
+from typing import Iterator, List, Optional, TYPE_CHECKING
 
 import psutil
 from psutil import NoSuchProcess, AccessDenied
@@ -18,31 +22,245 @@ CURRENT_PID = psutil.Process().pid
 
 LOG = getLogger(__name__)
 
+# Environment variables read by the OpenMP and BLAS libraries used by numpy, scipy, tomopy and algotom to size their
+# own thread pools when they are loaded
+NATIVE_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS",
+                          "VECLIB_MAXIMUM_THREADS")
+
+# Seconds a started pool may be unused for before its workers are stopped to give their memory back
+DEFAULT_IDLE_TIMEOUT = 600.0
+
 cores: int = 1
 pool: Optional['Pool'] = None
+# The number of native threads each pool worker may use
+worker_native_threads: int = 1
+threads: int = 1
+thread_pool: Optional[ThreadPoolExecutor] = None
+
+# Pool configuration, see configure_pool
+_pool_enabled = False
+_pool_size: Optional[int] = None
+_native_threads: Optional[int] = None
+_idle_timeout = DEFAULT_IDLE_TIMEOUT
+_preload_operations = True
+
+_pool_lock = threading.RLock()
+_thread_pool_lock = threading.Lock()
+_pool_users = 0
+_pool_last_used = 0.0
+_reaper: Optional[threading.Timer] = None
+
+
+def machine_cores() -> int:
+    """
+    Number of cores of the machine, which the pools and the native thread limits are sized from
+    """
+    return os.cpu_count() or 1
+
+
+def default_worker_native_threads(workers: int) -> int:
+    """
+    Share the cores of the machine between the pool workers, so that the native thread pools started inside each
+    worker don't oversubscribe the machine
+    """
+    return max(1, machine_cores() // max(1, workers))
+
+
+def configure_pool(size: Optional[int] = None,
+                   native_threads: Optional[int] = None,
+                   idle_timeout: Optional[float] = None,
+                   preload_operations: bool = True) -> None:
+    """
+    Enable the process pool without starting it. The workers are started the first time the pool is used.
+
+    :param size: The number of worker processes. Defaults to the number of cores.
+    :param native_threads: The number of OpenMP/BLAS threads each worker may use. Defaults to the number of cores
+                           divided by the number of workers.
+    :param idle_timeout: Seconds the pool may be unused before the workers are stopped, 0 to keep them running.
+                         Defaults to DEFAULT_IDLE_TIMEOUT.
+    :param preload_operations: Import the operation modules in each worker as it starts, so that the first operation
+                               run doesn't have to wait for the imports
+    """
+    global _pool_enabled, _pool_size, _native_threads, _idle_timeout, _preload_operations
+    with _pool_lock:
+        _pool_enabled = True
+        _pool_size = size if size else None
+        _native_threads = native_threads if native_threads else None
+        _idle_timeout = DEFAULT_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        _preload_operations = preload_operations
+
+
+def pool_available() -> bool:
+    """
+    Whether work can be sent to the process pool, either because it is running or because it will be started on use
+    """
+    return pool is not None or _pool_enabled
+
+
+def create_and_start_pool(native_threads: Optional[int] = None, size: Optional[int] = None):
+    """
+    Configure the pool and start the workers straight away. Parameters are as for configure_pool.
+    """
+    with _pool_lock:
+        configure_pool(size, native_threads, _idle_timeout, _preload_operations)
+        _start_pool()
+
+
+def resize_pool(size: Optional[int]) -> None:
+    """
+    Change the number of worker processes. A running pool is stopped, and restarted with the new size on next use.
+    Must not be called while the pool is running an operation. The 'parallel/pool_size' setting is only read at
+    startup, so changing it does not call this.
+
+    :param size: The number of worker processes, None for the number of cores
+    """
+    global _pool_size
+    with _pool_lock:
+        _pool_size = size if size else None
+        if pool is not None:
+            LOG.info(f'Resizing process pool to {size or "default"} workers')
+            _stop_pool()
+
+
+@contextmanager
+def use_pool() -> Iterator['Pool']:
+    """
+    Get the process pool for the duration of the context, starting it if needed. The pool is not stopped for being
+    idle while it is in use.
+    """
+    global _pool_users, _pool_last_used
+    with _pool_lock:
+        if pool is None:
+            _start_pool()
+        assert pool is not None
+        _pool_users += 1
+        current_pool = pool
+    try:
+        yield current_pool
+    finally:
+        with _pool_lock:
+            _pool_users -= 1
+            _pool_last_used = time.monotonic()
+            _schedule_reaper()
 
 
-def create_and_start_pool():
+def _start_pool() -> None:
     LOG.info('Creating process pool')
     context = get_context('spawn')
-    global cores
-    cores = context.cpu_count()
-    global pool
-    pool = context.Pool(cores)
+    global cores, worker_native_threads, pool, _pool_last_used
+    cores = _pool_size if _pool_size else machine_cores()
+    worker_native_threads = _native_threads if _native_threads else default_worker_native_threads(cores)
+    LOG.info(f'Starting {cores} workers limited to {worker_native_threads} native threads each')
+    # The libraries read the limits when they are first loaded, so they are set in the environment the workers are
+    # started with as well as by the initializer
+    with _native_thread_environment(worker_native_threads):
+        pool = context.Pool(cores,
+                            initializer=_initialise_worker,
+                            initargs=(worker_native_threads, _preload_operations))
     # We need a function to call to start the processes but the function itself doesn't need to do anything
     # If we don't do this then the processes start when the pool is first called later in the application
     # which affects performance.
     pool.map_async(_do_nothing, range(cores))
+    _pool_last_used = time.monotonic()
+    _schedule_reaper()
+
+
+def _stop_pool() -> None:
+    global pool
+    if pool is not None:
+        pool.close()
+        pool.terminate()
+        pool = None
+
+
+def _schedule_reaper() -> None:
+    global _reaper
+    if _reaper is not None:
+        _reaper.cancel()
+        _reaper = None
+    if _idle_timeout > 0 and pool is not None:
+        _reaper = threading.Timer(_idle_timeout, _reap_idle_pool)
+        _reaper.daemon = True
+        _reaper.start()
+
+
+def _reap_idle_pool() -> None:
+    with _pool_lock:
+        if pool is None or _pool_users > 0:
+            return
+        idle_time = time.monotonic() - _pool_last_used
+        if idle_time < _idle_timeout:
+            _schedule_reaper()
+            return
+        LOG.info(f'Stopping process pool after {idle_time:.0f}s unused')
+        _stop_pool()
+
+
+@contextmanager
+def _native_thread_environment(native_threads: int) -> Iterator[None]:
+    original = {name: os.environ.get(name) for name in NATIVE_THREAD_ENV_VARS}
+    os.environ.update({name: str(native_threads) for name in NATIVE_THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            if value is None:
+                del os.environ[name]
+            else:
+                os.environ[name] = value
+
+
+def _initialise_worker(native_threads: int, preload_operations: bool = False) -> None:
+    """
+    Runs in each pool worker when it starts. Limits the native thread pools of the worker, including for any
+    libraries that were loaded before the limit was set in the environment, and optionally imports the operations.
+    """
+    os.environ.update({name: str(native_threads) for name in NATIVE_THREAD_ENV_VARS})
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        pass
+    else:
+        threadpool_limits(limits=native_threads)
+
+    if preload_operations:
+        from mantidimaging.core.operations.loader import load_filter_packages
+        load_filter_packages()
 
 
 def _do_nothing(i):
     pass
 
 
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    Get the thread pool used for functions that can run in threads, creating it on first use
+    """
+    global thread_pool, threads
+    current_pool = thread_pool
+    if current_pool is not None:
+        return current_pool
+    with _thread_pool_lock:
+        # Another thread may have created the pool while this one waited for the lock
+        if thread_pool is None:
+            threads = machine_cores()
+            LOG.info(f'Creating thread pool with {threads} threads')
+            thread_pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='MI_worker')
+        return thread_pool
+
+
 def end_pool():
-    if pool:
-        pool.close()
-        pool.terminate()
+    global thread_pool, _reaper, _pool_enabled
+    with _pool_lock:
+        _pool_enabled = False
+        if _reaper is not None:
+            _reaper.cancel()
+            _reaper = None
+        _stop_pool()
+    with _thread_pool_lock:
+        if thread_pool:
+            thread_pool.shutdown(wait=False)
+            thread_pool = None
 
 
 def generate_mi_shared_mem_name() -> str:
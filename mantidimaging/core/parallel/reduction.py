@@ -0,0 +1,290 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Parallel reductions over the images of a stack, optionally restricted to a region of interest.
+
+The stack is split into slabs of images along the first axis and a partial result is calculated for each slab by the
+selected executor. The partial results are always combined in slab order, and the slab boundaries only depend on the
+number of images, so the result is the same whichever executor and however many workers are used.
+
+The axis argument follows numpy: None reduces to a single value, 0 reduces over the images to a single image and
+PER_IMAGE reduces each image to a single value.
+"""
+import warnings
+from functools import reduce
+from logging import getLogger
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from mantidimaging.core.parallel import manager as pm
+from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.utility.progress_reporting import Progress
+from mantidimaging.core.utility.sensible_roi import SensibleROI
+
+LOG = getLogger(__name__)
+
+PER_IMAGE = (1, 2)
+# The stack is split into at most this many slabs
+MAX_SLABS = 64
+DEFAULT_NUM_BINS = 256
+
+Axis = Union[None, int, Tuple[int, int]]
+
+
+class StackSummary(NamedTuple):
+    min: float
+    max: float
+    nan_count: int
+    zero_count: int
+    negative_count: int
+
+
+class _SlabReducer:
+    """
+    Calculates the partial result for one slab of images. Needs to be picklable to be sent to the process pool.
+    """
+    def __init__(self, func: Callable, data: Union[pu.SharedArray, pu.SharedArrayProxy],
+                 roi: Optional[Tuple[int, int, int, int]], kwargs: dict):
+        self.func = func
+        self.data = data
+        self.roi = roi
+        self.kwargs = kwargs
+
+    def __call__(self, slab: Tuple[int, int]) -> Any:
+        view = self.data.array[slab[0]:slab[1]]
+        if self.roi is not None:
+            left, top, right, bottom = self.roi
+            view = view[:, top:bottom, left:right]
+        return self.func(view, **self.kwargs)
+
+
+def _region_shape(image_shape: Tuple[int, ...], roi: Optional[SensibleROI]) -> Tuple[int, ...]:
+    """
+    Shape of the region of an image that is reduced over, with the ROI clipped to the image as the slice is
+    """
+    if roi is None:
+        return image_shape
+    height = len(range(*slice(roi.top, roi.bottom).indices(image_shape[0])))
+    width = len(range(*slice(roi.left, roi.right).indices(image_shape[1])))
+    return height, width
+
+
+def _slabs(num_images: int) -> List[Tuple[int, int]]:
+    slab_size = max(1, -(-num_images // MAX_SLABS))
+    return pu.generate_slabs(0, num_images, slab_size)
+
+
+def _map_slabs(func: Callable,
+               shared_array: pu.SharedArray,
+               roi: Optional[SensibleROI],
+               progress: Optional[Progress],
+               executor: pu.Executor,
+               msg: str = "",
+               **kwargs) -> List[Any]:
+    num_images = shared_array.array.shape[0]
+    slabs = _slabs(num_images)
+    roi_tuple = tuple(roi) if roi is not None else None
+    executor = pu.select_executor(executor, num_images, shared_array.has_shared_memory)
+
+    if executor == pu.Executor.PROCESS:
+        reducer = _SlabReducer(func, shared_array.array_proxy, roi_tuple, kwargs)
+        with pm.use_pool() as pool:
+            return _collect(slabs, pool.imap(reducer, slabs), progress, msg)
+    reducer = _SlabReducer(func, shared_array, roi_tuple, kwargs)
+    if executor == pu.Executor.THREAD:
+        return _collect(slabs, pm.get_thread_pool().map(reducer, slabs), progress, msg)
+    return _collect(slabs, map(reducer, slabs), progress, msg)
+
+
+def _collect(slabs: List[Tuple[int, int]], results: Iterable[Any], progress: Optional[Progress],
+             msg: str) -> List[Any]:
+    partials = []
+    for slab, result in zip(slabs, results):
+        partials.append(result)
+        if progress is not None:
+            progress.update(slab[1] - slab[0], msg)
+    return partials
+
+
+def _combine(partials: List[Any], axis: Axis, op: Callable[[Any, Any], Any]) -> Any:
+    if axis == PER_IMAGE:
+        return np.concatenate(partials)
+    return reduce(op, partials)
+
+
+def _sum_partial(view: np.ndarray, axis: Axis) -> np.ndarray:
+    return np.sum(view, axis=axis, dtype=np.float64)
+
+
+def _nanmin_partial(view: np.ndarray, axis: Axis) -> np.ndarray:
+    with warnings.catch_warnings():
+        # A slab that is all NaN is expected, the NaN is ignored when combining
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmin(view, axis=axis)
+
+
+def _nanmax_partial(view: np.ndarray, axis: Axis) -> np.ndarray:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmax(view, axis=axis)
+
+
+def _min_max_partial(view: np.ndarray) -> Tuple[float, float]:
+    return _nanmin_partial(view, None), _nanmax_partial(view, None)
+
+
+def _nan_count_partial(view: np.ndarray, axis: Axis) -> np.ndarray:
+    return np.count_nonzero(np.isnan(view), axis=axis)
+
+
+def _summary_partial(view: np.ndarray) -> StackSummary:
+    return StackSummary(min=_nanmin_partial(view, None),
+                        max=_nanmax_partial(view, None),
+                        nan_count=np.count_nonzero(np.isnan(view)),
+                        zero_count=view.size - np.count_nonzero(view),
+                        negative_count=np.count_nonzero(view < 0))
+
+
+def _histogram_partial(view: np.ndarray, bins: int, value_range: Tuple[float, float]) -> np.ndarray:
+    return np.histogram(view[~np.isnan(view)], bins=bins, range=value_range)[0]
+
+
+def _result_dtype(shared_array: pu.SharedArray) -> np.dtype:
+    # Match numpy, which returns floating point input in the same dtype and everything else as float64
+    dtype = shared_array.array.dtype
+    return dtype if np.issubdtype(dtype, np.floating) else np.dtype(np.float64)
+
+
+def total(shared_array: pu.SharedArray,
+          axis: Axis = None,
+          roi: Optional[SensibleROI] = None,
+          progress: Optional[Progress] = None,
+          executor: pu.Executor = pu.Executor.AUTO) -> Union[float, np.ndarray]:
+    """
+    Sum of the stack, accumulated in float64.
+
+    :param shared_array: The stack to reduce
+    :param axis: None, 0 or PER_IMAGE
+    :param roi: Optional region of each image to reduce over
+    :param progress: Optional progress to update as each slab completes
+    :param executor: The backend to calculate the partial results with
+    """
+    partials = _map_slabs(_sum_partial, shared_array, roi, progress, executor, "Sum", axis=axis)
+    return _combine(partials, axis, np.add)
+
+
+def mean(shared_array: pu.SharedArray,
+         axis: Axis = None,
+         roi: Optional[SensibleROI] = None,
+         progress: Optional[Progress] = None,
+         executor: pu.Executor = pu.Executor.AUTO) -> Union[float, np.ndarray]:
+    """
+    Mean of the stack. Accumulated in float64, and returned in the dtype of the stack if it is floating point.
+    Parameters are as for total.
+    """
+    summed = total(shared_array, axis, roi, progress, executor)
+    shape = shared_array.array.shape
+    image_size = int(np.prod(_region_shape(shape[1:], roi)))
+    if axis is None:
+        count = shape[0] * image_size
+    elif axis == 0:
+        count = shape[0]
+    else:
+        count = image_size
+    dtype = _result_dtype(shared_array)
+    if axis is None:
+        return dtype.type(summed / count)
+    return (summed / count).astype(dtype)
+
+
+def minimum(shared_array: pu.SharedArray,
+            axis: Axis = None,
+            roi: Optional[SensibleROI] = None,
+            progress: Optional[Progress] = None,
+            executor: pu.Executor = pu.Executor.AUTO) -> Union[float, np.ndarray]:
+    """
+    Minimum of the stack, ignoring NaNs. Parameters are as for total.
+    """
+    partials = _map_slabs(_nanmin_partial, shared_array, roi, progress, executor, "Min", axis=axis)
+    return _combine(partials, axis, np.fmin)
+
+
+def maximum(shared_array: pu.SharedArray,
+            axis: Axis = None,
+            roi: Optional[SensibleROI] = None,
+            progress: Optional[Progress] = None,
+            executor: pu.Executor = pu.Executor.AUTO) -> Union[float, np.ndarray]:
+    """
+    Maximum of the stack, ignoring NaNs. Parameters are as for total.
+    """
+    partials = _map_slabs(_nanmax_partial, shared_array, roi, progress, executor, "Max", axis=axis)
+    return _combine(partials, axis, np.fmax)
+
+
+def min_max(shared_array: pu.SharedArray,
+            roi: Optional[SensibleROI] = None,
+            progress: Optional[Progress] = None,
+            executor: pu.Executor = pu.Executor.AUTO) -> Tuple[float, float]:
+    """
+    Minimum and maximum of the whole stack in a single pass, ignoring NaNs.
+    """
+    partials = _map_slabs(_min_max_partial, shared_array, roi, progress, executor, "Min/Max")
+    return reduce(np.fmin, (p[0] for p in partials)), reduce(np.fmax, (p[1] for p in partials))
+
+
+def nan_count(shared_array: pu.SharedArray,
+              axis: Axis = None,
+              roi: Optional[SensibleROI] = None,
+              progress: Optional[Progress] = None,
+              executor: pu.Executor = pu.Executor.AUTO) -> Union[int, np.ndarray]:
+    """
+    Number of NaNs in the stack. Parameters are as for total.
+    """
+    partials = _map_slabs(_nan_count_partial, shared_array, roi, progress, executor, "NaN count", axis=axis)
+    return _combine(partials, axis, np.add)
+
+
+def summary(shared_array: pu.SharedArray,
+            roi: Optional[SensibleROI] = None,
+            progress: Optional[Progress] = None,
+            executor: pu.Executor = pu.Executor.AUTO) -> StackSummary:
+    """
+    Minimum, maximum and the number of NaN, zero and negative values in the stack, in a single pass.
+    """
+    partials = _map_slabs(_summary_partial, shared_array, roi, progress, executor, "Summary")
+    return StackSummary(min=reduce(np.fmin, (p.min for p in partials)),
+                        max=reduce(np.fmax, (p.max for p in partials)),
+                        nan_count=int(np.sum([p.nan_count for p in partials])),
+                        zero_count=int(np.sum([p.zero_count for p in partials])),
+                        negative_count=int(np.sum([p.negative_count for p in partials])))
+
+
+def histogram(shared_array: pu.SharedArray,
+              bins: int = DEFAULT_NUM_BINS,
+              value_range: Optional[Tuple[float, float]] = None,
+              roi: Optional[SensibleROI] = None,
+              progress: Optional[Progress] = None,
+              executor: pu.Executor = pu.Executor.AUTO) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histogram of the stack, ignoring NaNs.
+
+    :param bins: The number of equal width bins
+    :param value_range: The lower and upper range of the bins. If not given the minimum and maximum of the
+                        stack are used, which needs an extra pass over the data. The steps of that pass are added
+                        to the estimate of progress
+    :return: The counts in each bin and the bin edges, as numpy.histogram
+    """
+    if value_range is None:
+        if progress is not None:
+            progress.add_estimated_steps(shared_array.array.shape[0])
+        value_range = min_max(shared_array, roi, progress, executor)
+    partials = _map_slabs(_histogram_partial,
+                          shared_array,
+                          roi,
+                          progress,
+                          executor,
+                          "Histogram",
+                          bins=bins,
+                          value_range=value_range)
+    return reduce(np.add, partials), np.histogram_bin_edges([], bins=bins, range=value_range)
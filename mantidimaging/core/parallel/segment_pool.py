@@ -0,0 +1,138 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Pool of freed shared memory segments, so that they can be handed out again instead of creating a new segment for
+every array. Creating a segment means mapping new pages that the system has to zero, and freeing it unmaps them again,
+which adds up over a long session of cropping, copying and previewing stacks.
+
+Segments are grouped into size classes. Requested sizes are rounded up to the size of their class, so a freed segment
+can be reused by any request in the same class while wasting less than 1/16 of the requested size.
+"""
+import threading
+from collections import OrderedDict
+from logging import getLogger
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+LOG = getLogger(__name__)
+
+# Segments smaller than this are all rounded up to it
+MIN_SEGMENT_SIZE = 64 * 1024
+# Each doubling of size is split into this many size classes
+CLASSES_PER_DOUBLING = 16
+# Fraction of the total system memory that may be kept in the pool
+DEFAULT_MAX_FRACTION = 0.1
+
+
+def size_class(size: int) -> int:
+    """
+    The size of the segment to allocate for a request of the given size in bytes
+    """
+    if size <= MIN_SEGMENT_SIZE:
+        return MIN_SEGMENT_SIZE
+    step = (1 << ((size - 1).bit_length() - 1)) // CLASSES_PER_DOUBLING
+    return -(-size // step) * step
+
+
+class SegmentPoolStats(NamedTuple):
+    hits: int
+    misses: int
+    released: int
+    pooled_segments: int
+    pooled_bytes: int
+
+
+class SegmentPool:
+    """
+    Keeps freed shared memory segments, most recently freed last, and hands them out again for requests in the same
+    size class.
+
+    :param free_func: Called to destroy a segment when it is dropped from the pool
+    :param max_bytes: The most memory to keep in the pool
+    :param memory_pressure_func: Returns True when the system is short of memory, in which case freed segments are
+                                 destroyed rather than kept
+    """
+    def __init__(self,
+                 free_func: Callable[[SharedMemory], None],
+                 max_bytes: int,
+                 memory_pressure_func: Optional[Callable[[], bool]] = None):
+        self._free_func = free_func
+        self.max_bytes = max_bytes
+        self._memory_pressure_func = memory_pressure_func
+        self._lock = threading.Lock()
+        self._segments: 'OrderedDict[str, SharedMemory]' = OrderedDict()
+        self._by_size: Dict[int, List[str]] = {}
+        self._pooled_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._released = 0
+
+    def acquire(self, size: int) -> Optional[SharedMemory]:
+        """
+        Take a segment of exactly the given size class out of the pool
+
+        :return: The segment, or None if there is no free segment of that size
+        """
+        with self._lock:
+            names = self._by_size.get(size)
+            if not names:
+                self._misses += 1
+                return None
+            self._hits += 1
+            mem = self._segments.pop(names.pop())
+            self._pooled_bytes -= mem.size
+            return mem
+
+    def release(self, mem: SharedMemory) -> bool:
+        """
+        Offer a segment that is no longer used back to the pool
+
+        :return: True if the segment is kept in the pool, False if the caller should destroy it
+        """
+        if mem.size != size_class(mem.size) or mem.size > self.max_bytes or self._under_memory_pressure():
+            return False
+        with self._lock:
+            self._segments[mem.name] = mem
+            self._by_size.setdefault(mem.size, []).append(mem.name)
+            self._pooled_bytes += mem.size
+            dropped = self._trim_locked(self.max_bytes)
+        self._free_all(dropped)
+        return True
+
+    def trim(self, max_bytes: int = 0) -> int:
+        """
+        Destroy the least recently freed segments until at most max_bytes are kept
+
+        :return: The number of bytes given back to the system
+        """
+        with self._lock:
+            dropped = self._trim_locked(max_bytes)
+        self._free_all(dropped)
+        return sum(mem.size for mem in dropped)
+
+    def clear(self) -> int:
+        return self.trim(0)
+
+    def stats(self) -> SegmentPoolStats:
+        with self._lock:
+            return SegmentPoolStats(self._hits, self._misses, self._released, len(self._segments), self._pooled_bytes)
+
+    def _under_memory_pressure(self) -> bool:
+        return self._memory_pressure_func is not None and self._memory_pressure_func()
+
+    def _trim_locked(self, max_bytes: int) -> List[SharedMemory]:
+        dropped = []
+        while self._pooled_bytes > max_bytes:
+            name, mem = self._segments.popitem(last=False)
+            self._by_size[mem.size].remove(name)
+            self._pooled_bytes -= mem.size
+            dropped.append(mem)
+        self._released += len(dropped)
+        return dropped
+
+    def _free_all(self, segments: List[SharedMemory]) -> None:
+        # Destroying the segments is done outside of the lock as it may need to message the pool workers
+        for mem in segments:
+            self._free_func(mem)
+        if segments:
+            LOG.debug(f'Released {len(segments)} pooled shared memory segments')
@@ -4,11 +4,17 @@
 from functools import partial
 from typing import List, Tuple, Union, Callable, Dict, Any, TYPE_CHECKING
 
+import numpy as np
+
 from mantidimaging.core.parallel import utility as pu
 
 if TYPE_CHECKING:
     from numpy import ndarray
 
+# ndarray arguments at least this large are placed in shared memory when running in the process pool,
+# rather than being pickled and sent to the workers with every task
+SHARED_ARGUMENT_MIN_BYTES = 64 * 1024
+
 
 def inplace3(func, data: Union[List[pu.SharedArray], List[pu.SharedArrayProxy]], i, **kwargs):
     func(data[0].array[i], data[1].array[i], data[2].array, **kwargs)
@@ -43,23 +49,63 @@ def create_partial(func, fwd_function, **kwargs):
 
     :param func: Function that will be executed
     :param fwd_function: The function will be forwarded through function.
-    :param kwargs: kwargs to forward to the function func that will be executed
+    :param kwargs: kwargs to forward to the function func that will be executed.
+                   Large ndarrays are moved into shared memory by execute if the process pool is used
     :return: The decorated forwarded function, ready for further execution
     """
     return partial(fwd_function, func, **kwargs)
 
 
+def _promote_large_arrays(kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, pu.SharedArray]]:
+    """
+    Splits the ndarrays of at least SHARED_ARGUMENT_MIN_BYTES out of kwargs and copies them into shared memory.
+
+    :return: The remaining kwargs, and the SharedArrays created for the large ndarrays
+    """
+    remaining = {}
+    promoted = {}
+    for key, value in kwargs.items():
+        if isinstance(value, np.ndarray) and value.nbytes >= SHARED_ARGUMENT_MIN_BYTES:
+            promoted[key] = pu.copy_into_shared_memory(value)
+        else:
+            remaining[key] = value
+    return remaining, promoted
+
+
+def _call_with_shared_kwargs(func, shared_kwargs: Dict[str, pu.SharedArrayProxy], *args):
+    func(*args, **{key: proxy.array for key, proxy in shared_kwargs.items()})
+
+
+def _share_partial_arguments(partial_func: partial) -> Tuple[partial, List[pu.SharedArray]]:
+    """
+    Moves the large ndarray kwargs of partial_func into shared memory, so only a proxy to them is sent to the
+    process pool with each task.
+
+    :return: The partial to execute, and the SharedArrays that need to be kept alive until execution has finished
+    """
+    if not isinstance(partial_func, partial):
+        return partial_func, []
+    keywords, promoted = _promote_large_arrays(partial_func.keywords)
+    if not promoted:
+        return partial_func, []
+    proxies = {key: shared_array.array_proxy for key, shared_array in promoted.items()}
+    inner = partial(partial_func.func, *partial_func.args, **keywords)
+    return partial(_call_with_shared_kwargs, inner, proxies), list(promoted.values())
+
+
 def execute(partial_func: partial,
             arrays: List[pu.SharedArray],
             num_operations: int,
             progress=None,
-            msg: str = '') -> None:
+            msg: str = '',
+            dispatch: pu.DispatchMode = pu.DispatchMode.AUTO,
+            executor: pu.Executor = pu.Executor.AUTO) -> None:
     """
     Executes a function a given number of times using the provided list of SharedArray objects.
 
-    If all the arrays in the list use shared memory then the execution is done in parallel, with each process
-    accessing the data in shared memory.
-    If any arrays in the list do not use shared memory then the execution will be performed synchronously.
+    If all the arrays in the list use shared memory then by default the execution is done in the process pool, with
+    each process accessing the data in shared memory.
+    If any arrays in the list do not use shared memory then the execution will be performed in the thread pool.
 
     :param partial_func: A function constructed using create_partial
     :param arrays: The list of SharedArray objects that the operations should be performed on
@@ -67,12 +113,20 @@ def execute(partial_func: partial,
                            Also used to set the number of progress steps
     :param progress: Progress instance to use for progress reporting (optional)
     :param msg: Message to be shown on the progress bar
+    :param dispatch: Whether to send the work to the pool one index at a time, in slabs of indices, or to choose
+                     automatically based on how long one image takes to process
+    :param executor: The backend to run the function with, see pu.Executor
     :return:
     """
 
-    all_data_in_shared_memory, data = _check_shared_mem_and_get_data(arrays)
+    all_data_in_shared_memory, data, executor = _get_data_for_executor(arrays, num_operations, executor)
+    shared_arguments: List[pu.SharedArray] = []
+    if executor == pu.Executor.PROCESS:
+        partial_func, shared_arguments = _share_partial_arguments(partial_func)
     partial_func = partial(partial_func, data)
-    pu.execute_impl(num_operations, partial_func, all_data_in_shared_memory, progress, msg)
+    pu.execute_impl(num_operations, partial_func, all_data_in_shared_memory, progress, msg, dispatch, executor)
+    # The shared memory for the arguments is freed once the references are dropped here
+    del shared_arguments
 
 
 ComputeFuncType = Union[Callable[[int, List['ndarray'], Dict[str, Any]], None],
@@ -90,19 +144,51 @@ class _Worker:
         ndarrays = [sa.array for sa in self.arrays]
         if len(ndarrays) == 1:
             ndarrays = ndarrays[0]
-        self.func(index, ndarrays, self.params)
+        params = {
+            key: value.array if isinstance(value, pu.SharedArrayProxy) else value
+            for key, value in self.params.items()
+        }
+        self.func(index, ndarrays, params)
 
 
 def run_compute_func(func: ComputeFuncType,
                      num_operations: int,
                      arrays: Union[List[pu.SharedArray], pu.SharedArray],
                      params: Dict[str, Any],
-                     progress=None):
+                     progress=None,
+                     dispatch: pu.DispatchMode = pu.DispatchMode.AUTO,
+                     executor: pu.Executor = pu.Executor.AUTO,
+                     msg: str = ""):
     if isinstance(arrays, pu.SharedArray):
         arrays = [arrays]
-    all_data_in_shared_memory, data = _check_shared_mem_and_get_data(arrays)
+    all_data_in_shared_memory, data, executor = _get_data_for_executor(arrays, num_operations, executor)
+    shared_params: Dict[str, pu.SharedArray] = {}
+    if executor == pu.Executor.PROCESS:
+        params, shared_params = _promote_large_arrays(params)
+        params.update({key: shared_array.array_proxy for key, shared_array in shared_params.items()})
     worker_func = _Worker(func, data, params)
-    pu.run_compute_func_impl(worker_func, num_operations, all_data_in_shared_memory, progress)
+    pu.run_compute_func_impl(worker_func,
+                             num_operations,
+                             all_data_in_shared_memory,
+                             progress,
+                             msg=msg,
+                             dispatch=dispatch,
+                             executor=executor)
+    del shared_params
+
+
+def _get_data_for_executor(
+    arrays: List[pu.SharedArray], num_operations: int, executor: pu.Executor
+) -> Tuple[bool, Union[List[pu.SharedArray], List[pu.SharedArrayProxy]], pu.Executor]:
+    """
+    Selects the executor that will be used and the data to pass to it. Proxies are only needed to pass shared memory
+    to the process pool, the other executors use the arrays directly.
+    """
+    all_data_in_shared_memory, data = _check_shared_mem_and_get_data(arrays)
+    executor = pu.select_executor(executor, num_operations, all_data_in_shared_memory)
+    if executor != pu.Executor.PROCESS:
+        return all_data_in_shared_memory, arrays, executor
+    return all_data_in_shared_memory, data, executor
 
 
 def _check_shared_mem_and_get_data(
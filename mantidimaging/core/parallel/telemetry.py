@@ -0,0 +1,217 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Optional timing of the tasks run by the parallel executors, to find out why an operation is slow.
+
+For each task the worker that ran it, when it was handed to the executor, when it started and when it finished are
+recorded. From these a summary is calculated per operation:
+
+- task time percentiles, for how long the work itself takes
+- queue wait, for how long tasks wait for a free worker after being handed to the executor
+- utilisation, the fraction of the available worker time spent running tasks
+- imbalance, how much longer the busiest worker was busy for than the average worker
+- the cost of pickling the task function that is sent with every task to the process pool
+
+Low utilisation with short tasks and a high pickling cost points to dispatch overhead. Low utilisation with long
+queue waits points to too few tasks or imbalanced work. High utilisation means the operation is compute or I/O bound
+in the tasks themselves.
+
+The summary is logged, and with the per-task records written to a JSON file per operation when an output directory
+is set.
+"""
+import json
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+LOG = getLogger(__name__)
+
+_enabled = False
+_output_dir: Optional[Path] = None
+
+
+def enable(output_dir: Union[str, Path, None] = None) -> None:
+    """
+    Record telemetry for every parallel operation
+
+    :param output_dir: Directory to write a JSON file per operation to. If None the summaries are only logged.
+    """
+    global _enabled, _output_dir
+    _enabled = True
+    _output_dir = Path(output_dir) if output_dir is not None else None
+    if _output_dir is not None:
+        _output_dir.mkdir(parents=True, exist_ok=True)
+
+
+def disable() -> None:
+    global _enabled, _output_dir
+    _enabled = False
+    _output_dir = None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class TaskRecord(NamedTuple):
+    worker: str
+    submitted: float
+    started: float
+    finished: float
+    items: int
+
+
+def _worker_id() -> str:
+    return f"{os.getpid()}/{threading.current_thread().name}"
+
+
+class _TimedTask:
+    """
+    Wraps a task so that it returns the timing of the call along with its result. Times are wall clock times, so that
+    they can be compared between processes.
+    """
+    def __init__(self, func: Callable[[Any], Tuple[int, int]]):
+        self.func = func
+
+    def __call__(self, stamped_item: Tuple[Any, float]) -> Tuple[Tuple[int, int], Tuple[str, float, float, float]]:
+        item, submitted = stamped_item
+        started = time.time()
+        result = self.func(item)
+        return result, (_worker_id(), submitted, started, time.time())
+
+
+class OperationTelemetry:
+    """
+    Collects the task records for a single operation. Tasks must return the (start, stop) range of the indices that
+    they processed.
+    """
+    def __init__(self, name: str, executor: str, workers: int):
+        self.name = name
+        self.executor = executor
+        self.workers = workers
+        self.records: List[TaskRecord] = []
+        self.pickle_bytes = 0
+        self.pickle_seconds = 0.0
+        self._started = time.time()
+
+    def wrap(self, task: Callable) -> Callable:
+        return _TimedTask(task)
+
+    def stamp(self, items: Iterable) -> Iterator[Tuple[Any, float]]:
+        """
+        Pair each item with the time that the executor took it, which is when it is queued for a worker
+        """
+        for item in items:
+            yield item, time.time()
+
+    def unwrap(self, results: Iterable[Tuple[Tuple[int, int], Tuple[str, float, float, float]]]) \
+            -> Iterator[Tuple[int, int]]:
+        for result, timing in results:
+            self.records.append(TaskRecord(*timing, items=result[1] - result[0]))
+            yield result
+
+    def measure_pickling(self, task: Callable) -> None:
+        """
+        Measure the cost of pickling the task function, which the process pool does for every task
+        """
+        start = time.perf_counter()
+        self.pickle_bytes = len(pickle.dumps(task))
+        self.pickle_seconds = time.perf_counter() - start
+
+    def summary(self) -> Dict[str, Any]:
+        wall_time = time.time() - self._started
+        task_times = np.array([r.finished - r.started for r in self.records])
+        queue_waits = np.array([r.started - r.submitted for r in self.records])
+        busy: Dict[str, float] = {}
+        for record in self.records:
+            busy[record.worker] = busy.get(record.worker, 0.0) + record.finished - record.started
+        total_busy = float(task_times.sum()) if self.records else 0.0
+        mean_busy = total_busy / max(self.workers, 1)
+
+        def percentile(values: np.ndarray, q: float) -> float:
+            return float(np.percentile(values, q)) if values.size else 0.0
+
+        return {
+            "operation": self.name,
+            "executor": self.executor,
+            "workers": self.workers,
+            "workers_used": len(busy),
+            "tasks": len(self.records),
+            "items": sum(r.items for r in self.records),
+            "wall_time": wall_time,
+            "task_time_p50": percentile(task_times, 50),
+            "task_time_p95": percentile(task_times, 95),
+            "task_time_max": percentile(task_times, 100),
+            "queue_wait_p50": percentile(queue_waits, 50),
+            "queue_wait_p95": percentile(queue_waits, 95),
+            "utilisation": total_busy / (self.workers * wall_time) if wall_time > 0 and self.workers else 0.0,
+            "imbalance": max(busy.values()) / mean_busy if busy and mean_busy > 0 else 0.0,
+            "task_pickle_bytes": self.pickle_bytes,
+            "task_pickle_seconds": self.pickle_seconds,
+            "estimated_pickle_seconds": self.pickle_seconds * len(self.records),
+        }
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Log the summary, and write it with the task records to the output directory if one is set
+        """
+        summary = self.summary()
+        LOG.info(f"{self.name}: {summary['tasks']} tasks on {summary['workers_used']}/{self.workers} "
+                 f"{self.executor} workers in {summary['wall_time']:.3f}s, "
+                 f"task p50={summary['task_time_p50']:.4f}s p95={summary['task_time_p95']:.4f}s, "
+                 f"queue wait p50={summary['queue_wait_p50']:.4f}s, utilisation={summary['utilisation']:.0%}, "
+                 f"imbalance={summary['imbalance']:.2f}, pickling={summary['estimated_pickle_seconds']:.4f}s")
+        if _output_dir is not None:
+            self._write(summary)
+        return summary
+
+    def _write(self, summary: Dict[str, Any]) -> None:
+        safe_name = "".join(c if c.isalnum() else "_" for c in self.name)
+        path = _output_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{safe_name}.json"
+        with open(path, "w") as f:
+            json.dump({"summary": summary, "tasks": [r._asdict() for r in self.records]}, f, indent=2)
+
+
+class _NullTelemetry(OperationTelemetry):
+    """
+    Used when telemetry is disabled, passes everything through unchanged
+    """
+    def wrap(self, task: Callable) -> Callable:
+        return task
+
+    def stamp(self, items: Iterable) -> Iterable:
+        return items
+
+    def unwrap(self, results: Iterable) -> Iterable:
+        return results
+
+    def measure_pickling(self, task: Callable) -> None:
+        pass
+
+    def finish(self) -> Dict[str, Any]:
+        return {}
+
+
+def operation_name(func: Callable, msg: str = "") -> str:
+    if msg:
+        return msg
+    while isinstance(func, partial):
+        func = func.func
+    return getattr(func, "__qualname__", type(func).__name__)
+
+
+def start(name: str, executor: str, workers: int) -> OperationTelemetry:
+    """
+    Start recording an operation. Returns a recorder that does nothing if telemetry is disabled.
+    """
+    if _enabled:
+        return OperationTelemetry(name, executor, workers)
+    return _NullTelemetry(name, executor, workers)
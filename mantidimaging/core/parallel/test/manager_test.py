@@ -1,6 +1,10 @@
 # Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
+import os
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import psutil
@@ -58,3 +62,107 @@ class ParallelManagerTest(unittest.TestCase):
         _mock_getmtime.return_value = psutil.Process().create_time() - 3600
 
         self.assertEqual(files_to_remove, pm.find_memory_from_previous_process_linux())
+
+    @parameterized.expand([("One_per_core", 8, 8, 1), ("Shared", 8, 2, 4), ("Uneven", 8, 3, 2),
+                           ("More_workers_than_cores", 2, 4, 1)])
+    def test_default_worker_native_threads(self, _, cpu_count, workers, expected):
+        with patch('os.cpu_count', return_value=cpu_count):
+            self.assertEqual(expected, pm.default_worker_native_threads(workers))
+
+    def test_thread_pool_is_created_once_when_first_used_from_many_threads(self):
+        pm.end_pool()
+        barrier = threading.Barrier(8)
+
+        def get_pool(_):
+            barrier.wait()
+            return pm.get_thread_pool()
+
+        def slow_executor(*args, **kwargs):
+            # Widens the window in which the other threads could also find no pool
+            time.sleep(0.05)
+            return ThreadPoolExecutor(*args, **kwargs)
+
+        try:
+            with patch('mantidimaging.core.parallel.manager.ThreadPoolExecutor', side_effect=slow_executor) as executor:
+                with ThreadPoolExecutor(max_workers=8) as callers:
+                    pools = list(callers.map(get_pool, range(8)))
+            executor.assert_called_once()
+            self.assertTrue(all(pool is pools[0] for pool in pools))
+        finally:
+            pm.end_pool()
+        self.assertIsNone(pm.thread_pool)
+
+    def test_native_thread_environment_is_restored(self):
+        with patch.dict('os.environ', {"OMP_NUM_THREADS": "16"}, clear=True):
+            with pm._native_thread_environment(2):
+                for name in pm.NATIVE_THREAD_ENV_VARS:
+                    self.assertEqual("2", os.environ[name])
+            self.assertEqual({"OMP_NUM_THREADS": "16"}, dict(os.environ))
+
+    @patch.dict('os.environ', {}, clear=True)
+    @patch('mantidimaging.core.parallel.manager.machine_cores', return_value=4)
+    @patch('mantidimaging.core.parallel.manager.get_context')
+    def test_create_and_start_pool_sets_worker_thread_limit(self, mock_get_context, _):
+        context = mock_get_context.return_value
+        pm.create_and_start_pool(native_threads=3)
+        context.Pool.assert_called_once_with(4, initializer=pm._initialise_worker, initargs=(3, True))
+        self.assertEqual(3, pm.worker_native_threads)
+        pm.end_pool()
+
+    @patch('mantidimaging.core.parallel.manager.machine_cores', return_value=8)
+    @patch('mantidimaging.core.parallel.manager.get_context')
+    def test_configured_pool_is_started_on_first_use(self, mock_get_context, machine_cores):
+        pm.configure_pool(size=2, idle_timeout=0)
+        try:
+            self.assertTrue(pm.pool_available())
+            self.assertIsNone(pm.pool)
+            with pm.use_pool() as pool:
+                self.assertIs(pool, pm.pool)
+            mock_get_context.return_value.Pool.assert_called_once()
+            self.assertEqual(2, pm.cores)
+            self.assertEqual(machine_cores.return_value // 2, pm.worker_native_threads)
+        finally:
+            pm.end_pool()
+        self.assertFalse(pm.pool_available())
+
+    @patch('mantidimaging.core.parallel.manager.machine_cores', return_value=8)
+    @patch('mantidimaging.core.parallel.manager.get_context')
+    def test_resize_pool_restarts_on_next_use(self, mock_get_context, _):
+        pm.configure_pool(idle_timeout=0)
+        try:
+            with pm.use_pool():
+                self.assertEqual(8, pm.cores)
+            pm.resize_pool(3)
+            self.assertIsNone(pm.pool)
+            with pm.use_pool():
+                self.assertEqual(3, pm.cores)
+            self.assertEqual(2, mock_get_context.return_value.Pool.call_count)
+        finally:
+            pm.end_pool()
+
+    @patch('mantidimaging.core.parallel.manager.machine_cores', return_value=2)
+    @patch('mantidimaging.core.parallel.manager.get_context')
+    def test_idle_pool_is_reaped(self, mock_get_context, _):
+        pm.configure_pool(idle_timeout=0)
+        try:
+            with pm.use_pool():
+                pass
+            with patch('mantidimaging.core.parallel.manager._idle_timeout', 10.0):
+                with patch('mantidimaging.core.parallel.manager._pool_last_used', 0.0):
+                    pm._reap_idle_pool()
+            self.assertIsNone(pm.pool)
+        finally:
+            pm.end_pool()
+
+    @patch('mantidimaging.core.parallel.manager.machine_cores', return_value=2)
+    @patch('mantidimaging.core.parallel.manager.get_context')
+    def test_pool_in_use_is_not_reaped(self, mock_get_context, _):
+        pm.configure_pool(idle_timeout=0)
+        try:
+            with pm.use_pool():
+                with patch('mantidimaging.core.parallel.manager._idle_timeout', 10.0):
+                    with patch('mantidimaging.core.parallel.manager._pool_last_used', 0.0):
+                        pm._reap_idle_pool()
+                self.assertIsNotNone(pm.pool)
+        finally:
+            pm.end_pool()
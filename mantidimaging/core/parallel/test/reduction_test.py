@@ -0,0 +1,146 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from mantidimaging.core.parallel import reduction as pr
+from mantidimaging.core.parallel.utility import Executor, copy_into_shared_memory
+from mantidimaging.core.utility.progress_reporting import Progress
+from mantidimaging.core.utility.sensible_roi import SensibleROI
+
+EXECUTORS = [Executor.SERIAL, Executor.THREAD]
+
+
+def _make_stack(num_images=150, with_nans=True):
+    rng = np.random.default_rng(42)
+    data = rng.uniform(-1, 10, (num_images, 8, 9)).astype(np.float32)
+    if with_nans:
+        data[3, 2, 2] = np.nan
+        data[120, 0, 5] = np.nan
+    data[7, 1, 1] = 0
+    return copy_into_shared_memory(data)
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+@pytest.mark.parametrize('axis', [None, 0, pr.PER_IMAGE])
+def test_total_and_mean(executor, axis):
+    shared = _make_stack(with_nans=False)
+    expected = shared.array.astype(np.float64)
+    npt.assert_allclose(pr.total(shared, axis=axis, executor=executor), expected.sum(axis=axis), rtol=1e-10)
+    npt.assert_allclose(pr.mean(shared, axis=axis, executor=executor), expected.mean(axis=axis), rtol=1e-6)
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_mean_per_image_with_roi(executor):
+    shared = _make_stack(with_nans=False)
+    roi = SensibleROI(2, 1, 6, 5)
+    expected = shared.array[:, 1:5, 2:6].mean(axis=(1, 2))
+    result = pr.mean(shared, axis=pr.PER_IMAGE, roi=roi, executor=executor)
+    assert result.shape == (shared.array.shape[0], )
+    assert result.dtype == np.float32
+    npt.assert_allclose(result, expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize('axis', [None, pr.PER_IMAGE])
+def test_mean_with_roi_past_image_edge(axis):
+    shared = copy_into_shared_memory(np.ones((3, 10, 10), dtype=np.float32))
+    result = pr.mean(shared, axis=axis, roi=SensibleROI(0, 0, 200, 200), executor=Executor.SERIAL)
+    npt.assert_allclose(result, 1)
+
+
+def test_mean_keeps_float_dtype():
+    shared = _make_stack(with_nans=False)
+    assert pr.mean(shared, axis=0, executor=Executor.SERIAL).dtype == np.float32
+
+
+def test_mean_of_integer_stack_is_float64():
+    shared = copy_into_shared_memory(np.arange(2 * 3 * 4, dtype=np.uint16).reshape((2, 3, 4)))
+    result = pr.mean(shared, axis=0, executor=Executor.SERIAL)
+    assert result.dtype == np.float64
+    npt.assert_equal(result, shared.array.mean(axis=0))
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+@pytest.mark.parametrize('axis', [None, 0, pr.PER_IMAGE])
+def test_minimum_maximum_ignore_nans(executor, axis):
+    shared = _make_stack()
+    npt.assert_equal(pr.minimum(shared, axis=axis, executor=executor), np.nanmin(shared.array, axis=axis))
+    npt.assert_equal(pr.maximum(shared, axis=axis, executor=executor), np.nanmax(shared.array, axis=axis))
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_min_max(executor):
+    shared = _make_stack()
+    assert pr.min_max(shared, executor=executor) == (np.nanmin(shared.array), np.nanmax(shared.array))
+
+
+def test_min_max_with_all_nan_image():
+    shared = _make_stack()
+    shared.array[0] = np.nan
+    assert pr.min_max(shared, executor=Executor.SERIAL) == (np.nanmin(shared.array), np.nanmax(shared.array))
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_nan_count(executor):
+    shared = _make_stack()
+    assert pr.nan_count(shared, executor=executor) == 2
+    per_image = pr.nan_count(shared, axis=pr.PER_IMAGE, executor=executor)
+    npt.assert_equal(per_image, np.count_nonzero(np.isnan(shared.array), axis=(1, 2)))
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_summary(executor):
+    shared = _make_stack()
+    result = pr.summary(shared, executor=executor)
+    assert result.min == np.nanmin(shared.array)
+    assert result.max == np.nanmax(shared.array)
+    assert result.nan_count == 2
+    assert result.zero_count == 1
+    assert result.negative_count == np.count_nonzero(shared.array < 0)
+
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_histogram(executor):
+    shared = _make_stack()
+    counts, edges = pr.histogram(shared, bins=16, executor=executor)
+    finite = shared.array[~np.isnan(shared.array)]
+    expected_counts, expected_edges = np.histogram(finite, bins=16)
+    npt.assert_equal(counts, expected_counts)
+    npt.assert_allclose(edges, expected_edges)
+
+
+def test_histogram_with_range():
+    shared = _make_stack()
+    counts, edges = pr.histogram(shared, bins=4, value_range=(0, 4), executor=Executor.SERIAL)
+    finite = shared.array[~np.isnan(shared.array)]
+    npt.assert_equal(counts, np.histogram(finite, bins=4, range=(0, 4))[0])
+    npt.assert_equal(edges, [0, 1, 2, 3, 4])
+
+
+def test_histogram_progress_counts_the_range_pass():
+    shared = _make_stack()
+    num_images = shared.array.shape[0]
+    progress = Progress(num_steps=num_images)
+    pr.histogram(shared, bins=4, progress=progress, executor=Executor.SERIAL)
+    assert progress.end_step == 2 * num_images
+    assert progress.current_step == 2 * num_images
+
+
+def test_result_does_not_depend_on_executor():
+    shared = _make_stack(with_nans=False)
+    serial = pr.total(shared, axis=0, executor=Executor.SERIAL)
+    threaded = pr.total(shared, axis=0, executor=Executor.THREAD)
+    npt.assert_array_equal(serial, threaded)
+
+
+def test_progress_updated_per_slab():
+    shared = _make_stack()
+    progress = mock.Mock()
+    pr.total(shared, progress=progress, executor=Executor.SERIAL)
+    num_slabs = len(pr._slabs(shared.array.shape[0]))
+    assert progress.update.call_count == num_slabs
+    assert sum(call.args[0] for call in progress.update.call_args_list) == shared.array.shape[0]
@@ -0,0 +1,89 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+from unittest import mock
+
+import pytest
+
+from mantidimaging.core.parallel.segment_pool import SegmentPool, size_class, MIN_SEGMENT_SIZE
+
+
+def _mock_segment(name, size):
+    mem = mock.Mock()
+    mem.name = name
+    mem.size = size
+    return mem
+
+
+@pytest.mark.parametrize('size,expected', [
+    (1, MIN_SEGMENT_SIZE),
+    (MIN_SEGMENT_SIZE, MIN_SEGMENT_SIZE),
+    (MIN_SEGMENT_SIZE + 1, MIN_SEGMENT_SIZE + 4 * 1024),
+    (1024 * 1024, 1024 * 1024),
+    (1024 * 1024 + 1, 1024 * 1024 + 64 * 1024),
+    (1000 * 1000, 31 * 32 * 1024),
+])
+def test_size_class(size, expected):
+    assert size_class(size) == expected
+
+
+@pytest.mark.parametrize('size', [1, 65537, 123456, 10**6, 10**9 + 7])
+def test_size_class_wastes_little(size):
+    segment_size = size_class(size)
+    assert segment_size >= size
+    assert size_class(segment_size) == segment_size
+    if size > MIN_SEGMENT_SIZE:
+        assert segment_size - size < size / 16
+
+
+def test_acquire_from_empty_pool_is_a_miss():
+    pool = SegmentPool(mock.Mock(), 10 * MIN_SEGMENT_SIZE)
+    assert pool.acquire(MIN_SEGMENT_SIZE) is None
+    assert pool.stats().misses == 1
+    assert pool.stats().hits == 0
+
+
+def test_released_segment_is_reused_for_same_size_class():
+    pool = SegmentPool(mock.Mock(), 10 * MIN_SEGMENT_SIZE)
+    mem = _mock_segment("a", MIN_SEGMENT_SIZE)
+    assert pool.release(mem)
+    assert pool.stats().pooled_bytes == MIN_SEGMENT_SIZE
+    assert pool.acquire(2 * MIN_SEGMENT_SIZE) is None
+    assert pool.acquire(MIN_SEGMENT_SIZE) is mem
+    stats = pool.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.pooled_segments == 0
+    assert stats.pooled_bytes == 0
+
+
+def test_release_rejects_segments_not_in_a_size_class():
+    pool = SegmentPool(mock.Mock(), 10 * MIN_SEGMENT_SIZE)
+    assert not pool.release(_mock_segment("a", MIN_SEGMENT_SIZE + 1))
+
+
+def test_release_rejects_segments_under_memory_pressure():
+    pool = SegmentPool(mock.Mock(), 10 * MIN_SEGMENT_SIZE, lambda: True)
+    assert not pool.release(_mock_segment("a", MIN_SEGMENT_SIZE))
+
+
+def test_least_recently_freed_segments_are_dropped_over_limit():
+    free_func = mock.Mock()
+    pool = SegmentPool(free_func, 2 * MIN_SEGMENT_SIZE)
+    segments = [_mock_segment(name, MIN_SEGMENT_SIZE) for name in "abc"]
+    for mem in segments:
+        assert pool.release(mem)
+    free_func.assert_called_once_with(segments[0])
+    assert pool.stats().pooled_segments == 2
+    assert pool.stats().released == 1
+
+
+def test_clear():
+    free_func = mock.Mock()
+    pool = SegmentPool(free_func, 10 * MIN_SEGMENT_SIZE)
+    pool.release(_mock_segment("a", MIN_SEGMENT_SIZE))
+    pool.release(_mock_segment("b", 2 * MIN_SEGMENT_SIZE))
+    assert pool.clear() == 3 * MIN_SEGMENT_SIZE
+    assert free_func.call_count == 2
+    assert pool.stats().pooled_segments == 0
+    assert pool.acquire(MIN_SEGMENT_SIZE) is None
@@ -1,10 +1,14 @@
 # Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 import unittest
+from functools import partial
 from unittest import mock
 
+import numpy as np
+import numpy.testing as npt
+
 from mantidimaging.core.parallel import shared as ps
-from mantidimaging.core.parallel.utility import SharedArrayProxy
+from mantidimaging.core.parallel.utility import SharedArray, SharedArrayProxy, Executor
 
 
 class SharedTest(unittest.TestCase):
@@ -29,6 +33,74 @@ class SharedTest(unittest.TestCase):
         self.assertTrue(len(data) == 5)
         self.assertTrue(isinstance(data[0], mock.Mock))
 
+    @mock.patch('mantidimaging.core.parallel.utility.pm.pool')
+    def test_get_data_for_executor_process_uses_proxies(self, _):
+        arrays = self._create_array_list(2, True)
+        all_in_shared_memory, data, executor = ps._get_data_for_executor(arrays, 15, Executor.AUTO)
+        self.assertTrue(all_in_shared_memory)
+        self.assertEqual(executor, Executor.PROCESS)
+        self.assertTrue(isinstance(data[0], SharedArrayProxy))
+
+    @mock.patch('mantidimaging.core.parallel.utility.pm.pool')
+    def test_get_data_for_executor_thread_uses_arrays(self, _):
+        arrays = self._create_array_list(2, True)
+        all_in_shared_memory, data, executor = ps._get_data_for_executor(arrays, 15, Executor.THREAD)
+        self.assertTrue(all_in_shared_memory)
+        self.assertEqual(executor, Executor.THREAD)
+        self.assertIs(data, arrays)
+
+    def test_promote_large_arrays(self):
+        large = np.ones(ps.SHARED_ARGUMENT_MIN_BYTES // 4, dtype=np.float32)
+        small = np.ones(4, dtype=np.float32)
+        remaining, promoted = ps._promote_large_arrays({"large": large, "small": small, "value": 3})
+        self.assertEqual(set(remaining), {"small", "value"})
+        self.assertIs(remaining["small"], small)
+        self.assertEqual(list(promoted), ["large"])
+        self.assertTrue(isinstance(promoted["large"], SharedArray))
+        npt.assert_array_equal(promoted["large"].array, large)
+
+    def test_share_partial_arguments_forwards_arrays(self):
+        def add(image, array, value):
+            image += array[:image.size] + value
+
+        large = np.arange(ps.SHARED_ARGUMENT_MIN_BYTES // 4, dtype=np.float32)
+        partial_func = ps.create_partial(add, ps.inplace1, array=large, value=3)
+        shared_func, shared_arrays = ps._share_partial_arguments(partial_func)
+        self.assertEqual(len(shared_arrays), 1)
+        self.assertNotIn("array", shared_func.args[0].keywords)
+
+        data = [mock.Mock(array=np.zeros((2, 4), dtype=np.float32))]
+        shared_func(data, 1)
+        npt.assert_array_equal(data[0].array[0], 0)
+        npt.assert_array_equal(data[0].array[1], large[:4] + 3)
+
+    def test_share_partial_arguments_without_large_arrays(self):
+        partial_func = ps.create_partial(mock.Mock(), ps.inplace1, value=3)
+        shared_func, shared_arrays = ps._share_partial_arguments(partial_func)
+        self.assertIs(shared_func, partial_func)
+        self.assertEqual(shared_arrays, [])
+
+    def test_share_partial_arguments_not_a_partial(self):
+        func = mock.Mock()
+        self.assertEqual(ps._share_partial_arguments(func), (func, []))
+
+    @mock.patch('mantidimaging.core.parallel.shared.pu.execute_impl')
+    @mock.patch('mantidimaging.core.parallel.shared._get_data_for_executor')
+    def test_execute_shares_arguments_only_for_process_pool(self, get_data, execute_impl):
+        large = np.ones(ps.SHARED_ARGUMENT_MIN_BYTES // 4, dtype=np.float32)
+        partial_func = ps.create_partial(mock.Mock(), ps.inplace1, array=large)
+
+        get_data.return_value = (True, [], Executor.THREAD)
+        ps.execute(partial_func, [], 15)
+        executed = execute_impl.call_args[0][1]
+        self.assertIs(executed.keywords["array"], large)
+
+        get_data.return_value = (True, [], Executor.PROCESS)
+        ps.execute(partial_func, [], 15)
+        executed = execute_impl.call_args[0][1]
+        self.assertIsInstance(executed, partial)
+        self.assertIs(executed.func, ps._call_with_shared_kwargs)
+
     def _create_array_list(self, num_arrays, has_shared_mem):
         array_list = []
         for _ in range(num_arrays):
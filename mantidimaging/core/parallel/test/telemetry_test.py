@@ -0,0 +1,82 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+
+import json
+from functools import partial
+from unittest import mock
+
+import pytest
+
+from mantidimaging.core.parallel import telemetry
+from mantidimaging.core.parallel.utility import Executor, execute_impl
+
+
+@pytest.fixture
+def enabled_telemetry(tmp_path):
+    telemetry.enable(tmp_path)
+    yield tmp_path
+    telemetry.disable()
+
+
+def _record(worker, submitted, started, finished, items=1):
+    return telemetry.TaskRecord(worker, submitted, started, finished, items)
+
+
+def test_disabled_recorder_passes_through():
+    recorder = telemetry.start("op", "SERIAL", 1)
+    task = mock.Mock()
+    assert recorder.wrap(task) is task
+    items = [1, 2]
+    assert recorder.stamp(items) is items
+    assert recorder.finish() == {}
+
+
+def test_wrapped_task_records_timing():
+    recorder = telemetry.OperationTelemetry("op", "SERIAL", 1)
+    task = recorder.wrap(lambda slab: slab)
+    results = list(recorder.unwrap(map(task, recorder.stamp([(0, 3), (3, 5)]))))
+    assert results == [(0, 3), (3, 5)]
+    assert [r.items for r in recorder.records] == [3, 2]
+    for record in recorder.records:
+        assert record.submitted <= record.started <= record.finished
+
+
+def test_summary():
+    recorder = telemetry.OperationTelemetry("op", "PROCESS", 2)
+    recorder._started = 100.0
+    recorder.records = [
+        _record("a", 100.0, 100.0, 101.0),
+        _record("a", 100.0, 101.0, 104.0),
+        _record("b", 100.0, 102.0, 104.0),
+    ]
+    with mock.patch("time.time", return_value=104.0):
+        summary = recorder.summary()
+    assert summary["tasks"] == 3
+    assert summary["workers_used"] == 2
+    assert summary["wall_time"] == 4.0
+    assert summary["task_time_p50"] == 2.0
+    assert summary["queue_wait_p50"] == 1.0
+    assert summary["utilisation"] == pytest.approx(6 / 8)
+    assert summary["imbalance"] == pytest.approx(4 / 3)
+
+
+def test_execute_impl_writes_telemetry_file(enabled_telemetry):
+    func = mock.Mock()
+    # More items than run serially, so that the thread executor is used
+    execute_impl(20, func, False, None, "Test op", executor=Executor.THREAD)
+    files = list(enabled_telemetry.glob("*_Test_op.json"))
+    assert len(files) == 1
+    with open(files[0]) as f:
+        written = json.load(f)
+    assert written["summary"]["operation"] == "Test op"
+    assert written["summary"]["executor"] == "THREAD"
+    assert written["summary"]["items"] == 20
+    assert sum(task["items"] for task in written["tasks"]) == 20
+
+
+def test_operation_name_from_partial():
+    def func(index, value):
+        pass
+
+    assert telemetry.operation_name(partial(func, value=1)).endswith("func")
+    assert telemetry.operation_name(partial(func, value=1), "Message") == "Message"
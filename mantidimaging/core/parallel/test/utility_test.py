@@ -1,6 +1,7 @@
 # Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 
+import pickle
 import numpy as np
 from unittest import mock
 
@@ -8,8 +9,11 @@ import pytest
 import numpy.testing as npt
 
 from mantidimaging.test_helpers import unit_test_helper as th
+from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.core.parallel.utility import _create_shared_array, execute_impl, multiprocessing_necessary,\
-    copy_into_shared_memory
+    copy_into_shared_memory, calculate_slab_size, generate_slabs, DispatchMode, _SlabFunction, _attached_memory,\
+    evict_freed_shared_memory, Executor, select_executor, _segment_pool, segment_pool_stats, create_array,\
+    _CancelFlag, OperationCancelled
 
 
 @pytest.mark.parametrize(
@@ -24,9 +28,13 @@ def test_correctly_chooses_parallel(shape: int, is_shared_data: bool, should_be_
     assert multiprocessing_necessary(shape, is_shared_data) is should_be_parallel
 
 
+def _mock_progress():
+    return mock.Mock(should_cancel=False)
+
+
 def test_execute_impl_seq():
     mock_partial = mock.Mock()
-    mock_progress = mock.Mock()
+    mock_progress = _mock_progress()
     execute_impl(1, mock_partial, False, mock_progress, "Test")
     mock_partial.assert_called_once_with(0)
     mock_progress.update.assert_called_once_with(1, "Test")
@@ -35,13 +43,148 @@ def test_execute_impl_seq():
 @mock.patch('mantidimaging.core.parallel.utility.pm.pool')
 def test_execute_impl_par(mock_pool):
     mock_partial = mock.Mock()
-    mock_progress = mock.Mock()
-    mock_pool.imap.return_value = range(15)
-    execute_impl(15, mock_partial, True, mock_progress, "Test")
+    mock_progress = _mock_progress()
+    mock_pool.imap.return_value = [(i, i + 1) for i in range(15)]
+    execute_impl(15, mock_partial, True, mock_progress, "Test", DispatchMode.INDEX)
     mock_pool.imap.assert_called_once()
     assert mock_progress.update.call_count == 15
 
 
+@mock.patch('mantidimaging.core.parallel.utility._time_first_item', return_value=0.001)
+@mock.patch('mantidimaging.core.parallel.utility.pm.cores', 2)
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool')
+def test_execute_impl_par_slabs(mock_pool, _):
+    mock_partial = mock.Mock()
+    mock_progress = _mock_progress()
+    mock_pool.imap_unordered.return_value = generate_slabs(1, 15, 2)
+    execute_impl(15, mock_partial, True, mock_progress, "Test", DispatchMode.SLAB)
+    mock_pool.imap.assert_not_called()
+    slabs = mock_pool.imap_unordered.call_args[0][1]
+    assert slabs[0] == (1, 3)
+    assert slabs[-1] == (13, 15)
+    # one update for the measured image plus one for each slab, covering all the images
+    assert sum(c[0][0] for c in mock_progress.update.call_args_list) == 15
+
+
+@mock.patch('mantidimaging.core.parallel.utility._time_first_item', return_value=10.0)
+@mock.patch('mantidimaging.core.parallel.utility.pm.cores', 2)
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool')
+def test_execute_impl_auto_uses_index_for_slow_items(mock_pool, _):
+    mock_pool.imap.return_value = [(i, i + 1) for i in range(1, 15)]
+    execute_impl(15, mock.Mock(), True, _mock_progress(), "Test", DispatchMode.AUTO)
+    mock_pool.imap_unordered.assert_not_called()
+    assert list(mock_pool.imap.call_args[0][1]) == list(range(1, 15))
+
+
+@pytest.mark.parametrize(
+    'num_items,cores,item_time,expected',
+    (
+        [1000, 4, 0.5, 1],  # slow items are not grouped
+        [1000, 4, 0.01, 10],  # sized from the cost of an item
+        [1000, 4, 0.0, 63],  # limited so there are enough slabs per core
+        [10, 64, 0.0, 1],
+    ))
+def test_calculate_slab_size(num_items, cores, item_time, expected):
+    assert calculate_slab_size(num_items, cores, item_time) == expected
+
+
+def test_generate_slabs():
+    assert generate_slabs(1, 10, 4) == [(1, 5), (5, 9), (9, 10)]
+
+
+def test_slab_function_calls_every_index():
+    func = mock.Mock()
+    assert _SlabFunction(func)((3, 6)) == (3, 6)
+    assert [c[0][0] for c in func.call_args_list] == [3, 4, 5]
+
+
+def test_slab_function_stops_when_cancelled():
+    cancel_flag = _CancelFlag()
+    func = mock.Mock(side_effect=lambda index: cancel_flag.set() if index == 4 else None)
+    assert _SlabFunction(func, cancel_flag)((3, 8)) == (3, 5)
+    assert [c[0][0] for c in func.call_args_list] == [3, 4]
+
+
+@pytest.mark.parametrize('executor', [Executor.SERIAL, Executor.THREAD])
+def test_execute_impl_cancelled(executor):
+    progress = Progress(num_steps=1000)
+    processed = []
+
+    def func(index):
+        processed.append(index)
+        if index == 20:
+            progress.cancel()
+
+    with pytest.raises(OperationCancelled) as exc_info:
+        execute_impl(1000, func, False, progress, "Test", executor=executor)
+    assert len(processed) < 1000
+    assert exc_info.value.processed_count == len(processed)
+    first, last = exc_info.value.processed_range
+    assert first == min(processed)
+    assert last == max(processed) + 1
+
+
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool')
+def test_execute_impl_par_cancel_skips_remaining_tasks(mock_pool):
+    progress = Progress(num_steps=15)
+
+    def imap(task, indices, chunksize):
+        # Run the tasks in this process, cancelling part way through
+        for index in indices:
+            if index == 5:
+                progress.cancel()
+            yield task(index)
+
+    mock_pool.imap.side_effect = imap
+    mock_partial = mock.Mock()
+    with pytest.raises(OperationCancelled) as exc_info:
+        execute_impl(15, mock_partial, True, progress, "Test", DispatchMode.INDEX)
+    # the task that was running when cancel was requested completes, then the rest are skipped
+    assert mock_partial.call_count == 6
+    assert exc_info.value.processed_range == (0, 6)
+
+
+def test_cancel_flag_is_seen_through_pickling():
+    cancel_flag = _CancelFlag(shared=True)
+    copy = pickle.loads(pickle.dumps(cancel_flag))
+    assert not copy.is_set()
+    cancel_flag.set()
+    assert copy.is_set()
+
+
+@pytest.mark.parametrize(
+    'requested,num_items,is_shared_data,has_pool,expected',
+    (
+        [Executor.AUTO, 15, True, True, Executor.PROCESS],
+        [Executor.AUTO, 15, False, True, Executor.THREAD],
+        [Executor.AUTO, 15, True, False, Executor.THREAD],
+        [Executor.PROCESS, 15, False, True, Executor.THREAD],
+        [Executor.THREAD, 15, True, True, Executor.THREAD],
+        [Executor.SERIAL, 15, True, True, Executor.SERIAL],
+        [Executor.AUTO, 10, True, True, Executor.SERIAL],
+        [Executor.THREAD, 10, False, True, Executor.SERIAL],
+    ))
+def test_select_executor(requested, num_items, is_shared_data, has_pool, expected):
+    with mock.patch('mantidimaging.core.parallel.utility.pm.pool', mock.Mock() if has_pool else None):
+        assert select_executor(requested, num_items, is_shared_data) == expected
+
+
+def test_execute_impl_threads():
+    mock_partial = mock.Mock()
+    mock_progress = _mock_progress()
+    execute_impl(15, mock_partial, False, mock_progress, "Test", executor=Executor.THREAD)
+    assert sorted(c[0][0] for c in mock_partial.call_args_list) == list(range(15))
+    assert sum(c[0][0] for c in mock_progress.update.call_args_list) == 15
+
+
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool')
+def test_execute_impl_serial_does_not_use_pool(mock_pool):
+    mock_partial = mock.Mock()
+    execute_impl(15, mock_partial, True, _mock_progress(), "Test", executor=Executor.SERIAL)
+    mock_pool.imap.assert_not_called()
+    assert mock_partial.call_count == 15
+
+
 @pytest.mark.parametrize('dtype,expected_dtype', [
     [np.uint8, np.uint8],
     ['uint8', np.uint8],
@@ -90,6 +233,97 @@ def test_looking_up_shared_array_from_proxy():
     assert shared_array._shared_memory.name == proxy._shared_array._shared_memory.name
 
 
+@mock.patch('mantidimaging.core.parallel.utility._attached_memory_cache_enabled', return_value=True)
+def test_proxies_reuse_attached_shared_memory(_):
+    shared_array = _create_shared_array((5, 5, 5), np.float32)
+    mem_name = shared_array._shared_memory.name
+
+    first_proxy = shared_array.array_proxy
+    first_proxy.array[0] = 1
+    second_proxy = shared_array.array_proxy
+    npt.assert_equal(second_proxy.array[0], 1)
+
+    assert first_proxy._shared_array._shared_memory is _attached_memory[mem_name]
+    assert second_proxy._shared_array._shared_memory is _attached_memory[mem_name]
+    assert not first_proxy._shared_array._close_mem_on_del
+
+
+@mock.patch('mantidimaging.core.parallel.utility._attached_memory_cache_enabled', return_value=True)
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool', None)
+@mock.patch.object(_segment_pool, 'max_bytes', 0)
+def test_attached_shared_memory_is_closed_when_freed(_):
+    shared_array = _create_shared_array((5, 5, 5), np.float32)
+    mem_name = shared_array._shared_memory.name
+    proxy = shared_array.array_proxy
+    assert proxy.array.shape == (5, 5, 5)
+    assert mem_name in _attached_memory
+
+    del proxy
+    del shared_array
+    assert mem_name not in _attached_memory
+
+
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool', None)
+def test_freed_segment_is_reused_and_zeroed():
+    _segment_pool.clear()
+    shared_array = create_array((10, 20, 30))
+    mem_name = shared_array._shared_memory.name
+    shared_array.array[:] = 5
+    del shared_array
+
+    hits_before = segment_pool_stats().hits
+    reused = create_array((10, 30, 20))
+    assert reused._shared_memory.name == mem_name
+    assert segment_pool_stats().hits == hits_before + 1
+    npt.assert_equal(reused.array, 0)
+    del reused
+    _segment_pool.clear()
+
+
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool', None)
+def test_segment_with_outstanding_view_is_not_reused():
+    _segment_pool.clear()
+    shared_array = create_array((10, 20, 30))
+    view = shared_array.array[1:3]
+    del shared_array
+    assert segment_pool_stats().pooled_segments == 0
+    assert view.shape == (2, 20, 30)
+
+
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool', None)
+@mock.patch('mantidimaging.core.parallel.utility._enough_memory_for_bytes', side_effect=[True, False, True])
+def test_pool_is_cleared_when_memory_is_short(_):
+    _segment_pool.clear()
+    freed = create_array((100, 20, 30))
+    del freed
+    assert segment_pool_stats().pooled_segments == 1
+    # A different size class, so the pooled segment can't be reused
+    other_size = create_array((200, 20, 30))
+    assert segment_pool_stats().pooled_segments == 0
+    assert other_size.array.shape == (200, 20, 30)
+
+
+@mock.patch('mantidimaging.core.parallel.utility._shared_memory_exists', return_value=False)
+@mock.patch.dict(_attached_memory, clear=True)
+def test_evict_freed_shared_memory(_):
+    # Attachments left by other tests are cleared, so that only this one is evicted
+    mem = mock.Mock()
+    _attached_memory["MI_1_test"] = mem
+    assert evict_freed_shared_memory() == 1
+    mem.close.assert_called_once()
+    assert "MI_1_test" not in _attached_memory
+
+
+@mock.patch('mantidimaging.core.parallel.utility._shared_memory_exists', return_value=False)
+@mock.patch.dict(_attached_memory, clear=True)
+def test_evict_freed_shared_memory_keeps_segments_in_use(_):
+    mem = mock.Mock()
+    mem.close.side_effect = BufferError
+    _attached_memory["MI_1_test"] = mem
+    assert evict_freed_shared_memory() == 0
+    assert _attached_memory.pop("MI_1_test") is mem
+
+
 if __name__ == "__main__":
     import pytest
 
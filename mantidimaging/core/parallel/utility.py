@@ -1,14 +1,20 @@
 # Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 
+import atexit
+import itertools
 import os
+import sys
+import time
+from enum import Enum, auto
 from functools import partial
 from logging import getLogger
 from multiprocessing import shared_memory
 from multiprocessing.shared_memory import SharedMemory
-from typing import Tuple, TYPE_CHECKING, Optional, Callable
+from typing import Dict, Iterable, List, Tuple, TYPE_CHECKING, Optional, Callable
 
 import numpy as np
+import psutil
 
 if TYPE_CHECKING:
     import numpy.typing as npt
@@ -17,9 +23,18 @@ from mantidimaging.core.utility.memory_usage import system_free_memory
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.core.utility.size_calculator import full_size_KB, full_size_bytes
 from mantidimaging.core.parallel import manager as pm
+from mantidimaging.core.parallel import telemetry
+from mantidimaging.core.parallel.segment_pool import DEFAULT_MAX_FRACTION, SegmentPool, SegmentPoolStats, size_class
 
 LOG = getLogger(__name__)
 
+# Shared memory segments this process has attached to through a SharedArrayProxy, keyed by the segment name.
+# Pool workers unpickle a new proxy for every task, so keeping the segments attached means that the cost of
+# opening and mapping a segment is paid once per worker rather than once per image.
+# Only used on Linux, where freed segments can be detected in /dev/shm. On other platforms a segment is only
+# destroyed once every process has closed it, so keeping it attached would prevent it from ever being freed.
+_attached_memory: Dict[str, SharedMemory] = {}
+
 
 def enough_memory(shape, dtype):
     return full_size_KB(shape=shape, dtype=dtype) < system_free_memory().kb()
@@ -27,37 +42,189 @@ def enough_memory(shape, dtype):
 
 def create_array(shape: Tuple[int, ...], dtype: 'npt.DTypeLike' = np.float32) -> 'SharedArray':
     """
-    Create an array in shared memory
+    Create an array in shared memory. The array is filled with zeros.
+
+    Freed segments are kept in a pool and reused where possible, see segment_pool_stats.
 
     :param shape: Shape of the array
     :param dtype: Dtype of the array
     :return: The created SharedArray
     """
-    if not enough_memory(shape, dtype):
-        raise RuntimeError(
-            "The machine does not have enough physical memory available to allocate space for this data.")
-
     return _create_shared_array(shape, dtype)
 
 
-def _create_shared_array(shape: Tuple[int, ...], dtype: 'npt.DTypeLike' = np.float32) -> 'SharedArray':
+def _create_shared_array(shape: Tuple[int, ...],
+                         dtype: 'npt.DTypeLike' = np.float32,
+                         zero: bool = True) -> 'SharedArray':
+    """
+    :param zero: Whether a reused segment needs to be filled with zeros. Can be False when the caller will overwrite
+                 the whole array. New segments are always zero.
+    """
     size = full_size_bytes(shape, dtype)
 
     LOG.info(f'Requested shared array with shape={shape}, size={size}, dtype={dtype}')
 
+    segment_size = size_class(size)
+    mem = _segment_pool.acquire(segment_size)
+    if mem is not None:
+        shared_array = _read_array_from_shared_memory(shape, dtype, mem, True)
+        if zero:
+            shared_array.array.fill(0)
+        return shared_array
+
+    if not _enough_memory_for_bytes(segment_size):
+        # Give the pooled segments back to the system before giving up
+        _segment_pool.clear()
+        if not _enough_memory_for_bytes(segment_size):
+            raise RuntimeError(
+                "The machine does not have enough physical memory available to allocate space for this data.")
+
     name = pm.generate_mi_shared_mem_name()
-    mem = shared_memory.SharedMemory(name=name, create=True, size=size)
+    mem = shared_memory.SharedMemory(name=name, create=True, size=segment_size)
     return _read_array_from_shared_memory(shape, dtype, mem, True)
 
 
-def _read_array_from_shared_memory(shape: Tuple[int, ...], dtype: 'npt.DTypeLike', mem: SharedMemory,
-                                   free_mem_on_delete: bool) -> 'SharedArray':
+def _enough_memory_for_bytes(size: int) -> bool:
+    return size / 1024 < system_free_memory().kb()
+
+
+def _free_shared_memory(mem: SharedMemory) -> None:
+    """
+    Destroy a shared memory segment created by this process, and let the pool workers know that it has gone
+    """
+    mem.close()
+    try:
+        mem.unlink()
+    except FileNotFoundError:
+        # Do nothing, memory has already been freed
+        return
+    if _attached_memory:
+        _close_attached_memory(mem.name)
+    _evict_freed_shared_memory_in_workers()
+
+
+def _under_memory_pressure() -> bool:
+    return system_free_memory().kb() < 0
+
+
+def _default_pool_max_bytes() -> int:
+    return int(psutil.virtual_memory().total * DEFAULT_MAX_FRACTION)
+
+
+_segment_pool = SegmentPool(_free_shared_memory, _default_pool_max_bytes(), _under_memory_pressure)
+# Pooled segments are not owned by any SharedArray, so have to be freed explicitly before exiting
+atexit.register(lambda: _segment_pool.clear())
+
+
+def segment_pool_stats() -> SegmentPoolStats:
+    """
+    Number of allocations served from and missing the pool of freed shared memory, and what is currently pooled
+    """
+    return _segment_pool.stats()
+
+
+def set_segment_pool_max_bytes(max_bytes: int) -> None:
+    """
+    Set the most memory that freed shared memory segments may hold on to. Setting 0 disables the pool.
+    """
+    _segment_pool.max_bytes = max_bytes
+    _segment_pool.trim(max_bytes)
+
+
+def clear_segment_pool() -> int:
+    """
+    Give all pooled shared memory back to the system
+
+    :return: The number of bytes freed
+    """
+    stats = _segment_pool.stats()
+    freed = _segment_pool.clear()
+    if stats.hits or stats.misses:
+        LOG.info(f'Shared memory pool: {stats.hits} reused, {stats.misses} created, {stats.released} released')
+    return freed
+
+
+def _read_array_from_shared_memory(shape: Tuple[int, ...],
+                                   dtype: 'npt.DTypeLike',
+                                   mem: SharedMemory,
+                                   free_mem_on_delete: bool,
+                                   close_mem_on_delete: bool = True) -> 'SharedArray':
     array = np.ndarray(shape, dtype=dtype, buffer=mem.buf)
-    return SharedArray(array, mem, free_mem_on_del=free_mem_on_delete)
+    return SharedArray(array, mem, free_mem_on_del=free_mem_on_delete, close_mem_on_del=close_mem_on_delete)
+
+
+def _attached_memory_cache_enabled() -> bool:
+    return sys.platform == 'linux'
+
+
+def _shared_memory_exists(mem_name: str) -> bool:
+    return os.path.exists(f'{pm.MEM_DIR_LINUX}/{mem_name}')
+
+
+def _attach_shared_memory(mem_name: str) -> SharedMemory:
+    """
+    Get the shared memory segment with the given name, reusing the segment if this process has already attached to it
+    """
+    mem = _attached_memory.get(mem_name)
+    if mem is None:
+        # Only check for segments that have been freed when a new segment is needed, so that repeated lookups of
+        # the same segment don't have to touch the file system
+        evict_freed_shared_memory()
+        mem = shared_memory.SharedMemory(name=mem_name)
+        _attached_memory[mem_name] = mem
+    return mem
+
+
+def _close_attached_memory(mem_name: str) -> bool:
+    mem = _attached_memory.pop(mem_name, None)
+    if mem is None:
+        return True
+    try:
+        mem.close()
+    except BufferError:
+        # An array is still using the segment, keep it until the next eviction
+        _attached_memory[mem_name] = mem
+        return False
+    return True
+
+
+def evict_freed_shared_memory(_=None) -> int:
+    """
+    Close any attached shared memory segments that have been freed by the process that created them, so that the
+    memory can be given back to the system.
+
+    The unused argument allows this to be mapped over the process pool.
+
+    :return: The number of segments that were closed
+    """
+    evicted = 0
+    for mem_name in list(_attached_memory.keys()):
+        if not _shared_memory_exists(mem_name) and _close_attached_memory(mem_name):
+            evicted += 1
+    if evicted:
+        LOG.debug(f'Closed {evicted} freed shared memory segments')
+    return evicted
+
+
+def _evict_freed_shared_memory_in_workers() -> None:
+    """
+    Ask the pool workers to close their attachments to segments that have been freed. The pool doesn't guarantee which
+    worker runs each task, but one task is submitted per worker and the workers also evict freed segments when they
+    next attach to a new one.
+    """
+    # The idle pool can be stopped by another thread at any time
+    pool = pm.pool
+    if pool is None:
+        return
+    try:
+        pool.map_async(evict_freed_shared_memory, range(pm.cores), chunksize=1)
+    except ValueError:
+        # The pool has already been closed
+        pass
 
 
 def copy_into_shared_memory(array: np.ndarray) -> 'SharedArray':
-    shared_array = create_array(array.shape, array.dtype)
+    shared_array = _create_shared_array(array.shape, array.dtype, zero=False)
     shared_array.array[:] = array[:]
     return shared_array
 
@@ -82,7 +249,7 @@ def calculate_chunksize(cores):
     return 1
 
 
-def multiprocessing_necessary(shape: int, is_shared_data: bool) -> bool:
+def _parallel_allowed(shape: int) -> bool:
     # This environment variable will be present when running PYDEVD from PyCharm
     # and that has the bug that multiprocessing Pools can never finish `.join()` ing
     # thus never actually finish their processing.
@@ -90,35 +257,299 @@ def multiprocessing_necessary(shape: int, is_shared_data: bool) -> bool:
         LOG.info("Debugging environment variable 'PYDEVD_LOAD_VALUES_ASYNC' found. Running synchronously on 1 core")
         return False
 
+    if shape <= 10:
+        LOG.info("Shape under 10")
+        return False
+    return True
+
+
+def multiprocessing_necessary(shape: int, is_shared_data: bool) -> bool:
+    if not _parallel_allowed(shape):
+        return False
+
     if not is_shared_data:
         LOG.info("Not all of the data uses shared memory")
         return False
-    elif shape <= 10:
-        LOG.info("Shape under 10")
-        return False
 
     LOG.info("Multiprocessing required")
     return True
 
 
-def execute_impl(img_num: int, partial_func: partial, is_shared_data: bool, progress: Progress, msg: str):
-    task_name = f"{msg}"
-    progress = Progress.ensure_instance(progress, num_steps=img_num, task_name=task_name)
-    indices_list = range(img_num)
-    if multiprocessing_necessary(img_num, is_shared_data) and pm.pool:
-        LOG.info(f"Running async on {pm.cores} cores")
-        # Using _ in the for _ enumerate is slightly faster, because the tuple from enumerate isn't unpacked,
-        # and thus some time is saved
+class Executor(Enum):
+    """
+    The backend used to run a function over every index of a stack.
+
+    PROCESS uses the process pool and requires all of the data to be in shared memory. THREAD uses a thread pool
+    working on the arrays in place, which gives a speed up when the function releases the GIL. SERIAL runs on the
+    calling thread. AUTO uses PROCESS if all of the data is in shared memory, and THREAD otherwise.
+    """
+    AUTO = auto()
+    PROCESS = auto()
+    THREAD = auto()
+    SERIAL = auto()
+
+
+def select_executor(executor: Executor, num_items: int, is_shared_data: bool) -> Executor:
+    """
+    Resolve the requested executor to the one that will actually be used for the given data.
+
+    Falls back to THREAD if PROCESS is requested but the data is not all in shared memory or the pool
+    has not been enabled, and to SERIAL if there are too few items to be worth running in parallel.
+    """
+    if executor == Executor.SERIAL or not _parallel_allowed(num_items):
+        return Executor.SERIAL
+    if executor in (Executor.AUTO, Executor.PROCESS) and multiprocessing_necessary(num_items, is_shared_data) \
+            and pm.pool_available():
+        return Executor.PROCESS
+    return Executor.THREAD
+
+
+class DispatchMode(Enum):
+    """
+    How work is handed to the process pool.
+
+    INDEX sends one image index per task, SLAB sends a contiguous range of indices per task and AUTO chooses
+    between them based on the measured cost of processing a single image.
+    """
+    INDEX = auto()
+    SLAB = auto()
+    AUTO = auto()
+
+
+# Slabs are sized so that each one takes roughly this long to process, which amortises the cost of pickling the
+# function, looking up the shared memory proxies and returning the result
+TARGET_SLAB_SECONDS = 0.1
+# Minimum number of slabs per core, so that the work stays balanced if some images take longer than others
+MIN_SLABS_PER_CORE = 4
+
+
+def calculate_slab_size(num_items: int, cores: int, item_time: float) -> int:
+    """
+    Calculate how many consecutive indices each task should process.
+
+    :param num_items: The total number of indices to process
+    :param cores: The number of workers that will process the slabs
+    :param item_time: The measured time in seconds to process a single index
+    :return: The number of indices per slab, 1 means that slabs are not worth using
+    """
+    if item_time <= 0:
+        size_from_cost = num_items
+    else:
+        size_from_cost = int(TARGET_SLAB_SECONDS / item_time)
+    size_for_balance = -(-num_items // (max(cores, 1) * MIN_SLABS_PER_CORE))
+    return max(1, min(size_from_cost, size_for_balance))
+
+
+def generate_slabs(start: int, stop: int, slab_size: int) -> List[Tuple[int, int]]:
+    return [(i, min(i + slab_size, stop)) for i in range(start, stop, slab_size)]
+
+
+class OperationCancelled(RuntimeError):
+    """
+    Raised when a parallel operation stops early because its Progress was cancelled.
+
+    :param processed_range: The first and one past the last index that may have been processed, or None if nothing
+                            was processed. Indices in the range may have been skipped when the work was not in order.
+    :param processed_count: The number of indices that were processed
+    """
+    def __init__(self, processed_range: Optional[Tuple[int, int]], processed_count: int):
+        super().__init__('Task has been cancelled')
+        self.processed_range = processed_range
+        self.processed_count = processed_count
+
+
+class _CancelFlag:
+    """
+    Set by the process running an operation to tell the tasks that have not started yet to skip their work.
+    When shared, the flag is kept in shared memory so that the pool workers see it being set. Otherwise the tasks run
+    in this process, so they can also see the progress being cancelled straight away.
+    """
+    def __init__(self, shared: bool = False, progress: Optional[Progress] = None):
+        self._progress = progress
+        self._shared_array: Optional[SharedArray] = _create_shared_array((1, ), np.uint8) if shared else None
+        self._proxy: Optional[SharedArrayProxy] = None
+        self._array: Optional[np.ndarray] = self._shared_array.array if self._shared_array else np.zeros(1, np.uint8)
+
+    def __getstate__(self):
+        assert self._shared_array is not None, "Only a shared flag can be sent to the process pool"
+        return {'_proxy': self._shared_array.array_proxy}
+
+    def __setstate__(self, state):
+        self._progress = None
+        self._shared_array = None
+        self._proxy = state['_proxy']
+        self._array = None
+
+    def set(self) -> None:
+        assert self._array is not None
+        self._array[0] = 1
+
+    def is_set(self) -> bool:
+        if self._array is None:
+            assert self._proxy is not None
+            self._array = self._proxy.array
+        return bool(self._array[0]) or (self._progress is not None and self._progress.should_cancel)
+
+
+class _CancellableTask:
+    """
+    Wraps a per-index function so that it is skipped once the operation has been cancelled.
+    Returns the range of indices that were processed, which is empty if the index was skipped.
+    """
+    def __init__(self, func: Callable[[int], None], cancel_flag: _CancelFlag):
+        self.func = func
+        self.cancel_flag = cancel_flag
+
+    def __call__(self, index: int) -> Tuple[int, int]:
+        if self.cancel_flag.is_set():
+            return index, index
+        self.func(index)
+        return index, index + 1
+
+
+class _SlabFunction:
+    """
+    Wraps a per-index function so that it can process a whole slab of indices in one task. The rest of the slab is
+    skipped once the operation has been cancelled. Returns the range of indices that were processed.
+    """
+    def __init__(self, func: Callable[[int], None], cancel_flag: Optional[_CancelFlag] = None):
+        self.func = func
+        self.cancel_flag = cancel_flag
+
+    def __call__(self, slab: Tuple[int, int]) -> Tuple[int, int]:
+        for index in range(*slab):
+            if self.cancel_flag is not None and self.cancel_flag.is_set():
+                return slab[0], index
+            self.func(index)
+        return slab
+
+
+def _time_first_item(func: Callable[[int], None]) -> float:
+    start = time.perf_counter()
+    func(0)
+    return time.perf_counter() - start
+
+
+def _consume(results: Iterable[Tuple[int, int]], progress: Progress, msg: str, cancel_flag: _CancelFlag) -> None:
+    """
+    Report progress as each task completes, and check for cancellation between tasks.
+
+    Once cancelled, the remaining tasks are still collected so that the pool is free for the next operation, but they
+    skip their work so finish quickly.
+
+    :raises OperationCancelled: If the progress was cancelled before all the tasks completed
+    """
+    first, last, count = None, None, 0
+    for start, stop in results:
+        if stop > start:
+            first = start if first is None else min(first, start)
+            last = stop if last is None else max(last, stop)
+            count += stop - start
+        if cancel_flag.is_set():
+            continue
+        if progress.should_cancel:
+            cancel_flag.set()
+            continue
+        try:
+            progress.update(stop - start, msg)
+        except RuntimeError:
+            if not progress.should_cancel:
+                raise
+            cancel_flag.set()
+
+    if cancel_flag.is_set():
+        processed_range = (first, last) if first is not None and last is not None else None
+        LOG.info(f"Operation cancelled after processing {count} images, range {processed_range}")
+        raise OperationCancelled(processed_range, count)
+
+
+def _run_in_pool(func: Callable[[int], None], num_items: int, progress: Progress, msg: str, dispatch: DispatchMode,
+                 recorder: telemetry.OperationTelemetry) -> None:
+    LOG.info(f"Running async on {pm.cores} cores")
+    assert pm.pool is not None
+    cancel_flag = _CancelFlag(shared=True)
+    if dispatch == DispatchMode.INDEX:
         # Using imap here seems to be the best choice:
         # - imap_unordered gives the images back in random order
         # - map and map_async do not improve speed performance
-        for _ in pm.pool.imap(partial_func, indices_list, chunksize=calculate_chunksize(pm.cores)):
-            progress.update(1, msg)
+        task = recorder.wrap(_CancellableTask(func, cancel_flag))
+        recorder.measure_pickling(task)
+        results = pm.pool.imap(task, recorder.stamp(range(num_items)), chunksize=calculate_chunksize(pm.cores))
+        _consume(recorder.unwrap(results), progress, msg, cancel_flag)
+        return
+
+    # The first image is processed here to measure how long a single image takes, which is then used to size the slabs
+    item_time = _time_first_item(func)
+    slab_size = calculate_slab_size(num_items - 1, pm.cores, item_time)
+    if dispatch == DispatchMode.AUTO and slab_size == 1:
+        LOG.info(f"Dispatching by index, one image took {item_time:.4f}s")
+        task = recorder.wrap(_CancellableTask(func, cancel_flag))
+        recorder.measure_pickling(task)
+        results = pm.pool.imap(task, recorder.stamp(range(1, num_items)), chunksize=calculate_chunksize(pm.cores))
+    else:
+        LOG.info(f"Dispatching in slabs of {slab_size} images, one image took {item_time:.4f}s")
+        # The order that slabs complete in doesn't matter as they all write to separate indices
+        task = recorder.wrap(_SlabFunction(func, cancel_flag))
+        recorder.measure_pickling(task)
+        results = pm.pool.imap_unordered(task, recorder.stamp(generate_slabs(1, num_items, slab_size)))
+    _consume(itertools.chain([(0, 1)], recorder.unwrap(results)), progress, msg, cancel_flag)
+
+
+def _run_in_threads(func: Callable[[int], None], num_items: int, progress: Progress, msg: str,
+                    recorder: telemetry.OperationTelemetry) -> None:
+    thread_pool = pm.get_thread_pool()
+    LOG.info(f"Running on {pm.threads} threads")
+    cancel_flag = _CancelFlag(progress=progress)
+    # There is no dispatch cost to amortise when using threads, so the slabs are only sized to balance the work
+    slab_size = calculate_slab_size(num_items, pm.threads, 0)
+    results = thread_pool.map(recorder.wrap(_SlabFunction(func, cancel_flag)),
+                              recorder.stamp(generate_slabs(0, num_items, slab_size)))
+    _consume(recorder.unwrap(results), progress, msg, cancel_flag)
+
+
+def _run_serial(func: Callable[[int], None], num_items: int, progress: Progress, msg: str,
+                recorder: telemetry.OperationTelemetry) -> None:
+    LOG.info("Running synchronously on 1 core")
+    cancel_flag = _CancelFlag(progress=progress)
+    results = map(recorder.wrap(_CancellableTask(func, cancel_flag)), recorder.stamp(range(num_items)))
+    _consume(recorder.unwrap(results), progress, msg, cancel_flag)
+
+
+def _run(func: Callable[[int], None], num_items: int, is_shared_data: bool, progress: Progress, msg: str,
+         dispatch: DispatchMode, executor: Executor) -> None:
+    executor = select_executor(executor, num_items, is_shared_data)
+    name = telemetry.operation_name(func, msg)
+    if executor == Executor.PROCESS:
+        with pm.use_pool():
+            recorder = telemetry.start(name, executor.name, pm.cores)
+            try:
+                _run_in_pool(func, num_items, progress, msg, dispatch, recorder)
+            finally:
+                recorder.finish()
+    elif executor == Executor.THREAD:
+        recorder = telemetry.start(name, executor.name, pm.threads)
+        try:
+            _run_in_threads(func, num_items, progress, msg, recorder)
+        finally:
+            recorder.finish()
     else:
-        LOG.info("Running synchronously on 1 core")
-        for ind in indices_list:
-            partial_func(ind)
-            progress.update(1, msg)
+        recorder = telemetry.start(name, executor.name, 1)
+        try:
+            _run_serial(func, num_items, progress, msg, recorder)
+        finally:
+            recorder.finish()
+
+
+def execute_impl(img_num: int,
+                 partial_func: partial,
+                 is_shared_data: bool,
+                 progress: Progress,
+                 msg: str,
+                 dispatch: DispatchMode = DispatchMode.AUTO,
+                 executor: Executor = Executor.AUTO):
+    task_name = f"{msg}"
+    progress = Progress.ensure_instance(progress, num_steps=img_num, task_name=task_name)
+    _run(partial_func, img_num, is_shared_data, progress, msg, dispatch, executor)
     progress.mark_complete()
 
 
@@ -126,37 +557,47 @@ def run_compute_func_impl(worker_func: Callable[[int], None],
                           num_operations: int,
                           is_shared_data: bool,
                           progress=None,
-                          msg: str = ""):
+                          msg: str = "",
+                          dispatch: DispatchMode = DispatchMode.AUTO,
+                          executor: Executor = Executor.AUTO):
     task_name = f"{msg}"
     progress = Progress.ensure_instance(progress, num_steps=num_operations, task_name=task_name)
-    indices_list = range(num_operations)
-    if multiprocessing_necessary(num_operations, is_shared_data) and pm.pool:
-        LOG.info(f"Running async on {pm.cores} cores")
-        for _ in pm.pool.imap(worker_func, indices_list, chunksize=calculate_chunksize(pm.cores)):
-            progress.update(1, msg)
-    else:
-        LOG.info("Running synchronously on 1 core")
-        for ind in indices_list:
-            worker_func(ind)
-            progress.update(1, msg)
+    _run(worker_func, num_operations, is_shared_data, progress, msg, dispatch, executor)
     progress.mark_complete()
 
 
 class SharedArray:
-    def __init__(self, array: np.ndarray, shared_memory: Optional[SharedMemory], free_mem_on_del: bool = True):
+    def __init__(self,
+                 array: np.ndarray,
+                 shared_memory: Optional[SharedMemory],
+                 free_mem_on_del: bool = True,
+                 close_mem_on_del: bool = True):
         self.array = array
         self._shared_memory = shared_memory
         self._free_mem_on_del = free_mem_on_del
+        self._close_mem_on_del = close_mem_on_del
 
     def __del__(self):
         if self.has_shared_memory:
-            self._shared_memory.close()
             if self._free_mem_on_del:
+                # The segment can only be reused if nothing else still holds a reference to the array or a view of it
+                if sys.getrefcount(self.array) <= 2:
+                    self.array = None
+                    if _segment_pool.release(self._shared_memory):
+                        return
+                if self._close_mem_on_del:
+                    self._shared_memory.close()
                 try:
                     self._shared_memory.unlink()
                 except FileNotFoundError:
                     # Do nothing, memory has already been freed
                     pass
+                else:
+                    if _attached_memory:
+                        _close_attached_memory(self._shared_memory.name)
+                    _evict_freed_shared_memory_in_workers()
+            elif self._close_mem_on_del:
+                self._shared_memory.close()
 
     @property
     def has_shared_memory(self) -> bool:
@@ -178,6 +619,14 @@ class SharedArrayProxy:
     @property
     def array(self) -> np.ndarray:
         if self._shared_array is None:
-            mem = shared_memory.SharedMemory(name=self._mem_name)
-            self._shared_array = _read_array_from_shared_memory(self._shape, self._dtype, mem, False)
+            if _attached_memory_cache_enabled():
+                mem = _attach_shared_memory(self._mem_name)
+                self._shared_array = _read_array_from_shared_memory(self._shape,
+                                                                    self._dtype,
+                                                                    mem,
+                                                                    free_mem_on_delete=False,
+                                                                    close_mem_on_delete=False)
+            else:
+                mem = shared_memory.SharedMemory(name=self._mem_name)
+                self._shared_array = _read_array_from_shared_memory(self._shape, self._dtype, mem, False)
         return self._shared_array.array
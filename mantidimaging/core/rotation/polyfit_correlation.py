@@ -50,16 +50,16 @@ def find_center(images: ImageStack, progress: Progress) -> Tuple[ScalarCoR, Degr
 
 
 def _calculate_correlation_error(images, shared_search_range, min_correlation_error, progress):
-    # if the projections are passed in the partial they are copied to every process on every iteration
-    # this makes the multiprocessing significantly slower
-    # so they are copied into a shared array to avoid that copying
-    shared_projections = pu.create_array((2, images.height, images.width))
-    shared_projections.array[0][:] = images.projection(0)
-    shared_projections.array[1][:] = np.fliplr(images.proj180deg.data[0])
+    # the projections are large, so ps.execute moves them into shared memory rather than copying them to every
+    # process on every iteration
+    p0_and_180 = np.stack((images.projection(0), np.fliplr(images.proj180deg.data[0])))
 
-    do_search_partial = ps.create_partial(do_calculate_correlation_err, ps.inplace3, image_width=images.width)
+    do_search_partial = ps.create_partial(do_calculate_correlation_err,
+                                          ps.inplace2,
+                                          p0_and_180=p0_and_180,
+                                          image_width=images.width)
 
-    arrays = [min_correlation_error, shared_search_range, shared_projections]
+    arrays = [min_correlation_error, shared_search_range]
     ps.execute(do_search_partial,
                arrays,
                num_operations=min_correlation_error.array.shape[0],
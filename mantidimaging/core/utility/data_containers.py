@@ -13,6 +13,8 @@ from typing import List, Optional, NamedTuple
 
 import numpy
 
+from mantidimaging.core.utility.sensible_roi import SensibleROI
+
 
 @dataclass
 class SingleValue:
@@ -130,6 +132,11 @@ class ImageParameters:
     prefix: str
     indices: Optional[Indices] = None
     log_file: Optional[str] = None
+    roi: Optional[SensibleROI] = None
+    binning: int = 1
+    binning_mode: str = "mean"
+    average: Optional[str] = None
+    average_window: int = 32
 
 
 class LoadingParameters:
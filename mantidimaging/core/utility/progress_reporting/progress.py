@@ -237,3 +237,39 @@ class Progress(object):
         # Log elapsed time and final memory usage
         log.info("Elapsed time: %d sec.", self.execution_time())
         log.debug("Memory usage after execution: %s", get_memory_usage_linux_str())
+
+
+class ChildProgress(Progress):
+    """
+    Progress of one of several tasks that run at the same time and report to a single parent.
+
+    The steps of the child are added to the parent, so the parent shows the combined progress of all the tasks.
+    Cancelling the parent cancels the child. Completing the child does not complete the parent.
+    """
+    def __init__(self, parent: Progress, task_name='Task'):
+        self.parent = parent
+        super().__init__(task_name=task_name)
+
+    def set_estimated_steps(self, num_steps: int):
+        """
+        Changes the estimate of the steps of the child, and of the parent by as much. The steps already done have been
+        added to the parent, so they are kept and counted against the new estimate rather than being reset.
+        """
+        self.parent.add_estimated_steps(num_steps - self.end_step)
+        self.end_step = num_steps
+
+    def update(self, steps: int = 1, msg: str = "", force_continue: bool = False) -> None:
+        super().update(steps, msg, force_continue)
+        if steps > 0 and not self.complete:
+            self.parent.update(steps, f"{self.task_name}: {msg}" if msg else self.task_name, force_continue)
+
+    @property
+    def should_cancel(self):
+        return self.cancel_msg is not None or self.parent.should_cancel
+
+    def mark_complete(self, msg='complete'):
+        # The completion step is only recorded by the child, so that it is not counted by the parent
+        self.complete = True
+        super().mark_complete(msg)
+        if self.should_cancel:
+            self.complete = False
@@ -5,7 +5,7 @@ import unittest
 
 from unittest import mock
 
-from mantidimaging.core.utility.progress_reporting import Progress, ProgressHandler
+from mantidimaging.core.utility.progress_reporting import Progress, ProgressHandler, ChildProgress
 from mantidimaging.core.utility.progress_reporting.progress import ProgressHistory
 
 
@@ -271,6 +271,46 @@ class ProgressTest(unittest.TestCase):
             progress_history.append(ProgressHistory(115 + (i * 2), 2 + (i * 2), ""))
         self.assertEqual(Progress.calculate_mean_time(progress_history), 2)
 
+    def test_children_add_to_parent(self):
+        parent = Progress(num_steps=0)
+        first = ChildProgress(parent, task_name="first")
+        second = ChildProgress(parent, task_name="second")
+        first.set_estimated_steps(10)
+        second.set_estimated_steps(5)
+        self.assertEqual(parent.end_step, 15)
+
+        first.update(4, "Image")
+        second.update(5, "Image")
+        second.mark_complete()
+
+        self.assertEqual(parent.current_step, 9)
+        self.assertTrue(second.is_completed())
+        self.assertFalse(parent.is_completed())
+        self.assertIn("first: Image", parent.progress_history[1].msg)
+
+    def test_child_re_estimate_keeps_reported_steps(self):
+        parent = Progress(num_steps=0)
+        child = ChildProgress(parent)
+        child.set_estimated_steps(10)
+        child.update(4)
+
+        child.set_estimated_steps(20)
+        self.assertEqual(child.current_step, 4)
+        self.assertEqual(parent.current_step, 4)
+        self.assertEqual(parent.end_step, 20)
+
+        child.update(16)
+        self.assertEqual(parent.current_step, parent.end_step)
+
+    def test_cancelling_parent_cancels_child(self):
+        parent = Progress(num_steps=2)
+        child = ChildProgress(parent)
+        parent.cancel()
+
+        self.assertTrue(child.should_cancel)
+        with self.assertRaises(RuntimeError):
+            child.update()
+
 
 if __name__ == "__main__":
     unittest.main()
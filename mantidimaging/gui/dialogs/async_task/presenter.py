@@ -57,6 +57,14 @@ class AsyncTaskDialogPresenter(QObject, ProgressHandler):
         self.model.do_execute_async()
         self.view.show_delayed(1000)
 
+    def cancel_task(self):
+        """
+        Ask the task to stop. Tasks check for this when they report progress.
+        """
+        progress = getattr(self, 'progress', None)
+        if progress is not None:
+            progress.cancel()
+
     @property
     def task_is_running(self):
         return self.model.task_is_running
@@ -29,3 +29,12 @@ class AsyncTaskDialogPresenterTest(unittest.TestCase):
 
         p.model.task.wait()
         self.assertFalse(p.task_is_running)
+
+    def test_cancel_task_cancels_progress(self):
+        v = mock.create_autospec(AsyncTaskDialogView)
+        p = AsyncTaskDialogPresenter(v)
+        p.progress = mock.Mock()
+
+        p.cancel_task()
+
+        p.progress.cancel.assert_called_once()
@@ -32,3 +32,10 @@ class AsyncTaskDialogViewTest(unittest.TestCase):
 
         self.mock_qtimer.singleShot.assert_called_once_with(10, self.view.show_from_timer)
         self.mock_qtimer.start.assert_called_once()
+
+    def test_cancel(self):
+        self.view.cancelButton = mock.Mock()
+        self.view.cancel()
+
+        self.view.cancelButton.setEnabled.assert_called_once_with(False)
+        self.view.presenter.cancel_task.assert_called_once()
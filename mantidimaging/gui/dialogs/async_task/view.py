@@ -21,6 +21,7 @@ class AsyncTaskDialogView(BaseDialogView):
 
         self.progressBar.setMinimum(0)
         self.progressBar.setMaximum(1000)
+        self.cancelButton.clicked.connect(self.cancel)
 
         self.show_timer = QTimer(self)
         self.hide()
@@ -51,6 +52,11 @@ class AsyncTaskDialogView(BaseDialogView):
         self.presenter.model = None
         self._presenter = None
 
+    def cancel(self):
+        self.cancelButton.setEnabled(False)
+        self.infoText.setText("Cancelling...")
+        self.presenter.cancel_task()
+
     def set_progress(self, progress: float, message: str):
         # Set status message
         if message:
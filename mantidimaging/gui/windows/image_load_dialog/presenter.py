@@ -37,6 +37,9 @@ FILE_TYPES: Dict[str, TypeInfo] = {
     "Flat After Log": TypeInfo("Flat After Log", "", "log"),
 }
 
+# The averages that the flats and darks can be reduced to as they are loaded, by their text in the dialog
+FLAT_DARK_AVERAGES: Dict[str, Optional[str]] = {"All images": None, "Mean": "mean", "Median": "median"}
+
 
 class LoadPresenter:
     view: 'ImageLoadDialog'
@@ -148,6 +151,8 @@ class LoadPresenter:
 
             if image_group == "Sample":
                 params.indices = image_field.indices
+            else:
+                params.average = FLAT_DARK_AVERAGES.get(self.view.flat_dark_average.currentText())
 
             if image_group + " Log" in self.view.fields:
                 log_field = self.view.fields[image_group + " Log"]
@@ -277,6 +277,7 @@ class ImageLoadDialogPresenterTest(unittest.TestCase):
         self.fields["Dark After"].directory.return_value = dark_directory
         self.v.pixel_bit_depth.currentText.return_value = dtype
         self.v.images_are_sinograms.isChecked.return_value = sinograms
+        self.v.flat_dark_average.currentText.return_value = "Median"
         self.fields["180 degree"].path_text.return_value = proj180deg_file
         self.fields["180 degree"].directory.return_value = proj180deg_directory
         self.v.sample.path_text.return_value = sample_path_text
@@ -295,6 +296,7 @@ class ImageLoadDialogPresenterTest(unittest.TestCase):
         self.assertEqual(lp.flat_before.log_file, flat_log_file_name)
         self.assertEqual(lp.flat_before.format, image_format)
         self.assertEqual(lp.flat_before.input_path, flat_directory)
+        self.assertEqual(lp.flat_before.average, "median")
         self.assertEqual(lp.flat_after.prefix, "/path")
         self.assertEqual(lp.flat_after.log_file, flat_log_file_name)
         self.assertEqual(lp.flat_after.format, image_format)
@@ -305,6 +307,8 @@ class ImageLoadDialogPresenterTest(unittest.TestCase):
         self.assertEqual(lp.dark_after.input_path, dark_directory)
         self.assertEqual(lp.dark_after.prefix, "/path")
         self.assertEqual(lp.dark_after.format, image_format)
+        self.assertEqual(lp.dark_after.average, "median")
+        self.assertIsNone(lp.sample.average)
         self.assertEqual(lp.proj_180deg.input_path, proj180deg_directory)
         self.assertEqual(lp.proj_180deg.prefix, "/path/proj180/directory/file")
         self.assertEqual(lp.proj_180deg.format, image_format)
@@ -17,6 +17,7 @@ class ImageLoadDialog(BaseDialogView):
     tree: QTreeWidget
     pixel_bit_depth: QComboBox
     images_are_sinograms: QCheckBox
+    flat_dark_average: QComboBox
 
     pixelSize: QSpinBox
 
@@ -6,6 +6,7 @@ from typing import Optional, TYPE_CHECKING
 from PyQt5.QtWidgets import QDialogButtonBox
 
 from mantidimaging.core.io.loader import supported_formats
+from mantidimaging.core.io.saver import available_tiff_compressions, COMPRESSION_NONE
 from mantidimaging.core.io.utility import DEFAULT_IO_FILE_FORMAT
 from mantidimaging.gui.mvp_base import BaseDialogView
 from mantidimaging.gui.utility import select_directory
@@ -40,6 +41,10 @@ class ImageSaveDialog(BaseDialogView):
         # set the default to tiff
         self.formats.setCurrentIndex(formats.index(DEFAULT_IO_FILE_FORMAT))
 
+        self.compressionType.addItems(available_tiff_compressions())
+        self.formats.currentTextChanged.connect(self._enable_compression)
+        self._enable_compression(self.formats.currentText())
+
         if stack_list:  # we will just show an empty drop down if no stacks
             # Sort stacknames using Recon and Tomo as preference
             user_friendly_stack_list = sorted(stack_list, key=sort_by_tomo_and_recon)
@@ -76,3 +81,11 @@ class ImageSaveDialog(BaseDialogView):
 
     def pixel_depth(self) -> str:
         return str(self.pixelDepth.currentText())
+
+    def _enable_compression(self, image_format: str) -> None:
+        self.compressionType.setEnabled(image_format in ["tif", "tiff"])
+
+    def compression(self) -> Optional[str]:
+        if not self.compressionType.isEnabled() or self.compressionType.currentText() == COMPRESSION_NONE:
+            return None
+        return str(self.compressionType.currentText())
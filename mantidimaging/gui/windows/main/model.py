@@ -14,6 +14,9 @@ if TYPE_CHECKING:
 
 logger = getLogger(__name__)
 
+# The stacks of LoadingParameters that make up a dataset
+DATASET_STACKS = ["sample", "flat_before", "flat_after", "dark_before", "dark_after", "proj_180deg"]
+
 
 def _matching_dataset_attribute(dataset_attribute: Optional[ImageStack], images_id: uuid.UUID) -> bool:
     return isinstance(dataset_attribute, ImageStack) and dataset_attribute.id == images_id
@@ -32,7 +35,14 @@ class MainWindowModel(object):
         return None
 
     def do_load_dataset(self, parameters: LoadingParameters, progress) -> StrictDataset:
-        sample = loader.load_p(parameters.sample, parameters.dtype, progress)
+        # The flats, darks and 180 projection are read while the sample is loading
+        stacks = {
+            name: getattr(parameters, name)
+            for name in DATASET_STACKS if getattr(parameters, name)
+        }
+        loaded = loader.load_stacks(stacks, parameters.dtype, progress)
+
+        sample = loaded["sample"]
         ds = StrictDataset(sample)
 
         sample._is_sinograms = parameters.sinograms
@@ -42,25 +52,23 @@ class MainWindowModel(object):
             ds.sample.log_file = loader.load_log(parameters.sample.log_file)
 
         if parameters.flat_before:
-            flat_before = loader.load_p(parameters.flat_before, parameters.dtype, progress)
+            flat_before = loaded["flat_before"]
             ds.flat_before = flat_before
             if parameters.flat_before.log_file:
                 flat_before.log_file = loader.load_log(parameters.flat_before.log_file)
         if parameters.flat_after:
-            flat_after = loader.load_p(parameters.flat_after, parameters.dtype, progress)
+            flat_after = loaded["flat_after"]
             ds.flat_after = flat_after
             if parameters.flat_after.log_file:
                 flat_after.log_file = loader.load_log(parameters.flat_after.log_file)
 
         if parameters.dark_before:
-            dark_before = loader.load_p(parameters.dark_before, parameters.dtype, progress)
-            ds.dark_before = dark_before
+            ds.dark_before = loaded["dark_before"]
         if parameters.dark_after:
-            dark_after = loader.load_p(parameters.dark_after, parameters.dtype, progress)
-            ds.dark_after = dark_after
+            ds.dark_after = loaded["dark_after"]
 
         if parameters.proj_180deg:
-            sample.proj180deg = loader.load_p(parameters.proj_180deg, parameters.dtype, progress)
+            sample.proj180deg = loaded["proj_180deg"]
 
         self.datasets[ds.id] = ds
         return ds
@@ -75,7 +83,15 @@ class MainWindowModel(object):
     def load_image_stack(file_path: str, progress: 'Progress') -> ImageStack:
         return loader.load_stack(file_path, progress)
 
-    def do_images_saving(self, images_id, output_dir, name_prefix, image_format, overwrite, pixel_depth, progress):
+    def do_images_saving(self,
+                         images_id,
+                         output_dir,
+                         name_prefix,
+                         image_format,
+                         overwrite,
+                         pixel_depth,
+                         progress,
+                         compression=None):
         images = self.get_images_by_uuid(images_id)
         if images is None:
             self.raise_error_when_images_not_found(images_id)
@@ -85,7 +101,8 @@ class MainWindowModel(object):
                                      overwrite_all=overwrite,
                                      out_format=image_format,
                                      pixel_depth=pixel_depth,
-                                     progress=progress)
+                                     progress=progress,
+                                     compression=compression)
         images.filenames = filenames
         return True
 
@@ -355,7 +355,8 @@ class MainWindowPresenter(BasePresenter):
             'name_prefix': self.view.image_save_dialog.name_prefix(),
             'image_format': self.view.image_save_dialog.image_format(),
             'overwrite': self.view.image_save_dialog.overwrite(),
-            'pixel_depth': self.view.image_save_dialog.pixel_depth()
+            'pixel_depth': self.view.image_save_dialog.pixel_depth(),
+            'compression': self.view.image_save_dialog.compression()
         }
         start_async_task_view(self.view, self.model.do_images_saving, self._on_save_done, kwargs)
 
@@ -3,6 +3,7 @@
 
 import unittest
 import uuid
+from unittest import mock
 
 from mantidimaging.gui.windows.main.presenter import StackId
 from mantidimaging.gui.windows.main.image_save_dialog import sort_by_tomo_and_recon, ImageSaveDialog
@@ -40,3 +41,15 @@ class SaveDialogQtTest(unittest.TestCase):
         self.assertEqual(mwsd.stack_uuids[0], stack_list[4].id)
         # the Tomo stack is 2nd choice
         self.assertEqual(mwsd.stack_uuids[1], stack_list[3].id)
+
+    @mock.patch("mantidimaging.gui.windows.main.image_save_dialog.available_tiff_compressions",
+                return_value=["none", "deflate"])
+    def test_compression_only_for_tiff(self, _):
+        mwsd = ImageSaveDialog(None, [])
+        mwsd.compressionType.setCurrentText("deflate")
+        mwsd.formats.setCurrentText("tif")
+        self.assertEqual("deflate", mwsd.compression())
+
+        mwsd.formats.setCurrentText("fits")
+        self.assertFalse(mwsd.compressionType.isEnabled())
+        self.assertIsNone(mwsd.compression())
@@ -36,8 +36,8 @@ class MainWindowModelTest(unittest.TestCase):
         self.assertIs(image_mock, self.model.get_images_by_uuid(uid))
 
     @mock.patch('mantidimaging.core.io.loader.load_log')
-    @mock.patch('mantidimaging.core.io.loader.load_p')
-    def test_do_load_stack_sample_only(self, load_p_mock: mock.Mock, load_log_mock: mock.Mock):
+    @mock.patch('mantidimaging.core.io.loader.load_stacks')
+    def test_do_load_stack_sample_only(self, load_stacks_mock: mock.Mock, load_log_mock: mock.Mock):
         lp = LoadingParameters()
         sample_mock = mock.Mock()
         sample_mock.log_file = None
@@ -47,14 +47,16 @@ class MainWindowModelTest(unittest.TestCase):
         lp.pixel_size = 101
         progress_mock = mock.Mock()
 
+        load_stacks_mock.return_value = {"sample": mock.Mock()}
+
         self.model.do_load_dataset(lp, progress_mock)
 
-        load_p_mock.assert_called_once_with(sample_mock, lp.dtype, progress_mock)
+        load_stacks_mock.assert_called_once_with({"sample": sample_mock}, lp.dtype, progress_mock)
         load_log_mock.assert_not_called()
 
     @mock.patch('mantidimaging.core.io.loader.load_log')
-    @mock.patch('mantidimaging.core.io.loader.load_p')
-    def test_do_load_stack_sample_and_sample_log(self, load_p_mock: mock.Mock, load_log_mock: mock.Mock):
+    @mock.patch('mantidimaging.core.io.loader.load_stacks')
+    def test_do_load_stack_sample_and_sample_log(self, load_stacks_mock: mock.Mock, load_log_mock: mock.Mock):
         lp = LoadingParameters()
         sample_mock = mock.Mock()
         lp.sample = sample_mock
@@ -63,15 +65,17 @@ class MainWindowModelTest(unittest.TestCase):
         lp.pixel_size = 101
         progress_mock = mock.Mock()
 
+        load_stacks_mock.return_value = {"sample": mock.Mock()}
+
         self.model.do_load_dataset(lp, progress_mock)
 
-        load_p_mock.assert_called_once_with(sample_mock, lp.dtype, progress_mock)
+        load_stacks_mock.assert_called_once_with({"sample": sample_mock}, lp.dtype, progress_mock)
         load_log_mock.assert_called_once_with(sample_mock.log_file)
 
     @mock.patch('mantidimaging.gui.windows.main.model.loader.load_log')
-    @mock.patch('mantidimaging.gui.windows.main.model.loader.load_p')
+    @mock.patch('mantidimaging.gui.windows.main.model.loader.load_stacks')
     @mock.patch('mantidimaging.gui.windows.main.model.StrictDataset')
-    def test_do_load_stack_sample_and_flat(self, dataset_mock: mock.Mock, load_p_mock: mock.Mock,
+    def test_do_load_stack_sample_and_flat(self, dataset_mock: mock.Mock, load_stacks_mock: mock.Mock,
                                            load_log_mock: mock.Mock):
         lp = LoadingParameters()
         sample_mock = mock.Mock()
@@ -89,17 +93,22 @@ class MainWindowModelTest(unittest.TestCase):
         sample_images_mock = mock.Mock()
         flatb_images_mock = mock.Mock()
         flata_images_mock = mock.Mock()
-        load_p_mock.side_effect = [sample_images_mock, flatb_images_mock, flata_images_mock]
+        load_stacks_mock.return_value = {
+            "sample": sample_images_mock,
+            "flat_before": flatb_images_mock,
+            "flat_after": flata_images_mock
+        }
 
         ds_mock = dataset_mock.return_value
 
         self.model.do_load_dataset(lp, progress_mock)
 
-        load_p_mock.assert_has_calls([
-            mock.call(sample_mock, lp.dtype, progress_mock),
-            mock.call(flat_before_mock, lp.dtype, progress_mock),
-            mock.call(flat_after_mock, lp.dtype, progress_mock)
-        ])
+        load_stacks_mock.assert_called_once_with(
+            {
+                "sample": sample_mock,
+                "flat_before": flat_before_mock,
+                "flat_after": flat_after_mock
+            }, lp.dtype, progress_mock)
         load_log_mock.assert_has_calls([
             mock.call(sample_mock.log_file),
             mock.call(flat_before_mock.log_file),
@@ -111,10 +120,10 @@ class MainWindowModelTest(unittest.TestCase):
         assert ds_mock.flat_after == flata_images_mock
 
     @mock.patch('mantidimaging.gui.windows.main.model.loader.load_log')
-    @mock.patch('mantidimaging.gui.windows.main.model.loader.load_p')
+    @mock.patch('mantidimaging.gui.windows.main.model.loader.load_stacks')
     @mock.patch('mantidimaging.gui.windows.main.model.StrictDataset')
-    def test_do_load_stack_sample_and_flat_and_dark_and_180deg(self, dataset_mock: mock.Mock, load_p_mock: mock.Mock,
-                                                               load_log_mock: mock.Mock):
+    def test_do_load_stack_sample_and_flat_and_dark_and_180deg(self, dataset_mock: mock.Mock,
+                                                               load_stacks_mock: mock.Mock, load_log_mock: mock.Mock):
         lp = LoadingParameters()
         sample_mock = mock.Mock()
         lp.sample = sample_mock
@@ -142,23 +151,29 @@ class MainWindowModelTest(unittest.TestCase):
         flata_images_mock = mock.Mock()
         darkb_images_mock = mock.Mock()
         darka_images_mock = mock.Mock()
-        load_p_mock.side_effect = [
-            sample_images_mock, flatb_images_mock, flata_images_mock, darkb_images_mock, darka_images_mock,
-            mock.Mock()
-        ]
+        proj_180deg_images_mock = mock.Mock()
+        load_stacks_mock.return_value = {
+            "sample": sample_images_mock,
+            "flat_before": flatb_images_mock,
+            "flat_after": flata_images_mock,
+            "dark_before": darkb_images_mock,
+            "dark_after": darka_images_mock,
+            "proj_180deg": proj_180deg_images_mock
+        }
 
         ds_mock = dataset_mock.return_value
 
         self.model.do_load_dataset(lp, progress_mock)
 
-        load_p_mock.assert_has_calls([
-            mock.call(sample_mock, lp.dtype, progress_mock),
-            mock.call(flat_before_mock, lp.dtype, progress_mock),
-            mock.call(flat_after_mock, lp.dtype, progress_mock),
-            mock.call(dark_before_mock, lp.dtype, progress_mock),
-            mock.call(dark_after_mock, lp.dtype, progress_mock),
-            mock.call(proj_180deg_mock, lp.dtype, progress_mock)
-        ])
+        load_stacks_mock.assert_called_once_with(
+            {
+                "sample": sample_mock,
+                "flat_before": flat_before_mock,
+                "flat_after": flat_after_mock,
+                "dark_before": dark_before_mock,
+                "dark_after": dark_after_mock,
+                "proj_180deg": proj_180deg_mock
+            }, lp.dtype, progress_mock)
 
         load_log_mock.assert_has_calls([
             mock.call(sample_mock.log_file),
@@ -172,6 +187,7 @@ class MainWindowModelTest(unittest.TestCase):
         assert ds_mock.flat_after == flata_images_mock
         assert ds_mock.dark_before == darkb_images_mock
         assert ds_mock.dark_after == darka_images_mock
+        assert sample_images_mock.proj180deg == proj_180deg_images_mock
 
     @mock.patch('mantidimaging.core.io.loader.load_log')
     def test_add_log_to_sample(self, load_log: mock.Mock):
@@ -281,7 +297,8 @@ class MainWindowModelTest(unittest.TestCase):
                                           overwrite_all=overwrite,
                                           out_format=image_format,
                                           pixel_depth=pixel_depth,
-                                          progress=progress)
+                                          progress=progress,
+                                          compression=None)
         self.assertListEqual(images_mock.filenames, filenames)  # type: ignore
         assert result
 
@@ -6,6 +6,7 @@ from typing import Callable, TYPE_CHECKING, List, Any, Dict
 
 from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup
 from mantidimaging.core.operations.loader import load_filter_packages
+from mantidimaging.core.parallel import utility as pu
 from mantidimaging.gui.dialogs.async_task import start_async_task_view
 from mantidimaging.gui.mvp_base import BaseMainWindowView
 
@@ -120,7 +121,20 @@ class FiltersWindowModel(object):
         # Run filter
         exec_func: partial = self.selected_filter.execute_wrapper(**input_kwarg_widgets)
         exec_func.keywords["progress"] = progress
-        exec_func(images)
+        if not self.selected_filter.keeps_integer_data:
+            # Stacks loaded in their native integer dtype are only converted once an operation needs floating point
+            images.promote_to_float()
+        try:
+            exec_func(images)
+        except pu.OperationCancelled as cancelled:
+            # record which images may have been changed before the operation stopped
+            images.record_partial_operation(
+                self.selected_filter.__name__,  # type: ignore
+                self.selected_filter.filter_name,
+                cancelled,
+                *exec_func.args,
+                **exec_func.keywords)
+            raise
         # store the executed filter in history if it executed successfully
         images.record_operation(
             self.selected_filter.__name__,  # type: ignore
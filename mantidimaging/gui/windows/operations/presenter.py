@@ -15,6 +15,7 @@ from PyQt5.QtWidgets import QApplication, QLineEdit
 
 from mantidimaging.core.data import ImageStack
 from mantidimaging.core.operation_history.const import OPERATION_HISTORY, OPERATION_DISPLAY_NAME
+from mantidimaging.core.parallel import utility as pu
 from mantidimaging.gui.mvp_base import BasePresenter
 from mantidimaging.gui.utility import BlockQtSignals
 from mantidimaging.gui.utility.common import operation_in_progress
@@ -263,9 +264,32 @@ class FiltersWindowPresenter(BasePresenter):
     def is_a_proj180deg(self, stack_to_check: ImageStack):
         return any(stack_to_check is stack for stack in self.main_window.get_all_180_projections())
 
+    def _restore_original_data(self, stacks: List[ImageStack]) -> bool:
+        """
+        Put back the data copied by safe apply, after an operation has been cancelled part way through.
+
+        :return: True if every stack had a copy to restore from
+        """
+        all_restored = True
+        for stack in stacks:
+            if isinstance(self.original_images_stack, ImageStack):
+                original: Optional[ImageStack] = self.original_images_stack
+            else:
+                original = next((copy for copy, uuid in self.original_images_stack or [] if uuid == stack.id), None)
+            if original is None:
+                all_restored = False
+                continue
+            stack.shared_array = original.shared_array
+            stack.metadata = original.metadata
+        self.original_images_stack = []
+        return all_restored
+
     def _post_filter(self, updated_stacks: List[ImageStack], task):
         try:
             use_new_data = True
+            cancelled = isinstance(task.error, pu.OperationCancelled)
+            if cancelled:
+                restored = self._restore_original_data(updated_stacks)
             negative_stacks = []
             for stack in updated_stacks:
                 # Ensure there is no error if we are to continue with safe apply and 180 degree.
@@ -289,7 +313,14 @@ class FiltersWindowPresenter(BasePresenter):
             self.applying_to_all = False
             self.do_update_previews()
 
-            if task.error is not None:
+            if cancelled:
+                self.view.clear_notification_dialog()
+                if restored:
+                    self.view.show_operation_cancelled(self.model.selected_filter.filter_name)
+                else:
+                    self.view.show_operation_partially_applied(self.model.selected_filter.filter_name,
+                                                               task.error.processed_range)
+            elif task.error is not None:
                 # task failed, show why
                 self.view.show_error_dialog(f"Operation failed: {task.error}")
             elif use_new_data:
@@ -9,6 +9,7 @@ import numpy as np
 
 import mantidimaging.test_helpers.unit_test_helper as th
 from mantidimaging.core.operation_history import const
+from mantidimaging.core.parallel.utility import OperationCancelled
 from mantidimaging.gui.windows.operations import FiltersWindowModel
 from mantidimaging.gui.windows.stack_visualiser import SVParameters
 from mantidimaging.core.data import ImageStack
@@ -152,6 +153,42 @@ class FiltersWindowModelTest(unittest.TestCase):
         selected_filter_mock.validate_execute_kwargs.assert_called_once()
         callback_mock.assert_called_once_with(images, progress=progress_mock)
 
+    def test_apply_filter_to_images_cancelled_records_partial_operation(self):
+        images = th.generate_images()
+        selected_filter_mock = mock.Mock()
+        selected_filter_mock.__name__ = "test_filter"
+        selected_filter_mock.filter_name = "Test filter"
+        cancelled = OperationCancelled((0, 4), 4)
+        selected_filter_mock.execute_wrapper.return_value = partial(mock.Mock(side_effect=cancelled))
+        self.model.selected_filter = selected_filter_mock
+
+        self.assertRaises(OperationCancelled, self.model.apply_to_images, images, progress=mock.Mock())
+
+        self.assertTrue(images.is_partially_processed)
+        recorded = images.metadata[const.OPERATION_HISTORY][-1]
+        self.assertEqual("test_filter", recorded[const.OPERATION_NAME])
+        self.assertEqual([0, 4], recorded[const.OPERATION_PROCESSED_RANGE])
+
+    def _apply_mock_filter_to_integer_images(self, keeps_integer_data):
+        images = ImageStack(np.arange(2 * 3 * 4, dtype=np.uint16).reshape((2, 3, 4)))
+        selected_filter_mock = mock.Mock()
+        selected_filter_mock.__name__ = "test_filter"
+        selected_filter_mock.filter_name = "Test filter"
+        selected_filter_mock.keeps_integer_data = keeps_integer_data
+        selected_filter_mock.execute_wrapper.return_value = partial(mock.Mock())
+        self.model.selected_filter = selected_filter_mock
+        self.model.apply_to_images(images, progress=mock.Mock())
+        return images
+
+    def test_apply_filter_promotes_integer_images(self):
+        images = self._apply_mock_filter_to_integer_images(keeps_integer_data=False)
+        self.assertEqual(np.float32, images.dtype)
+        np.testing.assert_equal(images.data, np.arange(2 * 3 * 4).reshape((2, 3, 4)))
+
+    def test_apply_filter_that_keeps_integer_data_does_not_promote(self):
+        images = self._apply_mock_filter_to_integer_images(keeps_integer_data=True)
+        self.assertEqual(np.uint16, images.dtype)
+
     def test_get_filter_module_name(self):
         self.model.filters = mock.MagicMock()
 
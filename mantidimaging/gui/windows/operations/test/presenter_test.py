@@ -13,6 +13,7 @@ from unittest.mock import DEFAULT, Mock
 from parameterized import parameterized
 
 from mantidimaging.core.operation_history.const import OPERATION_HISTORY, OPERATION_DISPLAY_NAME
+from mantidimaging.core.parallel.utility import OperationCancelled
 from mantidimaging.gui.windows.main import MainWindowView
 from mantidimaging.gui.windows.operations import FiltersWindowPresenter
 from mantidimaging.gui.windows.operations.presenter import REPEAT_FLAT_FIELDING_MSG, FLAT_FIELDING, _find_nan_change, \
@@ -177,6 +178,45 @@ class FiltersWindowPresenterTest(unittest.TestCase):
         self.assertFalse(self.presenter.filter_is_running)
         self.presenter.view.filter_applied.emit.assert_called_once()
 
+    @mock.patch.multiple('mantidimaging.gui.windows.operations.presenter.FiltersWindowPresenter',
+                         do_update_previews=DEFAULT,
+                         _wait_for_stack_choice=DEFAULT)
+    def test_post_filter_cancelled_restores_safe_apply_copy(self, do_update_previews: Mock,
+                                                            _wait_for_stack_choice: Mock):
+        self.presenter.view.safeApply.isChecked.return_value = True
+        stack = generate_images()
+        original = stack.copy()
+        stack.data[:] = -1
+        self.presenter.original_images_stack = original
+        mock_task = mock.Mock()
+        mock_task.error = OperationCancelled((0, 2), 2)
+
+        self.presenter._post_filter([stack], mock_task)
+
+        _wait_for_stack_choice.assert_not_called()
+        self.assertIs(stack.shared_array, original.shared_array)
+        self.view.show_operation_cancelled.assert_called_once_with(self.presenter.model.selected_filter.filter_name)
+        self.view.show_error_dialog.assert_not_called()
+        self.assertFalse(self.presenter.filter_is_running)
+
+    @mock.patch.multiple('mantidimaging.gui.windows.operations.presenter.FiltersWindowPresenter',
+                         do_update_previews=DEFAULT,
+                         _wait_for_stack_choice=DEFAULT)
+    def test_post_filter_cancelled_without_copy_reports_range(self, do_update_previews: Mock,
+                                                              _wait_for_stack_choice: Mock):
+        self.presenter.view.safeApply.isChecked.return_value = False
+        self.presenter.original_images_stack = []
+        stack = generate_images()
+        mock_task = mock.Mock()
+        mock_task.error = OperationCancelled((3, 7), 4)
+
+        self.presenter._post_filter([stack], mock_task)
+
+        self.view.show_operation_partially_applied.assert_called_once_with(
+            self.presenter.model.selected_filter.filter_name, (3, 7))
+        self.view.show_operation_cancelled.assert_not_called()
+        self.view.show_error_dialog.assert_not_called()
+
     @mock.patch.multiple(
         'mantidimaging.gui.windows.operations.presenter.FiltersWindowPresenter',
         _do_apply_filter=DEFAULT,
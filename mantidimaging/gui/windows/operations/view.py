@@ -214,6 +214,15 @@ class FiltersWindowView(BaseMainWindowView):
         self.notification_icon.setPixmap(QApplication.style().standardPixmap(QStyle.SP_DialogYesButton))
         self.notification_text.setText(f"{operation_name} cancelled, original data restored")
 
+    def show_operation_partially_applied(self, operation_name, processed_range):
+        self.notification_text.show()
+        self.notification_icon.setPixmap(QApplication.style().standardPixmap(QStyle.SP_MessageBoxWarning))
+        if processed_range is None:
+            self.notification_text.setText(f"{operation_name} cancelled, no images were changed")
+        else:
+            self.notification_text.setText(f"{operation_name} cancelled, images {processed_range[0]} to "
+                                           f"{processed_range[1] - 1} may have been partially processed")
+
     def open_help_webpage(self):
         filter_name = self.filterSelector.currentText()
 
@@ -8,6 +8,7 @@ import numpy as np
 from mantidimaging.core.data import ImageStack
 from mantidimaging.core.operation_history import const
 from mantidimaging.core.operations.divide import DivideFilter
+from mantidimaging.core.parallel import reduction as pr
 from mantidimaging.core.reconstruct import get_reconstructor_for
 from mantidimaging.core.reconstruct.astra_recon import allowed_recon_kwargs as astra_allowed_kwargs
 from mantidimaging.core.reconstruct.tomopy_recon import allowed_recon_kwargs as tomopy_allowed_kwargs
@@ -271,14 +272,20 @@ class ReconstructWindowModel(object):
         return images.has_proj180deg() and images.height == images.proj180deg.height \
                and images.width == images.proj180deg.width
 
+    def stack_value_summary(self) -> pr.StackSummary:
+        """
+        Finds the NaN, zero and negative values in the stack in a single pass over the data
+        """
+        return pr.summary(self.images.shared_array)
+
     def stack_contains_nans(self) -> bool:
-        return np.any(np.isnan(self.images.data))
+        return self.stack_value_summary().nan_count > 0
 
     def stack_contains_zeroes(self) -> bool:
-        return not np.all(self.images.data)
+        return self.stack_value_summary().zero_count > 0
 
     def stack_contains_negative_values(self) -> bool:
-        return np.any(self.images.data < 0)
+        return self.stack_value_summary().negative_count > 0
 
     @property
     def stack_id(self):
@@ -443,11 +443,12 @@ class ReconstructWindowPresenter(BasePresenter):
         Checks if the data contains NaNs/zeroes and displays a message if they are found.
         """
         msg_list = []
-        if self.model.stack_contains_nans():
+        summary = self.model.stack_value_summary()
+        if summary.nan_count:
             msg_list.append("NaN(s) found in the stack.")
-        if self.model.stack_contains_zeroes():
+        if summary.zero_count:
             msg_list.append("Zero(es) found in the stack.")
-        if self.model.stack_contains_negative_values():
+        if summary.negative_count:
             msg_list.append("Negative value(s) found in the stack.")
 
         if len(msg_list) == 0:
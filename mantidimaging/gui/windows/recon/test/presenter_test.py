@@ -8,6 +8,7 @@ import numpy as np
 from parameterized import parameterized
 
 from mantidimaging.core.data import ImageStack
+from mantidimaging.core.parallel.reduction import StackSummary
 from mantidimaging.core.rotation.data_model import Point
 from mantidimaging.core.utility.data_containers import ScalarCoR, ReconstructionParameters
 from mantidimaging.gui.windows.recon import ReconstructWindowPresenter, ReconstructWindowView
@@ -391,18 +392,14 @@ class ReconWindowPresenterTest(unittest.TestCase):
         self.assertFalse(self.presenter.proj_180_degree_shape_matches_images(images))
 
     def test_status_message_shows_nan_zero_negative_warning(self):
-        self.presenter.model.stack_contains_nans = mock.Mock(return_value=True)
-        self.presenter.model.stack_contains_zeroes = mock.Mock(return_value=True)
-        self.presenter.model.stack_contains_negative_values = mock.Mock(return_value=True)
+        self.presenter.model.stack_value_summary = mock.Mock(return_value=StackSummary(0, 1, 1, 1, 1))
 
         self.presenter._do_nan_zero_negative_check()
         self.view.show_status_message.assert_called_once_with(
             "Warning: NaN(s) found in the stack. Zero(es) found in the stack. Negative value(s) found in the stack.")
 
     def test_status_message_cleared(self):
-        self.presenter.model.stack_contains_nans = mock.Mock(return_value=False)
-        self.presenter.model.stack_contains_zeroes = mock.Mock(return_value=False)
-        self.presenter.model.stack_contains_negative_values = mock.Mock(return_value=False)
+        self.presenter.model.stack_value_summary = mock.Mock(return_value=StackSummary(0, 1, 0, 0, 0))
 
         self.presenter._do_nan_zero_negative_check()
         self.view.show_status_message.assert_called_once_with("")
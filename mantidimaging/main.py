@@ -7,6 +7,8 @@ import logging
 import sys
 import warnings
 import mantidimaging.core.parallel.manager as pm
+import mantidimaging.core.parallel.utility as pu
+import mantidimaging.core.parallel.telemetry as pt
 
 from mantidimaging import helper as h
 from mantidimaging.core.utility.command_line_arguments import CommandLineArguments
@@ -35,10 +37,49 @@ def parse_args():
                         default=False,
                         action='store_true',
                         help="Opens the reconstruction window at start up.")
+    parser.add_argument("--pool-size",
+                        type=int,
+                        help="Number of worker processes for parallel operations. Defaults to the 'parallel/pool_size' "
+                        "setting, or the number of cores if that is not set. The setting is read at startup.")
+    parser.add_argument("--pool-idle-timeout",
+                        type=float,
+                        help="Seconds the worker processes may be unused before they are stopped to free memory, 0 to "
+                        "keep them running. Defaults to the 'parallel/pool_idle_timeout' setting, or "
+                        f"{pm.DEFAULT_IDLE_TIMEOUT:.0f}s if that is not set.")
+    parser.add_argument("--worker-native-threads",
+                        type=int,
+                        help="Number of OpenMP/BLAS threads each parallel worker may use. Defaults to the "
+                        "'parallel/worker_native_threads' setting, or the number of cores divided by the number of "
+                        "workers if that is not set.")
+    parser.add_argument("--load-concurrency",
+                        type=int,
+                        help="Number of stacks of a dataset, such as the sample, flats and darks, to read at the same "
+                        "time. Defaults to the 'parallel/load_concurrency' setting, or 4 if that is not set.")
+    parser.add_argument("--parallel-telemetry",
+                        nargs="?",
+                        const="",
+                        metavar="DIR",
+                        help="Log the task timings of each parallel operation, and write them to a JSON file per "
+                        "operation in DIR if given. Defaults to the 'parallel/telemetry_dir' setting.")
 
     return parser.parse_args()
 
 
+def parallel_setting(arg_value, key: str, value_type: type):
+    """
+    Get a setting for the parallel processing, preferring the value given on the command line
+
+    :return: The value, or None if it is given in neither place
+    """
+    if arg_value is not None:
+        return arg_value
+    from PyQt5.QtCore import QSettings
+    settings = QSettings("mantidproject", "Mantid Imaging")
+    if not settings.contains(f"parallel/{key}"):
+        return None
+    return settings.value(f"parallel/{key}", type=value_type)
+
+
 def main():
     args = parse_args()
     # Print version number and exit
@@ -56,14 +97,23 @@ def main():
     h.initialise_logging(logging.getLevelName(args.log_level))
 
     from mantidimaging import gui
+    from mantidimaging.core.io.loader.loader import configure_load_concurrency
     try:
-        pm.create_and_start_pool()
+        # The pool is only started when an operation first needs it
+        pm.configure_pool(size=parallel_setting(args.pool_size, "pool_size", int),
+                          native_threads=parallel_setting(args.worker_native_threads, "worker_native_threads", int),
+                          idle_timeout=parallel_setting(args.pool_idle_timeout, "pool_idle_timeout", float))
+        configure_load_concurrency(parallel_setting(args.load_concurrency, "load_concurrency", int))
+        telemetry_dir = parallel_setting(args.parallel_telemetry, "telemetry_dir", str)
+        if telemetry_dir is not None:
+            pt.enable(telemetry_dir or None)
         gui.execute()
     except BaseException as e:
         if sys.platform == 'linux':
             pm.clear_memory_from_current_process_linux()
         raise e
     finally:
+        pu.clear_segment_pool()
         pm.end_pool()
 
 
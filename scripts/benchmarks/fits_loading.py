@@ -0,0 +1,73 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Compares loading a stack of FITS files by reading each whole HDU into a new array and copying it into the stack,
+against memory mapping each file and copying it straight into the stack. The number of file descriptors left open
+after loading is also reported.
+
+Usage: python -m scripts.benchmarks.fits_loading --num-images 500 --shape 1024x1024 --dtype uint16 --runs 3
+"""
+import argparse
+import os
+import tempfile
+import time
+from statistics import mean
+
+import astropy.io.fits as fits
+import numpy as np
+import psutil
+
+from mantidimaging.core.io.loader import img_loader
+from mantidimaging.core.io.loader.loader import _fitsread, _fitsread_into
+from mantidimaging.core.parallel import utility as pu
+
+READERS = {"load": None, "read_into": _fitsread_into}
+
+
+def write_files(directory: str, num_images: int, shape, dtype) -> list:
+    file_names = []
+    for i in range(num_images):
+        file_name = os.path.join(directory, f"image_{i:05}.fits")
+        fits.PrimaryHDU(np.random.randint(0, 1000, shape).astype(dtype)).writeto(file_name)
+        file_names.append(file_name)
+    return file_names
+
+
+def time_load(file_names, shape, read_into_func, executor: pu.Executor, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        img_loader.execute(_fitsread,
+                           file_names,
+                           "fits",
+                           np.float32,
+                           None,
+                           executor=executor,
+                           read_into_func=read_into_func,
+                           img_shape=shape)
+        durations.append(time.perf_counter() - start)
+    return mean(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-images", type=int, default=200)
+    parser.add_argument("--shape", default="1024x1024")
+    parser.add_argument("--dtype", default="uint16", help="dtype of the data in the files")
+    parser.add_argument("--executors", nargs="+", default=["SERIAL", "THREAD"], choices=[e.name for e in pu.Executor])
+    parser.add_argument("-R", "--runs", type=int, default=3, help="number of times to run each case")
+    args = parser.parse_args()
+
+    shape = tuple(int(n) for n in args.shape.split("x"))
+    process = psutil.Process()
+    with tempfile.TemporaryDirectory() as directory:
+        file_names = write_files(directory, args.num_images, shape, args.dtype)
+        print(f"{'reader':<12}{'executor':<10}{'time (s)':>12}{'open files':>12}")
+        for executor_name in args.executors:
+            for reader_name, read_into_func in READERS.items():
+                duration = time_load(file_names, shape, read_into_func, pu.Executor[executor_name], args.runs)
+                print(f"{reader_name:<12}{executor_name:<10}{duration:>12.3f}{len(process.open_files()):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Compares the int16 rescale of image_save before and after it was fused into a single affine transform. The previous
+path found the range with separate nanmin and nanmax passes, then copied, interpolated and cast each image. The
+current path finds the range in one parallel pass, and rescales each image into reused buffers. Each is timed on
+its own and as part of a full save to TIFF.
+
+Usage: python -m scripts.benchmarks.int16_save --shape 500x1024x1024 --runs 3
+"""
+import argparse
+import tempfile
+import time
+from statistics import mean
+
+import numpy as np
+
+from mantidimaging.core.data import ImageStack
+from mantidimaging.core.io import saver
+from mantidimaging.core.operations.rescale import RescaleFilter
+from mantidimaging.core.parallel import reduction as pr
+from mantidimaging.core.parallel import utility as pu
+
+
+def previous_rescale(data: np.ndarray) -> None:
+    min_value, max_value = np.nanmin(data), np.nanmax(data)
+    for image in data:
+        RescaleFilter.filter_array(np.copy(image), min_input=min_value, max_input=max_value,
+                                   max_output=saver.INT16_SIZE - 1).astype(np.uint16)
+
+
+def fused_rescale(images: pu.SharedArray) -> None:
+    min_value, max_value = pr.min_max(images)
+    for image in images.array:
+        saver._rescale_to_uint16(image, min_value, max_value)
+
+
+def time_runs(func, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return mean(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shape", default="200x1024x1024")
+    parser.add_argument("-R", "--runs", type=int, default=3, help="number of times to run each case")
+    parser.add_argument("--skip-save", action="store_true", help="only time the rescale, without writing files")
+    args = parser.parse_args()
+
+    shape = tuple(int(n) for n in args.shape.split("x"))
+    images = pu.create_array(shape, np.float32)
+    images.array[:] = np.random.default_rng().uniform(-1, 1, shape)
+
+    print(f"{'case':<24}{'time (s)':>12}")
+    print(f"{'previous rescale':<24}{time_runs(lambda: previous_rescale(images.array), args.runs):>12.3f}")
+    print(f"{'fused rescale':<24}{time_runs(lambda: fused_rescale(images), args.runs):>12.3f}")
+
+    if not args.skip_save:
+        stack = ImageStack(images)
+        for workers in [1, saver.DEFAULT_SAVE_WORKERS]:
+
+            def save():
+                with tempfile.TemporaryDirectory() as directory:
+                    saver.image_save(stack, directory, pixel_depth="int16", overwrite_all=True, workers=workers)
+
+            print(f"{f'int16 save, {workers} workers':<24}{time_runs(save, args.runs):>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Compares the time taken by kernels that use native OpenMP/BLAS thread pools when the process pool workers are limited
+to different numbers of native threads. A limit of 0 uses the default of the number of cores divided by the number of
+workers, and a limit equal to the number of cores is the unlimited behaviour.
+
+Each limit needs a new process pool, as the native libraries only read the limit when they are loaded.
+
+Usage: python -m scripts.benchmarks.native_threads --shapes 100x1024x1024 --limits 0 2 64 --runs 3
+"""
+import argparse
+import os
+import time
+from statistics import mean
+
+import numpy as np
+
+from mantidimaging.core.operations.median_filter.median_filter import _median_filter
+from mantidimaging.core.parallel import manager as pm
+from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.parallel import utility as pu
+
+
+def _matmul(image: np.ndarray) -> np.ndarray:
+    # BLAS multithreads the product, which is what oversubscribes the machine when every worker does it at once
+    return (image @ image.T) / image.shape[1]
+
+
+def run_matmul(images: pu.SharedArray):
+    f = ps.create_partial(_matmul, ps.return_to_self)
+    ps.execute(f, [images], images.array.shape[0], executor=pu.Executor.PROCESS)
+
+
+def run_median(images: pu.SharedArray):
+    f = ps.create_partial(_median_filter, ps.return_to_self, size=3, mode="reflect")
+    ps.execute(f, [images], images.array.shape[0], executor=pu.Executor.PROCESS)
+
+
+KERNELS = {"matmul": run_matmul, "median": run_median}
+
+
+def parse_shape(text: str):
+    return tuple(int(n) for n in text.split("x"))
+
+
+def time_kernel(kernel, shape, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        images = pu.create_array(shape)
+        images.array[:] = np.random.random(shape[1:])
+        start = time.perf_counter()
+        kernel(images)
+        durations.append(time.perf_counter() - start)
+    return mean(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shapes", nargs="+", default=["50x1024x1024", "200x1024x1024"])
+    parser.add_argument("--kernels", nargs="+", default=list(KERNELS.keys()), choices=list(KERNELS.keys()))
+    parser.add_argument("--limits",
+                        nargs="+",
+                        type=int,
+                        default=[0, os.cpu_count() or 1],
+                        help="native thread limits per worker to compare, 0 for the default")
+    parser.add_argument("-R", "--runs", type=int, default=3, help="number of times to run each case")
+    args = parser.parse_args()
+
+    print(f"{'limit':<10}{'kernel':<12}{'shape':<18}{'time (s)':>12}")
+    for limit in args.limits:
+        pm.create_and_start_pool(native_threads=limit)
+        try:
+            for kernel_name in args.kernels:
+                for shape_text in args.shapes:
+                    duration = time_kernel(KERNELS[kernel_name], parse_shape(shape_text), args.runs)
+                    print(f"{pm.worker_native_threads:<10}{kernel_name:<12}{shape_text:<18}{duration:>12.3f}")
+        finally:
+            pm.end_pool()
+
+
+if __name__ == "__main__":
+    main()
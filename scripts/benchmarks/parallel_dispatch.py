@@ -0,0 +1,82 @@
+# Copyright (C) 2022 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Compares per-index and slab dispatch of the process pool for cheap and expensive kernels over a range of stack sizes,
+to show where slab dispatch starts to pay off.
+
+Usage: python -m scripts.benchmarks.parallel_dispatch --shapes 100x512x512 500x1024x1024 --runs 3
+"""
+import argparse
+import time
+from statistics import mean
+
+import numpy as np
+
+from mantidimaging.core.operations.arithmetic import ArithmeticFilter
+from mantidimaging.core.operations.flat_fielding.flat_fielding import _subtract
+from mantidimaging.core.operations.median_filter.median_filter import _median_filter
+from mantidimaging.core.parallel import manager as pm
+from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.parallel import utility as pu
+
+
+def run_arithmetic(images: pu.SharedArray, dispatch: pu.DispatchMode):
+    params = {'div': 2.0, 'mult': 1.0, 'add': 1.0, 'sub': 0.0}
+    ps.run_compute_func(ArithmeticFilter.compute_function, images.array.shape[0], images, params, dispatch=dispatch)
+
+
+def run_subtract(images: pu.SharedArray, dispatch: pu.DispatchMode):
+    dark = pu.copy_into_shared_memory(np.ones(images.array.shape[1:], dtype=images.array.dtype))
+    f = ps.create_partial(_subtract, fwd_function=ps.inplace_second_2d)
+    ps.execute(f, [images, dark], images.array.shape[0], dispatch=dispatch)
+
+
+def run_median(images: pu.SharedArray, dispatch: pu.DispatchMode):
+    f = ps.create_partial(_median_filter, ps.return_to_self, size=3, mode="reflect")
+    ps.execute(f, [images], images.array.shape[0], dispatch=dispatch)
+
+
+KERNELS = {"arithmetic": run_arithmetic, "subtract": run_subtract, "median": run_median}
+
+
+def parse_shape(text: str):
+    return tuple(int(n) for n in text.split("x"))
+
+
+def time_kernel(kernel, shape, dispatch: pu.DispatchMode, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        images = pu.create_array(shape)
+        images.array[:] = 1
+        start = time.perf_counter()
+        kernel(images, dispatch)
+        durations.append(time.perf_counter() - start)
+    return mean(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shapes", nargs="+", default=["50x512x512", "200x512x512", "200x2048x2048"])
+    parser.add_argument("--kernels", nargs="+", default=list(KERNELS.keys()), choices=list(KERNELS.keys()))
+    parser.add_argument("-R", "--runs", type=int, default=3, help="number of times to run each case")
+    args = parser.parse_args()
+
+    pm.create_and_start_pool()
+    try:
+        print(f"{'kernel':<12}{'shape':<18}{'index (s)':>12}{'slab (s)':>12}{'auto (s)':>12}{'speedup':>10}")
+        for kernel_name in args.kernels:
+            for shape_text in args.shapes:
+                shape = parse_shape(shape_text)
+                times = {
+                    dispatch: time_kernel(KERNELS[kernel_name], shape, dispatch, args.runs)
+                    for dispatch in (pu.DispatchMode.INDEX, pu.DispatchMode.SLAB, pu.DispatchMode.AUTO)
+                }
+                speedup = times[pu.DispatchMode.INDEX] / times[pu.DispatchMode.SLAB]
+                print(f"{kernel_name:<12}{shape_text:<18}{times[pu.DispatchMode.INDEX]:>12.3f}"
+                      f"{times[pu.DispatchMode.SLAB]:>12.3f}{times[pu.DispatchMode.AUTO]:>12.3f}{speedup:>10.2f}")
+    finally:
+        pm.end_pool()
+
+
+if __name__ == "__main__":
+    main()